@@ -1,9 +1,13 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { getDashboardStats } from '@/lib/supabase/dashboard';
 
-/** GET /api/dashboard/stats - ดึง aggregate stats สำหรับ Dashboard */
-export async function GET(_request: NextRequest) {
-  const { data, error } = await getDashboardStats();
+/**
+ * GET /api/dashboard/stats - ดึง aggregate stats สำหรับ Dashboard
+ * ?mode=aggregate ให้ database รวมยอดผ่าน RPC get_dashboard_stats
+ */
+export async function GET(request: NextRequest) {
+  const mode = new URL(request.url).searchParams.get('mode') === 'aggregate' ? 'aggregate' : 'rows';
+  const { data, error } = await getDashboardStats({ mode });
 
   if (error) {
     return NextResponse.json({ error }, { status: 500 });
@@ -6,10 +6,33 @@ import type {
   TripWithPackage,
 } from '@/types/database';
 
+/**
+ * rows: นับ/รวมยอดฝั่งแอป (ดึง amount ของทุก payment กลับมา)
+ * aggregate: ให้ Postgres รวมยอดผ่าน RPC get_dashboard_stats ในครั้งเดียว
+ */
+export type DashboardStatsMode = 'rows' | 'aggregate';
+
+interface GetDashboardStatsOptions {
+  mode?: DashboardStatsMode;
+}
+
+interface DashboardStatsAggregate {
+  totalCustomers: number | string;
+  totalBookings: number | string;
+  totalRevenue: number | string;
+  upcomingTrips: number | string;
+}
+
 /** ดึงสถิติรวมหน้า Dashboard */
-export async function getDashboardStats(): Promise<ServiceResponse<DashboardStats>> {
+export async function getDashboardStats(
+  options: GetDashboardStatsOptions = {}
+): Promise<ServiceResponse<DashboardStats>> {
   const today = new Date().toISOString().slice(0, 10);
 
+  if (options.mode === 'aggregate') {
+    return getDashboardStatsAggregate(today);
+  }
+
   const [customerCountRes, bookingCountRes, completedPaymentRes, upcomingTripCountRes] = await Promise.all([
     supabase.from('customers').select('id', { count: 'exact', head: true }),
     supabase.from('bookings').select('id', { count: 'exact', head: true }),
@@ -42,6 +65,33 @@ export async function getDashboardStats(): Promise<ServiceResponse<DashboardStat
   };
 }
 
+/** สถิติ Dashboard จาก RPC get_dashboard_stats (count/sum ฝั่ง database) */
+async function getDashboardStatsAggregate(today: string): Promise<ServiceResponse<DashboardStats>> {
+  const { data, error } = await supabase.rpc('get_dashboard_stats', { p_today: today });
+
+  if (error) {
+    return { data: null, error: error.message };
+  }
+
+  const stats = (data ?? {}) as Partial<DashboardStatsAggregate>;
+  const toNumber = (value: number | string | undefined) => {
+    const parsed = Number(value ?? 0);
+    return Number.isFinite(parsed) ? parsed : 0;
+  };
+
+  return {
+    data: {
+      totalCustomers: toNumber(stats.totalCustomers),
+      totalBookings: toNumber(stats.totalBookings),
+      totalRevenue: toNumber(stats.totalRevenue),
+      upcomingTrips: toNumber(stats.upcomingTrips),
+      confirmedBookings: 0,
+      pendingPayments: 0,
+    },
+    error: null,
+  };
+}
+
 /** ดึงรายการ booking ล่าสุดพร้อม relations */
 export async function getRecentBookings(
   limit = 10
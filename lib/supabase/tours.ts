@@ -351,29 +351,80 @@ export async function setManagedTourPolicies(
   };
 }
 
-export async function generateUniqueSlug(name: string): Promise<string> {
-  const baseSlug = name
+const SLUG_LOOKUP_CHUNK = 100;
+// PostgREST caps a response at max-rows (1000 on Supabase), so lookups page
+const SLUG_LOOKUP_PAGE = 1000;
+
+function toBaseSlug(name: string): string {
+  return name
     .toLowerCase()
     .replace(/[^a-z0-9\s]/g, '')
     .replace(/\s+/g, '-');
+}
 
-  let slug = baseSlug;
-  let counter = 1;
+/**
+ * Slugs for a batch of tour names, resolving every collision with one
+ * query per SLUG_LOOKUP_CHUNK distinct base slugs (and SLUG_LOOKUP_PAGE
+ * taken slugs) instead of one query per candidate. Each name gets the
+ * first free of `base`, `base-1`, `base-2`... as generateUniqueSlug always
+ * did, and names within the batch never share a slug, even when one name's
+ * base is another's numbered slug (`koh-tao-2` and the third `koh-tao`). Concurrent creators can still race; the tours.slug unique
+ * constraint rejects the loser.
+ */
+export async function generateUniqueSlugs(names: string[]): Promise<string[]> {
+  const baseSlugs = names.map(toBaseSlug);
+  const bases = Array.from(new Set(baseSlugs));
+  const taken = new Map<string, Set<string>>(bases.map((base) => [base, new Set<string>()]));
+
+  for (let i = 0; i < bases.length; i += SLUG_LOOKUP_CHUNK) {
+    const chunk = bases.slice(i, i + SLUG_LOOKUP_CHUNK);
+    // Only `base` and `base-<n>`; base slugs are [a-z0-9-] so need no escaping
+    const filter = chunk.map((base) => `slug.eq.${base},slug.match.^${base}-[0-9]+$`).join(',');
+
+    for (let from = 0; ; from += SLUG_LOOKUP_PAGE) {
+      // On a lookup error the base slug is tried as before and the unique
+      // constraint on insert reports the conflict
+      const { data } = await supabase
+        .from('tours')
+        .select('slug')
+        .or(filter)
+        .order('slug')
+        .range(from, from + SLUG_LOOKUP_PAGE - 1);
+
+      for (const row of data ?? []) {
+        const slug = row.slug as string;
+        for (const base of chunk) {
+          if (slug === base || (slug.startsWith(`${base}-`) && /^\d+$/.test(slug.slice(base.length + 1)))) {
+            taken.get(base)?.add(slug);
+          }
+        }
+      }
+
+      if (!data || data.length < SLUG_LOOKUP_PAGE) break;
+    }
+  }
 
-  while (true) {
-    const { data } = await supabase
-      .from('tours')
-      .select('id')
-      .eq('slug', slug)
-      .single();
+  const nextCounter = new Map<string, number>();
+  const handedOut = new Set<string>();
+  return baseSlugs.map((base) => {
+    const used = taken.get(base) as Set<string>;
+    let counter = nextCounter.get(base) ?? 0;
+    let slug = counter === 0 ? base : `${base}-${counter}`;
 
-    if (!data) {
-      return slug;
+    while (used.has(slug) || handedOut.has(slug)) {
+      counter++;
+      slug = `${base}-${counter}`;
     }
 
-    slug = `${baseSlug}-${counter}`;
-    counter++;
-  }
+    handedOut.add(slug);
+    nextCounter.set(base, counter + 1);
+    return slug;
+  });
+}
+
+export async function generateUniqueSlug(name: string): Promise<string> {
+  const [slug] = await generateUniqueSlugs([name]);
+  return slug;
 }
 
 export async function checkCanPublish(tourId: string): Promise<{
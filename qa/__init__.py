@@ -0,0 +1,3 @@
+"""
+Shared infrastructure for the root-level qa_*.py browser flows.
+"""
@@ -0,0 +1,404 @@
+"""
+Asyncio port of the shared booking-flow steps.
+
+One event loop drives one browser; every destination gets its own context
+(so carts don't mix) and runs concurrently up to --concurrency pages:
+
+    /destinations -> destination detail -> pick date -> pick package-option
+    -> set pax -> Check -> add to cart -> verify /cart
+
+--crawl validates the whole catalog instead of booking: a queue of every
+destination URL is drained by --concurrency workers, each reusing one
+context. Per destination it counts the available dates, then selects every
+package option in turn, sets pax and checks the price breakdown - rows add
+up (qa.pricing.check_breakdown) and the total matches qa.pricing's port of
+the page's pricing for the option read from the packages response. Nothing
+is added to a cart.
+
+Usage:
+    python -m qa.async_flow                    # every destination, 8 at a time
+    python -m qa.async_flow --concurrency 16 --limit 40
+    python -m qa.async_flow --crawl --concurrency 12
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import urljoin
+
+from playwright.async_api import Browser, BrowserContext, Page, async_playwright
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from qa import pricing
+from qa.config import VIEWPORT, base_url, launch_options
+from qa.extract import EXTRACT_JS
+from qa.readiness import (
+    AVAILABILITY_MESSAGE,
+    INIT_SCRIPT,
+    PRICE_BREAKDOWN,
+    SETTLE_JS,
+    is_schedules_response,
+)
+
+DEFAULT_REPORT = "/tmp/qa_async_flow_report.json"
+CRAWL_REPORT = "/tmp/qa_async_crawl_report.json"
+DESTINATION_LINKS = 'a[href*="/destinations/"]:not([href="/destinations"])'
+AVAILABLE_DATE = 'button:has(.bg-green-500)'
+PACKAGE_OPTION = 'input[name="package-option"]'
+SELECTED_OPTION_SLOTS = 'label:has(input[name="package-option"]:checked) button'
+ADD_TO_CART = '#drawer-add-to-cart-btn'
+CALENDAR_LEGEND = 'text="Green dots = available"'
+
+
+async def settle(page: Page, selector: str = PRICE_BREAKDOWN, quiet_ms: int = 150, timeout: int = 5_000):
+    await page.evaluate("s => { if (window.__qaSettle) delete window.__qaSettle[s]; }", selector)
+    try:
+        await page.wait_for_function(SETTLE_JS, arg=[selector, quiet_ms], timeout=timeout)
+    except PlaywrightTimeoutError:
+        pass
+
+
+async def wait_for_calendar(page: Page, timeout: int = 5_000):
+    """Wait for the date picker opened by Choose Date, so its dates can be counted"""
+    try:
+        await page.locator(CALENDAR_LEGEND).first.wait_for(state="visible", timeout=timeout)
+    except PlaywrightTimeoutError:
+        pass
+
+
+async def collect_destinations(browser: Browser) -> list:
+    """Return every destination detail URL listed on /destinations, deduped"""
+    context = await browser.new_context(viewport=VIEWPORT)
+    try:
+        page = await context.new_page()
+        await page.goto(f"{base_url()}/destinations")
+        await page.wait_for_load_state("networkidle")
+        hrefs = await page.locator(DESTINATION_LINKS).evaluate_all(
+            "els => els.map(el => el.getAttribute('href'))"
+        )
+    finally:
+        await context.close()
+
+    urls = []
+    for href in hrefs:
+        url = urljoin(f"{base_url()}/", href or "")
+        if href and url not in urls:
+            urls.append(url)
+    return urls
+
+
+async def _set_pax(page: Page, label: str, count: int):
+    """Press + on the Adult/Child/Infant/Travelers stepper until it reads count"""
+    row = page.locator(f'div:has(> div > label:has-text("{label}"))').first
+    if not await row.is_visible():
+        return
+    value = row.locator("div.w-10").first
+    plus = row.locator('button:has-text("+")').last
+    for _ in range(20):
+        if int((await value.inner_text()).strip() or 0) >= count:
+            break
+        await plus.click()
+    await settle(page)
+
+
+async def run_destination(browser: Browser, url: str, adults: int = 2, children: int = 0) -> dict:
+    """Run the booking steps for one destination in a fresh context"""
+    record = {"url": url, "steps": {}, "ok": False, "error": None}
+    started = time.perf_counter()
+    context: BrowserContext = await browser.new_context(viewport=VIEWPORT)
+    await context.add_init_script(INIT_SCRIPT)
+    page = await context.new_page()
+
+    def step(name: str, value):
+        record["steps"][name] = value
+
+    try:
+        async with page.expect_response(is_schedules_response, timeout=15_000):
+            await page.goto(url)
+        record["package"] = (await page.locator("h1").first.inner_text()).strip()
+
+        await page.locator('button:has-text("Choose Date")').first.click()
+        await wait_for_calendar(page)
+        available = page.locator(AVAILABLE_DATE)
+        if await available.count() == 0:
+            step("date", None)
+            record["error"] = "No available dates"
+            return record
+        step("date", (await available.first.inner_text()).strip())
+        await available.first.click()
+
+        options = page.locator(PACKAGE_OPTION)
+        await options.first.wait_for(state="visible", timeout=5_000)
+        await options.first.check()
+        option_label = options.first.locator("xpath=ancestor::label").first
+        step("option", (await option_label.locator("h4").first.inner_text()).strip())
+
+        slots = page.locator(SELECTED_OPTION_SLOTS)
+        if await slots.count() > 0:
+            step("time", (await slots.first.inner_text()).strip())
+            await slots.first.click()
+
+        if await page.locator('label:has-text("Travelers")').first.is_visible():
+            await _set_pax(page, "Travelers", adults + children)
+        else:
+            await _set_pax(page, "Adult", adults)
+            await _set_pax(page, "Child", children)
+        step("price_breakdown", await page.locator(PRICE_BREAKDOWN).first.inner_text())
+
+        await page.locator('button:has-text("Check")').first.click()
+        message = page.locator(AVAILABILITY_MESSAGE).first
+        await message.wait_for(state="visible", timeout=5_000)
+        step("availability", (await message.inner_text()).strip())
+        if "great news" not in record["steps"]["availability"].lower():
+            record["error"] = "Not available"
+            return record
+
+        before = await page.evaluate("() => window.__qaCartUpdates ?? 0")
+        await page.locator(ADD_TO_CART).click()
+        await page.wait_for_function("n => (window.__qaCartUpdates ?? 0) > n", arg=before, timeout=10_000)
+        cart = await page.evaluate("() => JSON.parse(localStorage.getItem('6cat_cart_v1') || '[]')")
+        step("cart_items", len(cart))
+
+        await page.goto(f"{base_url()}/cart")
+        total = page.locator('span:has-text("THB")').last
+        await total.wait_for(state="visible", timeout=5_000)
+        step("cart_total", (await total.inner_text()).strip())
+        record["ok"] = len(cart) == 1 and not await page.locator("text=/cart is empty/i").first.is_visible()
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        record["duration_s"] = round(time.perf_counter() - started, 3)
+        await context.close()
+
+    return record
+
+
+async def run_all(concurrency: int = 8, limit: int = 0, slow_mo: int = 0) -> dict:
+    started = time.perf_counter()
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(**launch_options(slow_mo))
+        try:
+            urls = await collect_destinations(browser)
+            if limit:
+                urls = urls[:limit]
+            print(f"Found {len(urls)} destinations, running {concurrency} at a time")
+
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def bounded(url: str) -> dict:
+                async with semaphore:
+                    record = await run_destination(browser, url)
+                    status = "✓" if record["ok"] else "✗"
+                    print(f"{status} {url} ({record['duration_s']}s){'' if record['ok'] else ' - ' + str(record['error'])}")
+                    return record
+
+            records = await asyncio.gather(*(bounded(url) for url in urls))
+        finally:
+            await browser.close()
+
+    wall_clock = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "wall_clock_s": round(wall_clock, 3),
+        "destinations_per_minute": round(len(records) / wall_clock * 60, 1) if wall_clock else None,
+        "pass": [r["url"] for r in records if r["ok"]],
+        "fail": [f"{r['url']}: {r['error']}" for r in records if not r["ok"]],
+        "destinations": records,
+    }
+
+
+# -- catalog crawl ---------------------------------------------------------
+
+def is_package_response(response) -> bool:
+    return "/rest/v1/packages" in response.url and "id=eq." in response.url
+
+
+async def _counter(page: Page, label: str) -> int:
+    row = page.locator(f'div:has(> div > label:has-text("{label}"))').first
+    if not await row.is_visible():
+        return 0
+    return int((await row.locator("div.w-10").first.inner_text()).strip() or 0)
+
+
+async def check_option(page: Page, index: int, package: dict, adults: int, children: int) -> dict:
+    """Select option `index`, set pax and check its price breakdown"""
+    started = time.perf_counter()
+    option_input = page.locator(PACKAGE_OPTION).nth(index)
+    await option_input.check()
+    name = (await option_input.locator("xpath=ancestor::label").first.locator("h4").first.inner_text()).strip()
+    result = {"name": name, "time": None, "problems": []}
+
+    slots = page.locator(SELECTED_OPTION_SLOTS)
+    if await slots.count() > 0:
+        result["time"] = (await slots.first.inner_text()).strip()
+        await slots.first.click()
+
+    travelers_mode = await page.locator('label:has-text("Travelers")').first.is_visible()
+    if travelers_mode:
+        await _set_pax(page, "Travelers", adults + children)
+        pax = {"adult": await _counter(page, "Travelers"), "child": 0, "infant": 0}
+    else:
+        await _set_pax(page, "Adult", adults)
+        await _set_pax(page, "Child", children)
+        pax = {label.lower(): await _counter(page, label) for label in ("Adult", "Child", "Infant")}
+    await settle(page)
+    result["pax"] = pax
+
+    snapshot = await page.evaluate(EXTRACT_JS, PRICE_BREAKDOWN)
+    result["price_lines"] = [line["text"] for line in snapshot["price_lines"]]
+    result["problems"].extend(pricing.check_breakdown(snapshot["price_lines"]))
+
+    totals = [t for t in snapshot["totals"] if t["kind"] == "total"] or snapshot["totals"]
+    result["shown_total"] = pricing.parse_amount(totals[-1]["text"]) if totals else None
+    option = next((o for o in package.get("options") or [] if (o.get("name") or "").strip() == name), None)
+    if option is None:
+        result["expected_total"] = None
+        result["problems"].append(f"Option '{name}' not in the packages response")
+    else:
+        expected = pricing.passenger_pricing(option, pax["adult"], pax["child"], pax["infant"],
+                                             package.get("base_price"))
+        result["expected_total"] = expected["total"]
+        if result["shown_total"] is None:
+            result["problems"].append("No total shown")
+        elif not pricing.same_amount(result["shown_total"], expected["total"]):
+            result["problems"].append(f"Total {result['shown_total']} != expected {expected['total']}")
+
+    result["ok"] = not result["problems"]
+    result["duration_s"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+async def crawl_destination(context: BrowserContext, url: str, adults: int = 2, children: int = 1) -> dict:
+    """Date, option, pax and price checks for one destination (no cart)"""
+    record = {"url": url, "package": None, "available_dates": 0, "date": None,
+              "options": [], "timings": {}, "ok": False, "error": None}
+    started = time.perf_counter()
+    page = await context.new_page()
+    try:
+        async with page.expect_response(is_package_response, timeout=15_000) as package_info:
+            async with page.expect_response(is_schedules_response, timeout=15_000):
+                await page.goto(url)
+        package = await (await package_info.value).json()
+        package = (package[0] if package else {}) if isinstance(package, list) else package
+        record["package"] = package.get("name")
+        record["timings"]["load_s"] = round(time.perf_counter() - started, 3)
+
+        await page.locator('button:has-text("Choose Date")').first.click()
+        await wait_for_calendar(page)
+        available = page.locator(AVAILABLE_DATE)
+        record["available_dates"] = await available.count()
+        if record["available_dates"] == 0:
+            record["error"] = "No available dates"
+            return record
+        record["date"] = (await available.first.inner_text()).strip()
+        await available.first.click()
+
+        options = page.locator(PACKAGE_OPTION)
+        await options.first.wait_for(state="visible", timeout=5_000)
+        options_started = time.perf_counter()
+        for index in range(await options.count()):
+            record["options"].append(await check_option(page, index, package, adults, children))
+        record["timings"]["options_s"] = round(time.perf_counter() - options_started, 3)
+
+        failed = [o for o in record["options"] if not o["ok"]]
+        record["ok"] = bool(record["options"]) and not failed
+        if failed:
+            record["error"] = "; ".join(f"{o['name']}: {', '.join(o['problems'])}" for o in failed)
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        record["duration_s"] = round(time.perf_counter() - started, 3)
+        await page.close()
+
+    return record
+
+
+async def crawl_all(concurrency: int = 8, limit: int = 0, slow_mo: int = 0,
+                    adults: int = 2, children: int = 1) -> dict:
+    """Drain a queue of every destination with `concurrency` workers, one context each"""
+    started = time.perf_counter()
+    records = []
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(**launch_options(slow_mo))
+        try:
+            urls = await collect_destinations(browser)
+            if limit:
+                urls = urls[:limit]
+            queue = asyncio.Queue()
+            for url in urls:
+                queue.put_nowait(url)
+            workers = max(1, min(concurrency, len(urls)))
+            print(f"Crawling {len(urls)} destinations with {workers} workers")
+
+            async def worker():
+                context = await browser.new_context(viewport=VIEWPORT)
+                await context.add_init_script(INIT_SCRIPT)
+                try:
+                    while True:
+                        try:
+                            url = queue.get_nowait()
+                        except asyncio.QueueEmpty:
+                            return
+                        record = await crawl_destination(context, url, adults, children)
+                        records.append(record)
+                        status = "✓" if record["ok"] else "✗"
+                        print(f"{status} {url} ({len(record['options'])} options, {record['duration_s']}s)"
+                              f"{'' if record['ok'] else ' - ' + str(record['error'])}")
+                finally:
+                    await context.close()
+
+            await asyncio.gather(*(worker() for _ in range(workers)))
+        finally:
+            await browser.close()
+
+    wall_clock = time.perf_counter() - started
+    durations = sorted(records, key=lambda r: r["duration_s"], reverse=True)
+    return {
+        "mode": "crawl",
+        "concurrency": concurrency,
+        "wall_clock_s": round(wall_clock, 3),
+        "destinations_per_minute": round(len(records) / wall_clock * 60, 1) if wall_clock else None,
+        "options_checked": sum(len(r["options"]) for r in records),
+        "slowest": [{"url": r["url"], "duration_s": r["duration_s"]} for r in durations[:5]],
+        "pass": [r["url"] for r in records if r["ok"]],
+        "fail": [f"{r['url']}: {r['error']}" for r in records if not r["ok"]],
+        "destinations": records,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the booking flow on many destinations concurrently")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--limit", type=int, default=0, help="Only the first N destinations (0 = all)")
+    parser.add_argument("--crawl", action="store_true",
+                        help="Check dates, every option, pax and prices on each destination instead of booking")
+    parser.add_argument("--report")
+    args = parser.parse_args()
+    args.report = args.report or (CRAWL_REPORT if args.crawl else DEFAULT_REPORT)
+
+    if args.crawl:
+        report = asyncio.run(crawl_all(concurrency=args.concurrency, limit=args.limit))
+    else:
+        report = asyncio.run(run_all(concurrency=args.concurrency, limit=args.limit))
+
+    print("\n" + "="*80)
+    print("FINAL RESULTS")
+    print("="*80)
+    print(f"\n✅ PASSED: {len(report['pass'])}")
+    print(f"❌ FAILED: {len(report['fail'])}")
+    for item in report["fail"]:
+        print(f"  - {item}")
+    if args.crawl:
+        print(f"🔎 {report['options_checked']} package options checked")
+    print(f"\n⏱  {report['wall_clock_s']}s ({report['destinations_per_minute']} destinations/min)")
+
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Report saved to {args.report}")
+
+    return report
+
+
+if __name__ == "__main__":
+    main()
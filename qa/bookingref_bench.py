@@ -0,0 +1,364 @@
+"""
+Booking-reference generation benchmark: retries, added latency and
+exhaustion under concurrent booking creation.
+
+lib/supabase/bookings.ts:generateBookingRef draws a random BK-{YYYY}-{6
+A-Z0-9} reference and SELECTs it back to check it is free, up to
+MAX_REF_RETRY (25) times, before createBooking INSERTs it. That costs one
+extra round trip per attempt, and the check and the insert are separate,
+so two concurrent bookings can both pass the check with the same reference
+and one INSERT then fails on bookings_booking_ref_unique_idx.
+
+The local Postgres stand-in (qa.pg) is preloaded with --existing references
+for the current year (1,000,000 by default, kept between runs) and each
+strategy creates --bookings bookings on --workers concurrent connections.
+The preload walks the same stride permutation as qa.seed but from the
+middle of the space (preload_start), so it never collides with the refs a
+qa.seed / dashboard_bench / search_bench dataset already holds, and the
+benchmark can run on top of one; those refs count as taken too.
+
+    probe         what generateBookingRef + createBooking do today
+    on_conflict   INSERT ... ON CONFLICT (booking_ref) DO NOTHING RETURNING id
+                  with a fresh random reference until a row comes back: the
+                  unique index does the check, one round trip per attempt
+    sequence      the reference comes from a DB sequence run through the
+                  same stride permutation the preload uses, so it is unique
+                  by construction; ON CONFLICT still guards legacy refs
+    plain         INSERT with a reference known to be unique - the baseline
+                  for "added latency"
+
+--rtt-ms is slept before every statement to stand in for the PostgREST
+round trip. --ref-length shrinks the random part (6 in the app) so
+collisions become frequent enough to see; the report also gives the
+analytical per-attempt collision chance p = taken / 36^length, expected
+attempts 1 / (1 - p) and exhaustion chance p^25.
+
+Usage:
+    python -m qa.bookingref_bench
+    python -m qa.bookingref_bench --bookings 5000 --workers 64 --rtt-ms 3
+    python -m qa.bookingref_bench --ref-length 4 --existing 1000000   # ~60% of refs taken
+    python -m qa.bookingref_bench --cleanup
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+
+from qa import pg, seed
+from qa.stats import summarize
+
+DEFAULT_REPORT = "/tmp/qa_bookingref_bench_report.json"
+STRATEGY_NAMES = ("probe", "on_conflict", "sequence", "plain")
+MAX_REF_RETRY = 25
+PRELOAD_NOTE = "qa-bookingref-preload"
+RUN_NOTE = "qa-bookingref-run"
+SEQUENCE = "public.qa_booking_ref_seq"
+
+INSERT_SQL = """
+    insert into public.bookings (booking_ref, customer_id, trip_id, pax, total_amount, notes)
+    values (%s, %s, %s, 1, 0, %s)
+"""
+
+REF_FUNCTION = """
+create or replace function public.qa_booking_ref(p_year int, p_index bigint, p_length int)
+returns text language sql immutable as $$
+  select 'BK-' || p_year || '-' || string_agg(
+    substr('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789',
+           ((((p_index * %(stride)s + 7919) %% (36::numeric ^ p_length)::bigint)
+             / (36::numeric ^ (d - 1))::bigint) %% 36)::int + 1, 1),
+    '' order by d)
+  from generate_series(1, p_length) as d
+$$
+""" % {"stride": seed.BOOKING_REF_STRIDE}
+
+
+def ref_at(year: int, index: int, length: int) -> str:
+    """The index-th reference of the stride permutation (seed.booking_ref for length 6)"""
+    n = (index * seed.BOOKING_REF_STRIDE + 7919) % 36 ** length
+    chars = []
+    for _ in range(length):
+        n, digit = divmod(n, 36)
+        chars.append(seed.BOOKING_REF_CHARSET[digit])
+    return f"BK-{year}-{''.join(chars)}"
+
+
+def random_ref(rng: random.Random, year: int, length: int) -> str:
+    return f"BK-{year}-{''.join(rng.choices(seed.BOOKING_REF_CHARSET, k=length))}"
+
+
+def preload_start(length: int) -> int:
+    """First permutation index of the preload: half-way round, far past any qa.seed booking count"""
+    return 36 ** length // 2
+
+
+def analytical(existing: int, length: int) -> dict:
+    p = existing / 36 ** length
+    return {
+        "space": 36 ** length,
+        "collision_p": p,
+        "expected_attempts": 1 / (1 - p) if p < 1 else None,
+        "exhaustion_p": p ** MAX_REF_RETRY,
+    }
+
+
+# -- fixtures ----------------------------------------------------------------
+
+def fixture_ids(conn) -> tuple:
+    """(customer_id, trip_id) of a QA customer and trip the bookings point at"""
+    row = pg.fetch_one(conn, "select id from public.customers where email = 'qa-bookingref@example.com'")
+    customer_id = row[0] if row else pg.fetch_one(conn, """
+        insert into public.customers (name, email) values ('QA booking ref', 'qa-bookingref@example.com')
+        returning id
+    """)[0]
+    row = pg.fetch_one(conn, "select t.id from public.trips t join public.packages p on p.id = t.package_id "
+                             "where p.name = 'QA booking ref'")
+    if row:
+        return customer_id, row[0]
+    package_id = pg.fetch_one(conn, "insert into public.packages (name) values ('QA booking ref') returning id")[0]
+    trip_id = pg.fetch_one(conn, "insert into public.trips (package_id, date, time) values (%s, %s, '09:00') "
+                                 "returning id", (package_id, date.today()))[0]
+    return customer_id, trip_id
+
+
+def preload(conn, existing: int, year: int, length: int, customer_id, trip_id) -> dict:
+    """Make exactly `existing` preloaded references of this year and length; reuse them when they match"""
+    pattern = f"BK-{year}-{'_' * length}"
+    current = pg.fetch_one(conn, "select count(*) from public.bookings where notes = %s and booking_ref like %s",
+                           (PRELOAD_NOTE, pattern))[0]
+    if current == existing:
+        return {"reused": True, "rows": existing, "seconds": 0}
+    if existing > 36 ** length:
+        raise SystemExit(f"--existing {existing} exceeds the {36 ** length} references of length {length}")
+
+    started = time.perf_counter()
+    pg.execute(conn, "delete from public.bookings where notes = %s", (PRELOAD_NOTE,))
+    rng = random.Random(f"bookingref:{year}:{length}")
+    now = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+    start = preload_start(length)
+    lines = (seed.line(seed.make_uuid(rng), ref_at(year, start + i, length), customer_id, trip_id, 1, "0.00",
+                       "confirmed", "paid", now, PRELOAD_NOTE, now, now)
+             for i in range(existing))
+    fk_skipped = seed.skip_fk_checks(conn, True)
+    try:
+        rows = pg.copy_lines(conn, "bookings", seed.COLUMNS["bookings"], lines)
+    finally:
+        if fk_skipped:
+            seed.skip_fk_checks(conn, False)
+    pg.execute(conn, "analyze public.bookings")
+    return {"reused": False, "rows": rows, "seconds": round(time.perf_counter() - started, 2)}
+
+
+def prepare_sequence(conn, existing: int, length: int):
+    pg.execute(conn, REF_FUNCTION)
+    pg.execute(conn, f"create sequence if not exists {SEQUENCE}")
+    # Start past the preloaded indexes, as a migration would start past the legacy refs
+    pg.execute(conn, f"select setval('{SEQUENCE}', %s)", (preload_start(length) + existing,))
+
+
+def cleanup(conn):
+    pg.execute(conn, "delete from public.bookings where notes in (%s, %s)", (PRELOAD_NOTE, RUN_NOTE))
+    pg.execute(conn, "delete from public.packages where name = 'QA booking ref'")
+    pg.execute(conn, "delete from public.customers where email = 'qa-bookingref@example.com'")
+    pg.execute(conn, f"drop sequence if exists {SEQUENCE}")
+    pg.execute(conn, "drop function if exists public.qa_booking_ref(int, bigint, int)")
+
+
+# -- strategies ----------------------------------------------------------------
+# Each returns (attempts, round trips) or raises RefExhausted
+
+class RefExhausted(Exception):
+    pass
+
+
+def _round_trip(ctx):
+    if ctx["rtt_s"]:
+        time.sleep(ctx["rtt_s"])
+
+
+def book_probe(conn, ctx) -> tuple:
+    for attempt in range(1, MAX_REF_RETRY + 1):
+        ref = random_ref(ctx["rng"], ctx["year"], ctx["length"])
+        _round_trip(ctx)
+        if pg.fetch_one(conn, "select id from public.bookings where booking_ref = %s", (ref,)) is None:
+            _round_trip(ctx)
+            pg.execute(conn, INSERT_SQL + " returning id", (ref, ctx["customer_id"], ctx["trip_id"], RUN_NOTE))
+            return attempt, attempt + 1
+    raise RefExhausted(f"no free reference in {MAX_REF_RETRY} attempts")
+
+
+def book_on_conflict(conn, ctx) -> tuple:
+    for attempt in range(1, MAX_REF_RETRY + 1):
+        ref = random_ref(ctx["rng"], ctx["year"], ctx["length"])
+        _round_trip(ctx)
+        if pg.fetch_one(conn, INSERT_SQL + " on conflict (booking_ref) do nothing returning id",
+                        (ref, ctx["customer_id"], ctx["trip_id"], RUN_NOTE)):
+            return attempt, attempt
+    raise RefExhausted(f"no free reference in {MAX_REF_RETRY} attempts")
+
+
+def book_sequence(conn, ctx) -> tuple:
+    sql = """
+        insert into public.bookings (booking_ref, customer_id, trip_id, pax, total_amount, notes)
+        values (public.qa_booking_ref(%s, nextval('public.qa_booking_ref_seq'), %s), %s, %s, 1, 0, %s)
+        on conflict (booking_ref) do nothing
+        returning id
+    """
+    for attempt in range(1, MAX_REF_RETRY + 1):
+        _round_trip(ctx)
+        if pg.fetch_one(conn, sql, (ctx["year"], ctx["length"], ctx["customer_id"], ctx["trip_id"], RUN_NOTE)):
+            return attempt, attempt
+    raise RefExhausted(f"no free reference in {MAX_REF_RETRY} attempts")
+
+
+def book_plain(conn, ctx) -> tuple:
+    _round_trip(ctx)
+    pg.execute(conn, INSERT_SQL + " returning id",
+               (f"BK-QA-{uuid.uuid4().hex[:16].upper()}", ctx["customer_id"], ctx["trip_id"], RUN_NOTE))
+    return 1, 1
+
+
+STRATEGIES = {"probe": book_probe, "on_conflict": book_on_conflict, "sequence": book_sequence, "plain": book_plain}
+
+
+def is_unique_violation(error: Exception) -> bool:
+    return getattr(error, "sqlstate", None) == "23505" or getattr(error, "pgcode", None) == "23505"
+
+
+def run_strategy(name: str, bookings: int, workers: int, base_ctx: dict) -> dict:
+    book = STRATEGIES[name]
+    local = threading.local()
+    connections = []
+    lock = threading.Lock()
+    latencies, attempts, round_trips = [], [], []
+    outcome = {"exhausted": 0, "insert_conflicts": 0, "errors": []}
+
+    def worker_state():
+        if not hasattr(local, "conn"):
+            local.conn = pg.connect()
+            local.ctx = dict(base_ctx, rng=random.Random())
+            with lock:
+                connections.append(local.conn)
+        return local.conn, local.ctx
+
+    def one_booking(_):
+        conn, ctx = worker_state()
+        started = time.perf_counter()
+        try:
+            tries, trips = book(conn, ctx)
+        except RefExhausted:
+            with lock:
+                outcome["exhausted"] += 1
+            return
+        except Exception as e:
+            with lock:
+                if is_unique_violation(e):
+                    outcome["insert_conflicts"] += 1
+                else:
+                    outcome["errors"].append(f"{type(e).__name__}: {e}")
+            return
+        with lock:
+            latencies.append((time.perf_counter() - started) * 1000)
+            attempts.append(tries)
+            round_trips.append(trips)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(lambda _: worker_state(), range(workers)))
+            started = time.perf_counter()
+            list(executor.map(one_booking, range(bookings)))
+            elapsed = time.perf_counter() - started
+    finally:
+        for conn in connections:
+            conn.close()
+
+    succeeded = len(latencies)
+    return {
+        "strategy": name,
+        "bookings": bookings,
+        "succeeded": succeeded,
+        "exhausted": outcome["exhausted"],
+        "exhaustion_rate": round(outcome["exhausted"] / bookings, 6) if bookings else 0,
+        "insert_conflicts": outcome["insert_conflicts"],
+        "errors": len(outcome["errors"]),
+        "error_samples": outcome["errors"][:5],
+        "retries_per_booking": round((sum(attempts) - succeeded) / succeeded, 4) if succeeded else None,
+        "max_attempts": max(attempts, default=0),
+        "round_trips_per_booking": round(sum(round_trips) / succeeded, 3) if succeeded else None,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_bps": round(succeeded / elapsed, 2) if elapsed else 0,
+        "latency": summarize(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark booking reference generation strategies")
+    parser.add_argument("--strategies", nargs="*", choices=STRATEGY_NAMES, default=list(STRATEGY_NAMES))
+    parser.add_argument("--existing", type=int, default=1_000_000, help="Preloaded references for this year")
+    parser.add_argument("--bookings", type=int, default=2_000)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--rtt-ms", type=float, default=2, help="Sleep before each statement (HTTP round trip)")
+    parser.add_argument("--ref-length", type=int, default=6, help="Random characters after BK-YYYY- (6 in the app)")
+    parser.add_argument("--cleanup", action="store_true", help="Remove the preload and fixtures, then exit")
+    parser.add_argument("--report", default=DEFAULT_REPORT)
+    args = parser.parse_args()
+
+    conn = pg.prepare()
+    if args.cleanup:
+        cleanup(conn)
+        conn.close()
+        print("✓ Booking ref benchmark data removed")
+        return {"runs": []}
+
+    year = date.today().year
+    customer_id, trip_id = fixture_ids(conn)
+    print("\n" + "="*80)
+    print(f"Booking refs: {args.bookings} bookings on {args.workers} workers, "
+          f"{args.existing:,} existing BK-{year}-{'X' * args.ref_length} refs")
+    print("="*80)
+    loaded = preload(conn, args.existing, year, args.ref_length, customer_id, trip_id)
+    how = "reused" if loaded["reused"] else f"written in {loaded['seconds']}s"
+    print(f"✓ Preload {how} ({loaded['rows']:,} rows)")
+    prepare_sequence(conn, args.existing, args.ref_length)
+
+    taken = pg.fetch_one(conn, "select count(*) from public.bookings where booking_ref like %s",
+                         (f"BK-{year}-{'_' * args.ref_length}",))[0]
+    expected = analytical(taken, args.ref_length)
+    print(f"🔎 p(collision) per attempt {expected['collision_p']:.3g}, expected attempts "
+          f"{expected['expected_attempts'] or 'inf'}, p(exhausting {MAX_REF_RETRY} retries) {expected['exhaustion_p']:.3g}")
+
+    ctx = {"year": year, "length": args.ref_length, "customer_id": customer_id, "trip_id": trip_id,
+           "rtt_s": args.rtt_ms / 1000}
+    report = {"dsn": pg.dsn().rsplit("@", 1)[-1], "existing": args.existing, "ref_length": args.ref_length,
+              "taken": taken, "rtt_ms": args.rtt_ms, "workers": args.workers, "analytical": expected, "preload": loaded,
+              "runs": []}
+    for name in args.strategies:
+        run = run_strategy(name, args.bookings, args.workers, ctx)
+        pg.execute(conn, "delete from public.bookings where notes = %s", (RUN_NOTE,))
+        report["runs"].append(run)
+
+    plain = next((r for r in report["runs"] if r["strategy"] == "plain"), None)
+    for run in report["runs"]:
+        if plain and run["latency"].get("p50_ms") and plain["latency"].get("p50_ms"):
+            run["added_p50_ms"] = round(run["latency"]["p50_ms"] - plain["latency"]["p50_ms"], 2)
+        failed = run["exhausted"] + run["insert_conflicts"] + run["errors"]
+        status = "✓" if not failed else "❌"
+        added = f"  +{run['added_p50_ms']}ms vs plain" if "added_p50_ms" in run else ""
+        print(f"{status} {run['strategy']:<12} retries/booking {run['retries_per_booking']}  "
+              f"round trips {run['round_trips_per_booking']}  p50 {run['latency'].get('p50_ms', 0)}ms  "
+              f"p95 {run['latency'].get('p95_ms', 0)}ms{added}  exhausted {run['exhausted']}  "
+              f"insert conflicts {run['insert_conflicts']}  errors {run['errors']}")
+
+    conn.close()
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"\n✅ Report saved to {args.report}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Browser/context factory shared by the flows, so every page gets the same
+viewport and readiness hooks.
+
+Every context records web vitals (qa.vitals), records or replays its API
+traffic when QA_NETWORK is set (qa.replay), and filters images/fonts/
+third-party requests when QA_NETFILTER is set (qa.netfilter).
+"""
+
+from playwright.sync_api import Browser, BrowserContext, Page, Playwright
+
+from qa import netfilter, readiness, replay, vitals
+from qa.config import VIEWPORT, launch_options
+
+
+def launch(p: Playwright, slow_mo: int = 0) -> Browser:
+    return p.chromium.launch(**launch_options(slow_mo))
+
+
+def new_context(browser: Browser, **kwargs) -> BrowserContext:
+    kwargs.setdefault("viewport", VIEWPORT)
+    context = browser.new_context(**kwargs)
+    readiness.install(context)
+    vitals.install(context)
+    replay.install(context)
+    netfilter.install(context)
+    return context
+
+
+def new_page(browser: Browser, **kwargs) -> Page:
+    return new_context(browser, **kwargs).new_page()
@@ -0,0 +1,277 @@
+"""
+Availability calendar sweep for a destination detail page.
+
+The flows only ever click the first green date. The sweep reads a whole
+month grid in one evaluate call (day, disabled, green dot), computes what
+the page should show from the schedule data, and only clicks into the dates
+where the two disagree. Covering a month costs one extraction plus one
+"Next month" click instead of a click per day.
+
+What the page should show mirrors app/(public)/destinations/[slug]:
+a date is available when it has a scheduled trip for the package and lies
+inside the package's travel window (the __meta__ option's available_from /
+available_to). --source picks where the schedule comes from:
+
+    trips   Supabase REST trips?package_id=eq.<id>&status=eq.scheduled,
+            fetched independently of the page (default). Without
+            NEXT_PUBLIC_SUPABASE_URL / _ANON_KEY (see qa.config) the page's
+            own packages/trips responses are used instead
+    api     GET /api/v1/tours/<--tour-id>/schedules - open/closing_soon
+            schedules with seats left. tour_schedules belong to tours, not
+            to the packages the destination page is built from, so the
+            tour whose schedule should back the page has to be named
+
+Mismatches:
+
+    marker_without_schedule   green date with nothing bookable behind it
+    schedule_without_marker   bookable date shown disabled
+
+Usage:
+    python -m qa.calendar_sweep                        # first destination, 3 months
+    python -m qa.calendar_sweep --url http://localhost:3000/destinations/<id> --months 6
+    python -m qa.calendar_sweep --url http://localhost:3000/destinations/<id> --source api --tour-id <tour id>
+"""
+
+import argparse
+import json
+import urllib.parse
+from datetime import date, datetime
+
+from playwright.sync_api import Page, sync_playwright
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from qa import evidence
+from qa.browser import launch, new_page
+from qa.config import base_url, supabase_anon_key, supabase_url
+from qa.loadgen import ConnectionPool
+from qa.readiness import expect_schedules, wait_for_calendar, wait_for_options
+from qa.state import rest_get
+
+DEFAULT_REPORT = "/tmp/qa_calendar_sweep_report.json"
+SOURCES = ("trips", "api")
+BOOKABLE_STATUSES = ("open", "closing_soon")
+
+MONTH_GRID_JS = r"""
+() => {
+  const legend = Array.from(document.querySelectorAll('div'))
+    .find((el) => el.textContent.trim() === 'Green dots = available');
+  const box = legend && legend.closest('div.rounded-xl');
+  if (!box) return null;
+  const grids = box.querySelectorAll('div.grid.grid-cols-7');
+  const grid = grids[grids.length - 1];
+  return {
+    month: (box.querySelector('div.font-semibold') || {}).textContent || '',
+    cells: Array.from(grid.children)
+      .filter((el) => el.tagName === 'BUTTON')
+      .map((button) => ({
+        day: Number(button.textContent.trim()),
+        disabled: button.disabled,
+        dot: Boolean(button.querySelector('.bg-green-500')),
+        selected: button.classList.contains('bg-primary'),
+      })),
+  };
+}
+"""
+
+
+def package_id_from_url(url: str) -> str:
+    return urllib.parse.urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1]
+
+
+def travel_window(options) -> tuple:
+    """(available_from, available_to) from the __meta__ option, like parseContentMeta"""
+    for option in options if isinstance(options, list) else []:
+        if isinstance(option, dict) and "__meta__" in (option.get("id"), option.get("name")):
+            meta = option.get("meta") if isinstance(option.get("meta"), dict) else {}
+            window = []
+            for key in ("available_from", "available_to"):
+                value = meta.get(key)
+                try:
+                    window.append(date.fromisoformat(value.strip()).isoformat() if isinstance(value, str) else None)
+                except ValueError:
+                    window.append(None)
+            return tuple(window)
+    return None, None
+
+
+def bookable_dates(package: dict, trips: list) -> set:
+    start, end = travel_window((package or {}).get("options"))
+    return {t["date"] for t in trips
+            if t.get("date") and (not start or t["date"] >= start) and (not end or t["date"] <= end)}
+
+
+def expected_from_trips(package_id: str) -> set:
+    packages = rest_get("packages", {"select": "options", "id": f"eq.{package_id}"})
+    trips = rest_get("trips", {"select": "date", "package_id": f"eq.{package_id}", "status": "eq.scheduled"})
+    return bookable_dates(packages[0] if packages else None, trips)
+
+
+def is_package_response(response) -> bool:
+    return "/rest/v1/packages" in response.url and "id=eq." in response.url
+
+
+def is_trips_response(response) -> bool:
+    return "/rest/v1/trips" in response.url and "package_id=eq." in response.url
+
+
+def expected_from_api(tour_id: str) -> set:
+    pool = ConnectionPool(base_url())
+    dates, page = set(), 1
+    try:
+        while True:
+            status, body, _ = pool.request("GET", f"/api/v1/tours/{tour_id}/schedules?page={page}&limit=200")
+            if status != 200:
+                raise RuntimeError(f"schedules API returned {status}")
+            data = json.loads(body)["data"]
+            for schedule in data["items"]:
+                if schedule["status"] in BOOKABLE_STATUSES and schedule["available_capacity"] > 0:
+                    dates.add(schedule["start_date"])
+            if page >= data["pagination"]["totalPages"]:
+                return dates
+            page += 1
+    finally:
+        pool.close()
+
+
+def read_month(page: Page) -> dict:
+    """{"month": date(first of month), "cells": [{"date", "disabled", "dot", "selected"}]}"""
+    grid = page.evaluate(MONTH_GRID_JS)
+    if not grid:
+        return None
+    first = datetime.strptime(grid["month"].strip(), "%B %Y").date()
+    for cell in grid["cells"]:
+        cell["date"] = first.replace(day=cell["day"]).isoformat()
+    return {"month": first, "cells": grid["cells"]}
+
+
+def next_month(page: Page, current: date) -> bool:
+    button = page.locator('button[aria-label="Next month"]').first
+    if not button.is_visible() or button.is_disabled():
+        return False
+    button.click()
+    label = f"{current.replace(year=current.year + current.month // 12, month=current.month % 12 + 1):%B %Y}"
+    try:
+        page.locator(f'div.font-semibold:text-is("{label}")').first.wait_for(state="visible", timeout=3_000)
+    except PlaywrightTimeoutError:
+        return False
+    return True
+
+
+def probe(page: Page, cell: dict, mismatch: str) -> dict:
+    """Click a disagreeing date (when enabled) and record what the page offers"""
+    result = {"date": cell["date"], "mismatch": mismatch, "disabled": cell["disabled"],
+              "options": None, "time_slots": None, "evidence": None}
+    if cell["disabled"]:
+        return result
+    box = page.locator('div.rounded-xl:has-text("Green dots = available")').last
+    box.locator("div.grid.grid-cols-7").last.locator(":scope > button").nth(cell["day"] - 1).click()
+    wait_for_options(page, timeout=3_000)
+    result["options"] = page.locator('input[name="package-option"]').count()
+    result["time_slots"] = page.locator('label:has(input[name="package-option"]) button').count()
+    result["evidence"] = evidence.capture(page, f"/tmp/qa_calendar_{cell['date']}.png",
+                                          f"calendar mismatch {mismatch}", failure=True)
+    page.keyboard.press("Escape")
+    return result
+
+
+def sweep(page: Page, expected: set, months: int = 3) -> dict:
+    """Compare `months` calendar months with the expected dates, starting at the shown month"""
+    report = {"months": [], "dates_checked": 0, "mismatches": [], "probes": [], "past_available": []}
+    today = date.today().isoformat()
+    for index in range(months):
+        grid = read_month(page)
+        if not grid:
+            report["error"] = "Calendar grid not found"
+            break
+        report["months"].append(f"{grid['month']:%Y-%m}")
+        for cell in grid["cells"]:
+            report["dates_checked"] += 1
+            shown = not cell["disabled"]
+            should = cell["date"] in expected
+            if shown and cell["date"] < today:
+                report["past_available"].append(cell["date"])
+            if shown == should:
+                continue
+            mismatch = "marker_without_schedule" if shown else "schedule_without_marker"
+            report["mismatches"].append({"date": cell["date"], "mismatch": mismatch})
+            report["probes"].append(probe(page, cell, mismatch))
+        if index + 1 < months and not next_month(page, grid["month"]):
+            break
+    return report
+
+
+def run(url: str = None, months: int = 3, source: str = "trips", slow_mo: int = 0, tour_id: str = None) -> dict:
+    with sync_playwright() as p:
+        browser = launch(p, slow_mo=slow_mo)
+        page = new_page(browser)
+        try:
+            if not url:
+                page.goto(f"{base_url()}/destinations")
+                page.wait_for_load_state("networkidle")
+                href = page.locator('a[href*="/destinations/"]:not([href="/destinations"])').first.get_attribute("href")
+                url = urllib.parse.urljoin(f"{base_url()}/", href)
+            package_id = package_id_from_url(url)
+            from_page = source == "trips" and not (supabase_url() and supabase_anon_key())
+            if source == "api":
+                expected = expected_from_api(tour_id)
+            elif not from_page:
+                expected = expected_from_trips(package_id)
+
+            if from_page:
+                print("⚠ No Supabase credentials; using the page's own packages/trips responses")
+                with page.expect_response(is_package_response) as package_info, \
+                        page.expect_response(is_trips_response) as trips_info:
+                    page.goto(url)
+                package = package_info.value.json()
+                package = (package[0] if package else None) if isinstance(package, list) else package
+                expected = bookable_dates(package, trips_info.value.json())
+            else:
+                with expect_schedules(page):
+                    page.goto(url)
+            page.locator('button:has-text("Choose Date")').first.click()
+            wait_for_calendar(page)
+
+            report = sweep(page, expected, months)
+            report.update(url=url, package_id=package_id, tour_id=tour_id, source=source,
+                          expected_dates=len(expected))
+        finally:
+            browser.close()
+    report["evidence_manifest"] = evidence.manifest()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-check a destination's calendar against its schedules")
+    parser.add_argument("--url", help="Destination detail URL (default: the first destination)")
+    parser.add_argument("--months", type=int, default=3)
+    parser.add_argument("--source", choices=SOURCES, default="trips")
+    parser.add_argument("--tour-id", help="Tour whose schedules back the page (required with --source api)")
+    parser.add_argument("--report", default=DEFAULT_REPORT)
+    args = parser.parse_args()
+    if args.source == "api" and not args.tour_id:
+        parser.error("--source api needs --tour-id: destination pages are packages, schedules belong to tours")
+
+    print("\n" + "="*80)
+    print(f"Calendar sweep ({args.months} months, source: {args.source})")
+    print("="*80)
+    report = run(args.url, args.months, args.source, tour_id=args.tour_id)
+
+    print(f"{report['url']}: {report['dates_checked']} dates in {', '.join(report['months'])}, "
+          f"{report['expected_dates']} bookable dates expected")
+    for item in report["probes"]:
+        detail = "disabled" if item["disabled"] else f"{item['options']} options, {item['time_slots']} time slots"
+        print(f"❌ {item['date']} {item['mismatch']} ({detail})")
+    if report["past_available"]:
+        print(f"⚠ {len(report['past_available'])} past dates still marked available")
+    if not report["mismatches"] and not report.get("error"):
+        print("✅ Every date's marker matches the schedule")
+
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"\n✅ Report saved to {args.report}")
+    return report
+
+
+if __name__ == "__main__":
+    report = main()
+    raise SystemExit(1 if report["mismatches"] or report.get("error") else 0)
@@ -0,0 +1,214 @@
+"""
+Overbooking race harness for tour_schedules.available_capacity.
+
+lib/supabase/schedules.ts:updateAvailableCapacity reads available_capacity
+in one PostgREST call and writes `current + delta` in a second one, so two
+bookings that interleave both write from the same stale value and one
+decrement is lost. This harness fires N concurrent bookings (delta = -pax)
+at one schedule on the local Postgres stand-in (qa.pg) and compares the
+final capacity with the expected one.
+
+Strategies, so a fix can be measured against the current behaviour:
+
+    probe    SELECT, then UPDATE to the computed value, each autocommitted
+             (what updateAvailableCapacity does today)
+    atomic   one UPDATE ... SET available_capacity = available_capacity + delta
+    locked   SELECT ... FOR UPDATE and UPDATE in one transaction
+
+No API route calls updateAvailableCapacity yet, so the harness issues the
+same statements the two PostgREST calls produce. --gap-ms stands in for the
+HTTP round trip between them.
+
+Usage:
+    python -m qa.capacity_race --bookings 200 --workers 32
+    python -m qa.capacity_race --modes probe atomic locked --fail-on-loss atomic locked
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from qa import pg
+from qa.stats import summarize
+
+DEFAULT_REPORT = "/tmp/qa_capacity_race_report.json"
+MODES = ("probe", "atomic", "locked")
+
+
+def create_schedule(conn, capacity: int) -> tuple:
+    """(tour_id, schedule_id) of a fresh open schedule with `capacity` seats"""
+    tour_id = pg.fetch_one(conn, """
+        insert into public.tours (name, slug, destination, status)
+        values ('QA capacity race', %s, 'QA', 'published')
+        returning id
+    """, (f"qa-capacity-race-{uuid.uuid4().hex[:12]}",))[0]
+    schedule_id = pg.fetch_one(conn, """
+        insert into public.tour_schedules (tour_id, start_date, total_capacity, available_capacity)
+        values (%s, %s, %s, %s)
+        returning id
+    """, (tour_id, date.today() + timedelta(days=30), capacity, capacity))[0]
+    return tour_id, schedule_id
+
+
+def book_probe(conn, schedule_id, delta: int, gap_s: float):
+    row = pg.fetch_one(conn, "select available_capacity from public.tour_schedules where id = %s", (schedule_id,))
+    new_capacity = (row[0] if row else 0) + delta
+    if gap_s:
+        time.sleep(gap_s)
+    if new_capacity <= 0:
+        pg.execute(conn, "update public.tour_schedules set available_capacity = %s, status = 'full' "
+                         "where id = %s returning *", (max(0, new_capacity), schedule_id))
+    else:
+        pg.execute(conn, "update public.tour_schedules set available_capacity = %s "
+                         "where id = %s returning *", (new_capacity, schedule_id))
+
+
+def book_atomic(conn, schedule_id, delta: int, gap_s: float):
+    pg.execute(conn, """
+        update public.tour_schedules
+        set available_capacity = greatest(0, available_capacity + %s),
+            status = case when available_capacity + %s <= 0 then 'full' else status end
+        where id = %s
+        returning *
+    """, (delta, delta, schedule_id))
+
+
+def book_locked(conn, schedule_id, delta: int, gap_s: float):
+    conn.autocommit = False
+    try:
+        row = pg.fetch_one(conn, "select available_capacity from public.tour_schedules "
+                                 "where id = %s for update", (schedule_id,))
+        new_capacity = (row[0] if row else 0) + delta
+        if gap_s:
+            time.sleep(gap_s)
+        pg.execute(conn, """
+            update public.tour_schedules
+            set available_capacity = %s,
+                status = case when %s <= 0 then 'full' else status end
+            where id = %s
+            returning *
+        """, (max(0, new_capacity), new_capacity, schedule_id))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.autocommit = True
+
+
+STRATEGIES = {"probe": book_probe, "atomic": book_atomic, "locked": book_locked}
+
+
+def run_race(mode: str, bookings: int, workers: int, pax: int, gap_ms: float) -> dict:
+    admin = pg.connect()
+    capacity = bookings * pax + pax
+    tour_id, schedule_id = create_schedule(admin, capacity)
+    book = STRATEGIES[mode]
+    gap_s = gap_ms / 1000
+
+    local = threading.local()
+    connections = []
+    lock = threading.Lock()
+    latencies, errors = [], []
+
+    def worker_conn():
+        if not hasattr(local, "conn"):
+            local.conn = pg.connect()
+            with lock:
+                connections.append(local.conn)
+        return local.conn
+
+    def one_booking(_):
+        conn = worker_conn()
+        started = time.perf_counter()
+        try:
+            book(conn, schedule_id, -pax, gap_s)
+        except Exception as e:
+            with lock:
+                errors.append(f"{type(e).__name__}: {e}")
+            return
+        with lock:
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Open the worker connections before the clock starts
+            list(executor.map(lambda _: worker_conn(), range(workers)))
+            started = time.perf_counter()
+            list(executor.map(one_booking, range(bookings)))
+            elapsed = time.perf_counter() - started
+
+        final = pg.fetch_one(admin, "select available_capacity, status from public.tour_schedules "
+                                    "where id = %s", (schedule_id,))
+    finally:
+        for conn in connections:
+            conn.close()
+        pg.execute(admin, "delete from public.tours where id = %s", (tour_id,))
+        admin.close()
+
+    succeeded = len(latencies)
+    expected = capacity - succeeded * pax
+    lost = (final[0] - expected) // pax
+    return {
+        "mode": mode,
+        "bookings": bookings,
+        "workers": workers,
+        "pax": pax,
+        "gap_ms": gap_ms,
+        "initial_capacity": capacity,
+        "expected_capacity": expected,
+        "final_capacity": final[0],
+        "final_status": final[1],
+        "lost_updates": lost,
+        "lost_update_rate": round(lost / succeeded, 4) if succeeded else 0,
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "elapsed_s": round(elapsed, 3),
+        "throughput_bps": round(succeeded / elapsed, 2) if elapsed else 0,
+        "latency": summarize(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent overbooking race on one tour schedule")
+    parser.add_argument("--modes", nargs="*", choices=MODES, default=list(MODES))
+    parser.add_argument("--bookings", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--pax", type=int, default=1)
+    parser.add_argument("--gap-ms", type=float, default=5, help="Delay between read and write (HTTP round trip)")
+    parser.add_argument("--fail-on-loss", nargs="*", choices=MODES, default=[],
+                        help="Exit 1 if these modes lose any update")
+    parser.add_argument("--report", default=DEFAULT_REPORT)
+    args = parser.parse_args()
+
+    pg.prepare().close()
+
+    print("\n" + "="*80)
+    print(f"Capacity race: {args.bookings} bookings × {args.pax} pax on {args.workers} workers")
+    print("="*80)
+
+    report = {"dsn": pg.dsn().rsplit("@", 1)[-1], "runs": []}
+    for mode in args.modes:
+        run = run_race(mode, args.bookings, args.workers, args.pax, args.gap_ms)
+        report["runs"].append(run)
+        status = "✓" if run["lost_updates"] == 0 else "❌"
+        print(f"{status} {mode:<7} final {run['final_capacity']} (expected {run['expected_capacity']})  "
+              f"lost {run['lost_updates']} ({run['lost_update_rate']:.1%})  "
+              f"{run['throughput_bps']} bookings/s  p95 {run['latency'].get('p95_ms', 0)}ms  "
+              f"errors {run['errors']}")
+
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"\n✅ Report saved to {args.report}")
+
+    failed = [r["mode"] for r in report["runs"] if r["mode"] in args.fail_on_loss and r["lost_updates"]]
+    return report, failed
+
+
+if __name__ == "__main__":
+    _, failed = main()
+    raise SystemExit(1 if failed else 0)
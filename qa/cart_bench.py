@@ -0,0 +1,228 @@
+"""
+Large-cart benchmark for /cart and the local-cart storage helpers.
+
+Every cart mutation re-serializes the whole array into 6cat_cart_v1 and
+fires 6cat-cart-updated, and the page re-renders every card. For each
+--sizes entry the cart is pre-filled with that many items (a mix of tier,
+flat-rate, split and plain pricing, built by qa.cart_fuzz) and measured:
+
+    render_ms       navigation start to the last card painted
+    update_ms       + / - click to the summary Total updating (qa.interactions)
+    write_ms        click to setLocalCart's write returning: the handler's
+                    recalculation, JSON.stringify and localStorage.setItem
+    set_item_ms     localStorage.setItem alone
+    storage_bytes   size of the 6cat_cart_v1 value (UTF-16, as browsers count)
+    js_heap_bytes   JSHeapUsedSize from CDP after a forced GC
+
+The report includes each metric's growth factor per 10× more items (1.0 is
+flat, 10.0 linear) and a text chart, so the scaling shows at a glance.
+
+Usage:
+    python -m qa.cart_bench                       # 10, 100, 1000 items
+    python -m qa.cart_bench --sizes 10 100 1000 5000 --runs 5 --updates 20
+"""
+
+import argparse
+import json
+import math
+import random
+import statistics
+
+from playwright.sync_api import Page, sync_playwright
+
+from qa import pricing
+from qa.browser import launch, new_page
+from qa.cart_fuzz import CART_KEY, make_item
+from qa.config import base_url
+from qa.interactions import CART_STEPPER, CART_TOTAL, Recorder, measure
+from qa.stats import summarize
+
+DEFAULT_REPORT = "/tmp/qa_cart_bench_report.json"
+METRICS = ("render_ms", "update_p50_ms", "write_p50_ms", "storage_bytes", "js_heap_bytes")
+
+RENDER_JS = r"""
+([selector, count]) => new Promise((resolve) => {
+  const done = () => document.querySelectorAll(selector).length >= count;
+  const finish = () => requestAnimationFrame(() => setTimeout(() => resolve(performance.now()), 0));
+  if (done()) return finish();
+  const observer = new MutationObserver(() => {
+    if (!done()) return;
+    observer.disconnect();
+    finish();
+  });
+  observer.observe(document.body, { subtree: true, childList: true });
+})
+"""
+
+# Time the next click up to the end of its localStorage.setItem call
+WRITE_PROBE_JS = r"""
+() => {
+  const state = (window.__qaWrite = { clickAt: null, ms: null, setItemMs: null });
+  if (!window.__qaSetItem) {
+    const original = (window.__qaSetItem = Storage.prototype.setItem);
+    Storage.prototype.setItem = function (key, value) {
+      const started = performance.now();
+      const result = original.call(this, key, value);
+      const probe = window.__qaWrite;
+      if (probe && probe.clickAt !== null && probe.ms === null) {
+        const now = performance.now();
+        probe.setItemMs = now - started;
+        probe.ms = now - probe.clickAt;
+      }
+      return result;
+    };
+  }
+  document.addEventListener('click', () => { state.clickAt = performance.now(); }, { capture: true, once: true });
+}
+"""
+
+
+def build_cart(size: int, seed: int = 0) -> list:
+    """`size` distinct items, stored as addLocalCartItem would store them"""
+    rng = random.Random(seed)
+    cart = []
+    for n in range(size):
+        item = make_item(rng, n)
+        item.update(packageId=f"pkg-{n}", tripId=f"trip-{n}")
+        cart.append(pricing.recalculate_local_cart_item(item, item["pax"]))
+    return json.loads(json.dumps(cart))
+
+
+def stepped_index(cart: list) -> int:
+    """Item nearest the middle whose total moves both ways: not flat-rate, minPax < pax < maxPax"""
+    def steppable(item):
+        high = pricing.cart_max_pax(item)
+        return (not item.get("isFlatRate") and item["pax"] > pricing.cart_min_pax(item)
+                and (high is None or item["pax"] < high))
+
+    middle = len(cart) // 2
+    candidates = [i for i, item in enumerate(cart) if steppable(item)]
+    return min(candidates, key=lambda i: abs(i - middle)) if candidates else middle
+
+
+def heap_bytes(page: Page):
+    try:
+        session = page.context.new_cdp_session(page)
+        session.send("HeapProfiler.collectGarbage")
+        session.send("Performance.enable")
+        metrics = session.send("Performance.getMetrics")["metrics"]
+        session.detach()
+        return next((int(m["value"]) for m in metrics if m["name"] == "JSHeapUsedSize"), None)
+    except Exception:
+        return None
+
+
+def render(page: Page, size: int) -> float:
+    """Reload /cart and return ms from navigation start to the last card painted"""
+    page.reload(wait_until="commit")
+    return page.evaluate(RENDER_JS, [CART_STEPPER, size])
+
+
+def bench_size(page: Page, size: int, runs: int, updates: int) -> dict:
+    cart = build_cart(size)
+    page.evaluate("([key, cart]) => localStorage.setItem(key, JSON.stringify(cart))", [CART_KEY, cart])
+    storage_chars = page.evaluate("key => localStorage.getItem(key).length", CART_KEY)
+
+    renders = [render(page, size) for _ in range(runs)]
+    heap = heap_bytes(page)
+
+    # Step a card near the middle so every update re-renders the cards around it
+    stepper = page.locator(CART_STEPPER).nth(stepped_index(cart))
+    buttons = stepper.locator("button")
+    recorder, writes, set_items = Recorder(), [], []
+    for _ in range(updates):
+        for name, button in (("plus", buttons.last), ("minus", buttons.first)):
+            if button.is_disabled():
+                continue
+            page.evaluate(WRITE_PROBE_JS)
+            recorder.add(name, measure(page, button, CART_TOTAL))
+            probe = page.evaluate("() => window.__qaWrite")
+            if probe["ms"] is not None:
+                writes.append(probe["ms"])
+                set_items.append(probe["setItemMs"])
+    samples = [s for group in recorder.samples.values() for s in group if s["changed"]]
+
+    render_summary = summarize(renders)
+    update = summarize([s["paint_ms"] for s in samples])
+    write = summarize(writes)
+    return {
+        "items": size,
+        "render": render_summary,
+        "update": update,
+        "write": write,
+        "set_item": summarize(set_items),
+        "unchanged_updates": sum(len(group) for group in recorder.samples.values()) - len(samples),
+        "storage_bytes": storage_chars * 2,
+        "js_heap_bytes": heap,
+        "render_ms": render_summary.get("p50_ms"),
+        "update_p50_ms": update.get("p50_ms"),
+        "write_p50_ms": write.get("p50_ms"),
+    }
+
+
+def growth(results: list) -> dict:
+    """Per metric: factor per 10× items, from a log-log fit over the sizes"""
+    factors = {}
+    for metric in METRICS:
+        points = [(math.log10(r["items"]), math.log10(r[metric])) for r in results if r.get(metric)]
+        if len(points) < 2:
+            factors[metric] = None
+            continue
+        mean_x = statistics.mean(x for x, _ in points)
+        mean_y = statistics.mean(y for _, y in points)
+        spread = sum((x - mean_x) ** 2 for x, _ in points)
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / spread if spread else 0
+        factors[metric] = round(10 ** slope, 2)
+    return factors
+
+
+def chart(results: list, metric: str, width: int = 40) -> list:
+    top = max((r[metric] or 0) for r in results) or 1
+    return [f"  {r['items']:>6} items |{'█' * max(1, round((r[metric] or 0) / top * width)):<{width}}| {r[metric]}"
+            for r in results]
+
+
+def run(sizes: list, runs: int = 3, updates: int = 10) -> dict:
+    report = {"sizes": sizes, "runs": runs, "updates": updates, "results": []}
+    with sync_playwright() as p:
+        browser = launch(p)
+        page = new_page(browser)
+        try:
+            page.goto(f"{base_url()}/cart")
+            for size in sizes:
+                report["results"].append(bench_size(page, size, runs, updates))
+                print(f"✓ {size} items measured")
+            page.evaluate("key => localStorage.removeItem(key)", CART_KEY)
+        finally:
+            browser.close()
+    report["growth_per_10x"] = growth(report["results"])
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /cart with 10, 100 and 1,000 items")
+    parser.add_argument("--sizes", nargs="*", type=int, default=[10, 100, 1_000])
+    parser.add_argument("--runs", type=int, default=3, help="Page renders per size")
+    parser.add_argument("--updates", type=int, default=10, help="+/- pairs per size")
+    parser.add_argument("--report", default=DEFAULT_REPORT)
+    args = parser.parse_args()
+
+    print("\n" + "="*80)
+    print(f"Large-cart benchmark: {', '.join(str(s) for s in args.sizes)} items")
+    print("="*80)
+    report = run(sorted(args.sizes), args.runs, args.updates)
+
+    for metric in METRICS:
+        factor = report["growth_per_10x"][metric]
+        print(f"\n{metric} (×{factor} per 10× items)" if factor else f"\n{metric}")
+        for line in chart(report["results"], metric):
+            print(line)
+
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Report saved to {args.report}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
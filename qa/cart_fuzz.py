@@ -0,0 +1,360 @@
+"""
+Stateful model check of the /cart page against qa.pricing.
+
+Generates long random sequences of cart operations and runs each one on
+the real cart page and on qa.pricing's port of local-cart.ts in lockstep:
+
+    add      write the item to 6cat_cart_v1 the way addLocalCartItem does
+             (merging same package/trip/option), fire 6cat-cart-updated and
+             remount /cart - the page only reads the cart on mount
+    inc/dec  the card's + / - button, clicked with element.click() inside
+             the page (no pointer events, no actionability waits)
+    remove   the card's Remove item button
+
+Runs of inc/dec/remove go to the page in one evaluate call; after each
+click the driver waits for React to re-render the card before the next one
+(the handlers read the rendered `items`). After every step the stored cart
+must equal the model - pax, passengers (the adult-delta rule, child/infant
+kept), unitPrice, totalPrice, flat-rate fields - a disabled button must be
+a no-op in both, and the summary Total must equal the model's.
+
+Items mix tier pricing, flat-rate (private) pricing, adult/child/infant
+split pricing and plain per-person pricing, with random minPax/maxPax.
+
+The first failing sequence is cut at the failing step and shrunk with
+ddmin to a minimal reproduction, which goes in the report.
+
+Usage:
+    python -m qa.cart_fuzz                          # 20 sequences of 200 steps
+    python -m qa.cart_fuzz --sequences 100 --length 500 --seed 7
+"""
+
+import argparse
+import json
+import math
+import random
+import time
+
+from playwright.sync_api import Page, sync_playwright
+
+from qa import pricing
+from qa.browser import launch, new_page
+from qa.config import base_url
+from qa.interactions import CART_STEPPER, CART_TOTAL
+
+DEFAULT_REPORT = "/tmp/qa_cart_fuzz_report.json"
+CART_KEY = "6cat_cart_v1"
+CART_EVENT = "6cat-cart-updated"
+OP_WEIGHTS = {"add": 14, "inc": 40, "dec": 36, "remove": 10}
+COMPARED = ("id", "pax", "passengers", "unitPrice", "totalPrice", "isFlatRate", "flatRatePrice")
+
+DRIVE_JS = r"""
+async ([ops, stepperSelector, totalSelector, cartKey, cartEvent]) => {
+  const read = () => JSON.parse(localStorage.getItem(cartKey) || '[]');
+  const tick = () => new Promise((resolve) => {
+    const channel = new MessageChannel();
+    channel.port1.onmessage = () => resolve();
+    channel.port2.postMessage(0);
+  });
+  const steppers = () => Array.from(document.querySelectorAll(stepperSelector));
+  const rendered = (cart) => {
+    const rows = steppers();
+    return rows.length === cart.length
+      && rows.every((row, i) => (row.querySelector('div') || {}).textContent === String(cart[i].pax));
+  };
+  let fired = 0;
+  const onUpdate = () => { fired += 1; };
+  window.addEventListener(cartEvent, onUpdate);
+  const results = [];
+  try {
+    for (const [op, index] of ops) {
+      const button = op === 'remove'
+        ? document.querySelectorAll('button[aria-label="Remove item"]')[index]
+        : ((steppers()[index] || document.createElement('div')).querySelectorAll('button'))[op === 'inc' ? 1 : 0];
+      if (!button) {
+        results.push({ missing: true });
+        break;
+      }
+      const before = fired;
+      const disabled = button.disabled;
+      button.click();
+      const cart = read();
+      for (let i = 0; i < 200 && !rendered(cart); i++) await tick();
+      await tick();
+      const total = document.querySelector(totalSelector);
+      results.push({ fired: fired > before, disabled, cart, total: total ? total.textContent : null });
+    }
+  } finally {
+    window.removeEventListener(cartEvent, onUpdate);
+  }
+  return results;
+}
+"""
+
+
+# -- sequences -------------------------------------------------------------
+
+def make_item(rng: random.Random, n: int) -> dict:
+    """A cart item as the destination page builds it, before addLocalCartItem"""
+    kind = rng.choice(("tier", "flat", "split", "plain"))
+    pax = rng.randint(1, 6)
+    base = rng.choice((900, 1200, 1500, 2500))
+    item = {
+        "id": f"fuzz-{n}",
+        "packageId": f"pkg-{rng.randint(1, 3)}",
+        "tripId": f"trip-{rng.randint(1, 3)}",
+        "title": f"Fuzz package {n}",
+        "image": "",
+        "location": "Bangkok",
+        "tripDate": "2026-11-01",
+        "optionId": f"opt-{kind}",
+        "optionName": kind,
+        "pax": pax,
+        "unitPrice": base,
+        "totalPrice": base * pax,
+        "basePrice": base,
+        "minPax": rng.choice((None, 1, 1, 2)),
+        "maxPax": rng.choice((None, None, 0, 8, pax + 2)),
+    }
+    if kind == "tier":
+        tiers, low = [], 1
+        for _ in range(rng.randint(1, 3)):
+            high = low + rng.randint(0, 4)
+            tiers.append({"minPax": low, "maxPax": high, "pricePerPerson": rng.randint(5, 40) * 100})
+            low = high + 1 + rng.randint(0, 1)
+        if rng.random() < 0.5:
+            tiers[-1]["maxPax"] = None
+        item["pricingTiers"] = tiers
+    elif kind == "flat":
+        item.update(isFlatRate=True, flatRatePrice=rng.choice((4500, 6000, 12000)),
+                    passengers={"adult": pax, "child": 0, "infant": 0})
+    elif kind == "split":
+        children, infants = rng.randint(0, 2), rng.randint(0, 1)
+        adults = max(1, pax - children - infants)
+        item.update(pax=adults + children + infants,
+                    passengers={"adult": adults, "child": children, "infant": infants},
+                    adultUnitPrice=base, childUnitPrice=rng.choice((base // 2, base)),
+                    infantUnitPrice=rng.choice((0, 0, 300)))
+        if rng.random() < 0.3:
+            del item["childUnitPrice"]
+    return item
+
+
+def make_sequence(rng: random.Random, length: int) -> list:
+    """[("add", item) | ("inc"|"dec"|"remove", k)]; k is taken modulo the cart size"""
+    ops = [("add", make_item(rng, i)) for i in range(rng.randint(1, 3))]
+    names, weights = zip(*OP_WEIGHTS.items())
+    while len(ops) < length:
+        op = rng.choices(names, weights)[0]
+        ops.append(("add", make_item(rng, len(ops))) if op == "add" else (op, rng.randrange(1_000)))
+    return ops
+
+
+# -- model -----------------------------------------------------------------
+
+def model_step(cart: list, op: str, index: int) -> tuple:
+    """(cart after the click, whether the page should write the cart)"""
+    item = cart[index]
+    if op == "remove":
+        return cart[:index] + cart[index + 1:], True
+    if op == "inc":
+        high = pricing.cart_max_pax(item)
+        if high is not None and item["pax"] >= high:
+            return cart, False
+        return cart[:index] + [pricing.recalculate_local_cart_item(item, item["pax"] + 1)] + cart[index + 1:], True
+    if item["pax"] <= pricing.cart_min_pax(item):
+        return cart, False
+    return cart[:index] + [pricing.recalculate_local_cart_item(item, item["pax"] - 1)] + cart[index + 1:], True
+
+
+def _same(a, b) -> bool:
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if pricing._is_number(a) and pricing._is_number(b):
+        return abs(a - b) < 0.005
+    return a == b
+
+
+def diff_carts(expected: list, actual: list) -> list:
+    if len(expected) != len(actual):
+        return [f"{len(actual)} items stored, expected {len(expected)}"]
+    problems = []
+    for position, (want, got) in enumerate(zip(expected, actual)):
+        for field in COMPARED:
+            if not _same(want.get(field), got.get(field)):
+                problems.append(f"item {position} ({want.get('optionName')}) {field}: "
+                                f"{got.get(field)!r} != expected {want.get(field)!r}")
+    return problems
+
+
+# -- driving the page ------------------------------------------------------
+
+def load_cart(page: Page, cart: list):
+    """Store `cart`, fire the cart event and remount /cart"""
+    page.evaluate("([key, event, cart]) => { localStorage.setItem(key, JSON.stringify(cart));"
+                  " window.dispatchEvent(new Event(event)); }", [CART_KEY, CART_EVENT, cart])
+    page.reload()
+    if cart:
+        page.locator(CART_STEPPER).nth(len(cart) - 1).wait_for(state="visible", timeout=5_000)
+    else:
+        page.wait_for_load_state("domcontentloaded")
+
+
+def execute(page: Page, ops: list, stats: dict = None) -> dict:
+    """Run ops on the page and the model; the first mismatch, or None"""
+    load_cart(page, [])
+    model = []
+    position = 0
+
+    def fail(step, problems, op):
+        return {"step": step, "op": op[0], "problems": problems}
+
+    while position < len(ops):
+        op, arg = ops[position]
+        if op == "add":
+            model = json.loads(json.dumps(pricing.add_local_cart_item(model, arg)))
+            load_cart(page, model)
+            stored = page.evaluate("key => JSON.parse(localStorage.getItem(key) || '[]')", CART_KEY)
+            problems = diff_carts(model, stored)
+            if problems:
+                return fail(position, problems, ops[position])
+            position += 1
+            if stats is not None:
+                stats["steps"] += 1
+            continue
+
+        batch, expected, start = [], [], position
+        while position < len(ops) and ops[position][0] != "add":
+            op, arg = ops[position]
+            if model:
+                index = arg % len(model)
+                model, writes = model_step(model, op, index)
+                batch.append([op, index])
+                expected.append((position, model, writes))
+            position += 1
+        if not batch:
+            continue
+        results = page.evaluate(DRIVE_JS, [batch, CART_STEPPER, CART_TOTAL, CART_KEY, CART_EVENT])
+        if stats is not None:
+            stats["steps"] += len(results)
+        for (step, cart, writes), result in zip(expected, results):
+            if result.get("missing"):
+                return fail(step, ["button not found"], ops[step])
+            problems = diff_carts(cart, result["cart"])
+            if result["fired"] != writes:
+                problems.append(f"cart write {'missing' if writes else 'unexpected'} "
+                                f"(button {'disabled' if result['disabled'] else 'enabled'})")
+            total = pricing.cart_summary(cart)["total"]
+            shown = pricing.parse_amount(result["total"]) if result["total"] else (0 if not cart else None)
+            if not pricing.same_amount(shown, total):
+                problems.append(f"summary total {result['total']!r} != expected {total}")
+            if problems:
+                return fail(step, problems, ops[step])
+        if len(results) < len(batch):
+            return fail(start, ["page stopped responding to clicks"], ops[start])
+    return None
+
+
+def ddmin(ops: list, fails, budget: int) -> tuple:
+    """(smallest failing subsequence found, test runs used)"""
+    runs = 0
+    n = 2
+    while len(ops) >= 2 and runs < budget:
+        chunk = math.ceil(len(ops) / n)
+        subsets = [ops[i:i + chunk] for i in range(0, len(ops), chunk)]
+        reduced = False
+        for i, subset in enumerate(subsets):
+            complement = [op for j, other in enumerate(subsets) if j != i for op in other]
+            for candidate, next_n in ((subset, 2), (complement, max(n - 1, 2))):
+                runs += 1
+                if fails(candidate):
+                    ops, n, reduced = candidate, next_n, True
+                    break
+                if runs >= budget:
+                    break
+            if reduced or runs >= budget:
+                break
+        if not reduced:
+            if n >= len(ops):
+                break
+            n = min(len(ops), n * 2)
+    return ops, runs
+
+
+def describe_op(op: tuple) -> str:
+    name, arg = op
+    if name == "add":
+        return f"add {arg['optionName']} {arg['packageId']}/{arg['tripId']} pax={arg['pax']} " \
+               f"min={arg['minPax']} max={arg['maxPax']}"
+    return f"{name} #{arg}"
+
+
+def run(sequences: int = 20, length: int = 200, seed: int = 0, shrink_runs: int = 200) -> dict:
+    rng = random.Random(seed)
+    report = {"seed": seed, "sequences": 0, "length": length, "failure": None}
+    stats = {"steps": 0}
+    with sync_playwright() as p:
+        browser = launch(p)
+        page = new_page(browser)
+        try:
+            page.goto(f"{base_url()}/cart")
+            started = time.perf_counter()
+            for number in range(sequences):
+                ops = make_sequence(rng, length)
+                report["sequences"] += 1
+                failure = execute(page, ops, stats)
+                if failure:
+                    prefix = ops[:failure["step"] + 1]
+                    shrunk, runs = ddmin(prefix, lambda candidate: execute(page, candidate) is not None,
+                                         shrink_runs)
+                    report["failure"] = dict(failure, sequence=number, original_length=len(ops),
+                                             shrink_runs=runs, reproduction=shrunk,
+                                             reproduction_failure=execute(page, shrunk))
+                    break
+            elapsed = time.perf_counter() - started
+        finally:
+            browser.close()
+    report["steps"] = stats["steps"]
+    report["duration_s"] = round(elapsed, 2)
+    report["steps_per_minute"] = round(stats["steps"] / elapsed * 60) if elapsed else None
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model-check /cart against qa.pricing with random operation sequences")
+    parser.add_argument("--sequences", type=int, default=20)
+    parser.add_argument("--length", type=int, default=200, help="Operations per sequence")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--shrink-runs", type=int, default=200, help="Replay budget for shrinking a failure")
+    parser.add_argument("--report", default=DEFAULT_REPORT)
+    args = parser.parse_args()
+
+    print("\n" + "="*80)
+    print(f"Cart model check: {args.sequences} sequences × {args.length} operations (seed {args.seed})")
+    print("="*80)
+    report = run(args.sequences, args.length, args.seed, args.shrink_runs)
+
+    print(f"⏱  {report['steps']} steps in {report['duration_s']}s ({report['steps_per_minute']} steps/min)")
+    failure = report["failure"]
+    if failure:
+        print(f"❌ Sequence {failure['sequence']} failed at step {failure['step']} ({failure['op']}):")
+        for problem in failure["problems"]:
+            print(f"  - {problem}")
+        print(f"\n🔎 Minimal reproduction ({len(failure['reproduction'])} of {failure['original_length']} "
+              f"operations, {failure['shrink_runs']} replays):")
+        for op in failure["reproduction"]:
+            print(f"  {describe_op(op)}")
+        for problem in (failure["reproduction_failure"] or {}).get("problems", []):
+            print(f"  ❌ {problem}")
+    else:
+        print(f"✅ {report['sequences']} sequences matched the model")
+
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Report saved to {args.report}")
+    return report
+
+
+if __name__ == "__main__":
+    report = main()
+    raise SystemExit(1 if report["failure"] else 0)
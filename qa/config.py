@@ -0,0 +1,70 @@
+"""
+Run-time settings for the QA flows.
+
+Settings come from the environment so that the runner can hand them to its
+worker processes unchanged:
+
+    QA_BASE_URL   app under test (default http://localhost:3000)
+    QA_FAST=1     headless, no slow_mo - for CI and local regression runs
+    QA_HEADLESS=1 headless but keep each flow's slow_mo pacing
+
+Supabase keys are read from the environment, falling back to .env.local the
+same way the seed scripts do.
+"""
+
+import os
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+VIEWPORT = {"width": 1920, "height": 1080}
+
+
+def _flag(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def base_url() -> str:
+    return os.environ.get("QA_BASE_URL", "http://localhost:3000").rstrip("/")
+
+
+def fast_mode() -> bool:
+    return _flag("QA_FAST")
+
+
+def launch_options(slow_mo: int = 0) -> dict:
+    """chromium.launch() kwargs: a flow's own slow_mo unless fast mode is on"""
+    if fast_mode():
+        return {"headless": True, "slow_mo": 0}
+    return {"headless": _flag("QA_HEADLESS"), "slow_mo": slow_mo}
+
+
+def load_env_local(path: Path = ROOT / ".env.local") -> dict:
+    """KEY=VALUE pairs from .env.local (seed-script rules: skip blanks and #)"""
+    values = {}
+    if not path.exists():
+        return values
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        key, value = line.split("=", 1)
+        if key.strip():
+            values[key.strip()] = value.strip()
+    return values
+
+
+def env(name: str, default: str = "") -> str:
+    """Environment variable, then .env.local, then default"""
+    value = os.environ.get(name)
+    if value:
+        return value
+    return load_env_local().get(name, default)
+
+
+def supabase_url() -> str:
+    return env("NEXT_PUBLIC_SUPABASE_URL").rstrip("/")
+
+
+def supabase_anon_key() -> str:
+    return env("NEXT_PUBLIC_SUPABASE_ANON_KEY")
@@ -0,0 +1,207 @@
+"""
+Dashboard stats benchmark: app-side sums vs the get_dashboard_stats RPC.
+
+getDashboardStats (lib/supabase/dashboard.ts) has two modes:
+
+    rows        four count queries plus every completed payment's amount,
+                summed in the app (the original behaviour, the default)
+    aggregate   one call to the get_dashboard_stats() RPC, which counts and
+                sums in Postgres (GET /api/dashboard/stats?mode=aggregate)
+
+Database level: for each --sizes entry the local Postgres stand-in is
+reseeded with qa.seed and both modes run the same statements the app sends,
+so the cost of shipping payment rows shows up as the data grows. The
+statements run back to back on one connection; the app issues the four rows
+queries in parallel, so this measures database work, not wall time.
+
+HTTP level (--http): both modes of the running app's endpoint, at whatever
+size its database has.
+
+Both levels check that the two modes return the same numbers, with one
+exception. PostgREST caps every response at max-rows (1000 on Supabase), so
+past that many completed payments rows mode only sums the first page and
+under-reports totalRevenue. At the database level stats_rows applies the
+same cap (--max-rows, 0 for none) so it times the fetch the app actually
+gets. Over HTTP the app's own cap applies. Either way a capped rows mode is
+reported as a finding, with the revenue it missed, and only the counts have
+to agree.
+
+Usage:
+    python -m qa.dashboard_bench --sizes 10000 100000 1000000
+    python -m qa.dashboard_bench --no-seed --runs 50
+    python -m qa.dashboard_bench --http --runs 100
+    python -m qa.dashboard_bench --sizes 100000 --max-rows 0
+"""
+
+import argparse
+import json
+import time
+from datetime import date
+
+from qa import pg, seed
+from qa.config import base_url
+from qa.loadgen import ConnectionPool
+from qa.stats import summarize
+
+DEFAULT_REPORT = "/tmp/qa_dashboard_bench_report.json"
+MODES = ("rows", "aggregate")
+FIELDS = ("totalCustomers", "totalBookings", "totalRevenue", "upcomingTrips")
+COUNT_FIELDS = tuple(field for field in FIELDS if field != "totalRevenue")
+
+
+def stats_rows(conn, today: str, max_rows: int = 0) -> tuple:
+    """(stats, payment rows fetched), as getDashboardStats does without a mode, capped like PostgREST"""
+    customers = pg.fetch_one(conn, "select count(*) from public.customers")[0]
+    bookings = pg.fetch_one(conn, "select count(*) from public.bookings")[0]
+    sql = "select amount from public.payments where status = 'completed'"
+    amounts = pg.execute(conn, sql + " limit %s", (max_rows,)) if max_rows else pg.execute(conn, sql)
+    trips = pg.fetch_one(conn, "select count(*) from public.trips where date >= %s", (today,))[0]
+    revenue = sum(float(amount) for (amount,) in amounts)
+    return {"totalCustomers": customers, "totalBookings": bookings,
+            "totalRevenue": revenue, "upcomingTrips": trips}, len(amounts)
+
+
+def stats_aggregate(conn, today: str, max_rows: int = 0) -> tuple:
+    document = pg.fetch_one(conn, "select public.get_dashboard_stats(%s)", (today,))[0]
+    if isinstance(document, str):
+        document = json.loads(document)
+    return {field: float(document[field]) if field == "totalRevenue" else int(document[field])
+            for field in FIELDS}, 0
+
+
+STRATEGIES = {"rows": stats_rows, "aggregate": stats_aggregate}
+
+
+def same_stats(a: dict, b: dict, fields: tuple = FIELDS) -> bool:
+    return all(abs(float(a[f]) - float(b[f])) < 0.01 for f in fields)
+
+
+def check_modes(entry: dict, results: dict, truncated: bool):
+    """Counts always have to agree; revenue only when rows mode wasn't capped at max-rows"""
+    rows, aggregate = results["rows"], results["aggregate"]
+    entry["truncated"] = truncated
+    missing = float(aggregate["totalRevenue"]) - float(rows["totalRevenue"])
+    entry["revenue_missing"] = round(missing, 2) if truncated else 0
+    entry["match"] = same_stats(rows, aggregate, COUNT_FIELDS if truncated else FIELDS)
+
+
+def speedup(entry: dict):
+    """rows p50 / aggregate p50"""
+    rows = entry["modes"]["rows"]["latency"].get("p50_ms")
+    aggregate = entry["modes"]["aggregate"]["latency"].get("p50_ms")
+    return round(rows / aggregate, 2) if rows and aggregate else None
+
+
+def measure(call, runs: int) -> tuple:
+    """(latency summary, last result); one untimed warm-up call first"""
+    call()
+    latencies = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = call()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return summarize(latencies), result
+
+
+def bench_database(conn, label, runs: int, max_rows: int) -> dict:
+    today = date.today().isoformat()
+    sizes = {table: pg.fetch_one(conn, f"select count(*) from public.{table}")[0]
+             for table in ("customers", "bookings", "payments")}
+    completed = pg.fetch_one(conn, "select count(*) from public.payments where status = 'completed'")[0]
+    entry = {"size": label, "rows": sizes, "completed_payments": completed, "modes": {}}
+    results = {}
+    for mode in MODES:
+        latency, (stats, fetched) = measure(lambda: STRATEGIES[mode](conn, today, max_rows), runs)
+        results[mode] = stats
+        entry["modes"][mode] = {"latency": latency, "payment_rows_fetched": fetched, "stats": stats}
+    check_modes(entry, results, bool(max_rows) and completed > max_rows)
+    entry["speedup"] = speedup(entry)
+    return entry
+
+
+def bench_http(runs: int) -> dict:
+    pool = ConnectionPool(base_url())
+    entry = {"size": "app", "base_url": base_url(), "modes": {}}
+    results = {}
+    try:
+        for mode in MODES:
+            path = "/api/dashboard/stats" + ("?mode=aggregate" if mode == "aggregate" else "")
+
+            def call():
+                status, body, _ = pool.request("GET", path)
+                if status != 200:
+                    raise RuntimeError(f"{path} returned {status}: {body[:200]!r}")
+                return json.loads(body)["data"]
+
+            latency, stats = measure(call, runs)
+            results[mode] = stats
+            entry["modes"][mode] = {"latency": latency, "stats": stats}
+    finally:
+        pool.close()
+    # The app's PostgREST caps the payments fetch; the only trace over HTTP is
+    # rows mode falling short on revenue while every count agrees
+    short = float(results["aggregate"]["totalRevenue"]) - float(results["rows"]["totalRevenue"])
+    truncated = short > 0.01 and same_stats(results["rows"], results["aggregate"], COUNT_FIELDS)
+    check_modes(entry, results, truncated)
+    entry["speedup"] = speedup(entry)
+    return entry
+
+
+def print_entry(entry: dict):
+    for mode in MODES:
+        result = entry["modes"][mode]
+        latency = result["latency"]
+        fetched = result.get("payment_rows_fetched")
+        fetched_note = f"  {fetched:,} payment rows fetched" if fetched else ""
+        print(f"  {mode:<10} p50 {latency['p50_ms']:>9.2f}ms  p95 {latency['p95_ms']:>9.2f}ms{fetched_note}")
+    if entry["truncated"]:
+        print(f"  ⚠ rows mode capped at max-rows: totalRevenue short by {entry['revenue_missing']:,.2f}")
+    status = "✓" if entry["match"] else "❌"
+    print(f"  {status} modes agree: {entry['match']}  speedup ×{entry['speedup']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dashboard stats: app-side sums vs the aggregate RPC")
+    parser.add_argument("--sizes", nargs="*", type=int, default=[10_000, 100_000],
+                        help="Bookings to seed for each database run (see qa.seed)")
+    parser.add_argument("--no-seed", action="store_true", help="Benchmark the data already in the database")
+    parser.add_argument("--http", action="store_true", help="Benchmark the running app's endpoint instead")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--max-rows", type=int, default=1000,
+                        help="PostgREST max-rows applied to the rows mode payments fetch (0: no cap)")
+    parser.add_argument("--report", default=DEFAULT_REPORT)
+    args = parser.parse_args()
+
+    print("\n" + "="*80)
+    print("Dashboard stats: rows vs aggregate")
+    print("="*80)
+
+    report = {"runs": args.runs, "max_rows": args.max_rows, "results": []}
+    if args.http:
+        print(f"\nHTTP {base_url()}/api/dashboard/stats")
+        entry = bench_http(args.runs)
+        report["results"].append(entry)
+        print_entry(entry)
+    else:
+        conn = pg.prepare()
+        targets = ["current"] if args.no_seed else args.sizes
+        for size in targets:
+            if size != "current":
+                seed.truncate(conn)
+                seed.seed(conn, size)
+            entry = bench_database(conn, size, args.runs, args.max_rows)
+            report["results"].append(entry)
+            print(f"\n{entry['rows']['bookings']:,} bookings / {entry['rows']['payments']:,} payments")
+            print_entry(entry)
+        conn.close()
+
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"\n✅ Report saved to {args.report}")
+    return report
+
+
+if __name__ == "__main__":
+    report = main()
+    raise SystemExit(0 if all(entry["match"] for entry in report["results"]) else 1)
@@ -0,0 +1,158 @@
+"""
+Screenshot evidence with a capture policy.
+
+QA_EVIDENCE picks the mode:
+
+    full        full-page PNG of every step (default, the old behaviour)
+    viewport    viewport-only PNG
+    jpeg        viewport JPEG, quality adapted to stay under a size budget
+    on-failure  only failure captures are written
+    off         nothing
+
+QA_EVIDENCE_SHOT_KB (default 150) is the per-shot JPEG budget and
+QA_EVIDENCE_TOTAL_MB (default 20) caps a whole flow; once the cap is hit,
+step captures are skipped but failure captures are still written.
+
+The page is captured to bytes on the driving thread (Playwright's sync API
+is single-threaded); writing to disk happens on a background writer thread.
+Call flush() before the flow reports, and put manifest() in the results so
+the report points at the files. A check that fails without raising goes
+through fail(), so on-failure mode still leaves a screenshot of it.
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+from qa.config import fast_mode
+
+MODES = ("full", "viewport", "jpeg", "on-failure", "off")
+MIN_QUALITY = 20
+
+
+def mode() -> str:
+    default = "on-failure" if fast_mode() else "full"
+    value = os.environ.get("QA_EVIDENCE", default).strip().lower()
+    return value if value in MODES else default
+
+
+class EvidenceRecorder:
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._writer = None
+        self.reset()
+
+    def reset(self):
+        """Start a new flow: clear the manifest and re-read the budgets"""
+        self.flush()
+        self.entries = []
+        self.total_bytes = 0
+        self.quality = int(os.environ.get("QA_EVIDENCE_QUALITY", "70"))
+        self.shot_budget = int(os.environ.get("QA_EVIDENCE_SHOT_KB", "150")) * 1024
+        self.total_budget = int(float(os.environ.get("QA_EVIDENCE_TOTAL_MB", "20")) * 1024 * 1024)
+
+    # -- writer thread -----------------------------------------------------
+
+    def _ensure_writer(self):
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._drain, name="qa-evidence-writer", daemon=True)
+            self._writer.start()
+
+    def _drain(self):
+        while True:
+            path, data, entry = self._queue.get()
+            try:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(data)
+                entry["written"] = True
+            except OSError as e:
+                entry["error"] = str(e)
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Block until every queued capture is on disk"""
+        if self._writer is not None:
+            self._queue.join()
+
+    # -- capture -----------------------------------------------------------
+
+    def _shoot(self, page, current_mode: str, failure: bool) -> tuple:
+        if current_mode == "full" or (failure and current_mode == "on-failure"):
+            return page.screenshot(full_page=True), "png"
+        if current_mode == "viewport":
+            return page.screenshot(), "png"
+
+        data = page.screenshot(type="jpeg", quality=self.quality)
+        if len(data) > self.shot_budget and self.quality > MIN_QUALITY:
+            # Scale quality by the overshoot and retake once; later shots start there
+            self.quality = max(MIN_QUALITY, int(self.quality * self.shot_budget / len(data)))
+            data = page.screenshot(type="jpeg", quality=self.quality)
+        return data, "jpg"
+
+    def capture(self, page, path: str, description: str = "", failure: bool = False):
+        """Queue a screenshot per the policy; returns the path or None if skipped"""
+        current_mode = mode()
+        entry = {"path": None, "description": description, "mode": current_mode,
+                 "failure": failure, "bytes": 0, "skipped": None, "written": False}
+        self.entries.append(entry)
+
+        if current_mode == "off" or (current_mode == "on-failure" and not failure):
+            entry["skipped"] = current_mode
+            return None
+        if not failure and self.total_bytes >= self.total_budget:
+            entry["skipped"] = "budget"
+            return None
+
+        started = time.perf_counter()
+        try:
+            data, ext = self._shoot(page, current_mode, failure)
+        except Exception as e:
+            entry["skipped"] = f"error: {e}"
+            return None
+
+        path = str(Path(path).with_suffix(f".{ext}"))
+        entry.update(path=path, bytes=len(data), capture_ms=round((time.perf_counter() - started) * 1000, 1))
+        self.total_bytes += len(data)
+        self._ensure_writer()
+        self._queue.put((path, data, entry))
+        return path
+
+    def manifest(self) -> dict:
+        self.flush()
+        return {
+            "mode": mode(),
+            "total_bytes": self.total_bytes,
+            "files": [e["path"] for e in self.entries if e["path"]],
+            "entries": list(self.entries),
+        }
+
+
+_recorder = EvidenceRecorder()
+atexit.register(_recorder.flush)
+
+
+def capture(page, path: str, description: str = "", failure: bool = False):
+    return _recorder.capture(page, path, description, failure)
+
+
+def fail(page, results: dict, message: str, prefix: str):
+    """Append a failed check to results["fail"] and capture the page as a failure"""
+    results["fail"].append(message)
+    return capture(page, f"{prefix}_fail_{len(results['fail']):02d}.png", message, failure=True)
+
+
+def flush():
+    _recorder.flush()
+
+
+def manifest() -> dict:
+    return _recorder.manifest()
+
+
+def reset():
+    _recorder.reset()
@@ -0,0 +1,156 @@
+"""
+One-call DOM extraction of the prices, traveler counts and totals the flows
+assert on.
+
+Scraping with page.locator('text=/thb/i').all() and then is_visible() and
+inner_text() on every match costs two IPC round trips per element. EXTRACT_JS
+walks the page once in the browser and returns everything as one JSON
+payload, with amounts already parsed:
+
+    {
+      "price_lines":     [{"text": "Adult x 2  THB 3,000", "amounts": [2, 3000], "kind": "adult"}, ...],
+      "totals":          [{"text": "Total  THB 4,500", "amounts": [4500], "kind": "total"}, ...],
+      "traveler_badges": [{"text": "Travelers: A 2 / C 1 / I 1", "amounts": [2, 1, 1], "kind": "traveler"}, ...],
+      "pax_counters":    [{"label": "Adult", "value": 2, "minus_disabled": false, "plus_disabled": false}, ...],
+      "messages":        [{"text": "Great news! ...", "kind": "success"}, ...],
+      "cart_empty":      false
+    }
+
+Lines are the deepest visible element whose text matches - what a
+Playwright text=/.../ locator would have picked - widened to the enclosing
+"label | amount" row for prices and totals.
+"""
+
+from playwright.sync_api import Page
+
+EXTRACT_JS = r"""
+(scope) => {
+  const root = (scope && document.querySelector(scope)) || document.body;
+  const PRICE = /(?:thb|฿)\s*[\d,]+(?:\.\d+)?|[\d,]+(?:\.\d+)?\s*(?:thb|฿)/i;
+  const TRAVELER = /\b(adult|child|infant|traveler|travelers|pax|guests?)\b/i;
+  const TOTAL = /\b(sub)?total\b.*\d/i;
+  const KINDS = ['subtotal', 'total', 'adult', 'child', 'infant', 'traveler', 'guest', 'pax'];
+  const MESSAGE = /great news|available|added .*cart|cart is empty|minimum|maximum|sold out|error/i;
+
+  const visible = (el) => {
+    if (!el.isConnected) return false;
+    const style = getComputedStyle(el);
+    if (style.visibility === 'hidden' || style.display === 'none' || Number(style.opacity) === 0) return false;
+    const rect = el.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0;
+  };
+  const clean = (text) => (text || '').replace(/\s+/g, ' ').trim();
+  const amounts = (text) => (text.match(/\d[\d,]*(?:\.\d+)?/g) || [])
+    .map((n) => Number(n.replace(/,/g, '')))
+    .filter((n) => Number.isFinite(n));
+  const kindOf = (text) => {
+    const lower = text.toLowerCase();
+    return KINDS.find((k) => lower.includes(k)) || null;
+  };
+
+  // Deepest visible elements whose text matches `pattern`. With `rows`, a
+  // match inside a two-cell "label | amount" row reports the whole row.
+  const deepest = (pattern, maxLength, rows = false) => {
+    const out = [];
+    const seen = new Set();
+    const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT);
+    for (let el = walker.currentNode; el; el = walker.nextNode()) {
+      if (el.tagName === 'SCRIPT' || el.tagName === 'STYLE') continue;
+      const raw = el.textContent;
+      if (!raw || raw.length > maxLength * 4) continue;
+      const text = clean(raw);
+      if (!text || text.length > maxLength || !pattern.test(text)) continue;
+      const childMatches = Array.from(el.children).some((child) => pattern.test(clean(child.textContent)));
+      if (childMatches || !visible(el)) continue;
+      let target = el;
+      const parent = el.parentElement;
+      if (rows && parent && parent.children.length === 2 && clean(parent.textContent).length <= maxLength) {
+        target = parent;
+      }
+      const line = clean(target.innerText || target.textContent);
+      if (seen.has(line)) continue;
+      seen.add(line);
+      out.push({ text: line, amounts: amounts(line), kind: kindOf(line) });
+    }
+    return out;
+  };
+
+  const counters = [];
+  // Destination drawer rows: div > div > label("Adult") ... div.w-10 value
+  root.querySelectorAll('label').forEach((label) => {
+    const name = clean(label.textContent);
+    if (!TRAVELER.test(name)) return;
+    const row = label.parentElement && label.parentElement.parentElement;
+    const value = row && row.querySelector('div.w-10');
+    if (!value || !visible(value)) return;
+    const buttons = row.querySelectorAll('button');
+    counters.push({
+      label: name,
+      value: Number(clean(value.textContent)),
+      minus_disabled: buttons.length ? buttons[0].disabled : null,
+      plus_disabled: buttons.length ? buttons[buttons.length - 1].disabled : null,
+    });
+  });
+  // Cart rows: [button(-)] [value] [button(+)]
+  root.querySelectorAll('div').forEach((box) => {
+    const kids = box.children;
+    if (kids.length !== 3 || kids[0].tagName !== 'BUTTON' || kids[2].tagName !== 'BUTTON') return;
+    if (kids[1].tagName === 'BUTTON' || !/^\d+$/.test(clean(kids[1].textContent)) || !visible(box)) return;
+    if (box.querySelector('label')) return;
+    counters.push({
+      label: 'cart',
+      value: Number(clean(kids[1].textContent)),
+      minus_disabled: kids[0].disabled,
+      plus_disabled: kids[2].disabled,
+    });
+  });
+
+  const messages = deepest(MESSAGE, 200).map((m) => ({
+    text: m.text,
+    kind: /great news|available|added/i.test(m.text) && !/not available|unavailable/i.test(m.text)
+      ? 'success' : /cart is empty/i.test(m.text) ? 'empty' : 'error',
+  }));
+
+  return {
+    price_lines: deepest(PRICE, 200, true),
+    totals: deepest(TOTAL, 120, true),
+    traveler_badges: deepest(TRAVELER, 100),
+    pax_counters: counters,
+    messages,
+    cart_empty: messages.some((m) => m.kind === 'empty'),
+  };
+}
+"""
+
+
+def extract(page: Page, scope: str = None) -> dict:
+    """Prices, totals, traveler badges, pax counters and messages in one call"""
+    return page.evaluate(EXTRACT_JS, scope)
+
+
+def read_local_cart(page: Page) -> list:
+    """The 6cat_cart_v1 items as the app stored them"""
+    return page.evaluate("() => JSON.parse(window.localStorage.getItem('6cat_cart_v1') || '[]')")
+
+
+def texts(lines: list) -> list:
+    return [line["text"] for line in lines]
+
+
+def first(lines: list, kind: str):
+    """First line of the given kind ("adult", "child", "total", ...), or None"""
+    return next((line for line in lines if line["kind"] == kind), None)
+
+
+def last_total(snapshot: dict) -> str:
+    """Text of the last total on the page (the cart summary's grand total)"""
+    totals = [t for t in snapshot["totals"] if t["kind"] == "total"] or snapshot["totals"]
+    return totals[-1]["text"] if totals else ""
+
+
+def counter(snapshot: dict, label: str):
+    """Value of the Adult/Child/Infant/Travelers counter, or None"""
+    for entry in snapshot["pax_counters"]:
+        if entry["label"].lower().startswith(label.lower()):
+            return entry["value"]
+    return None
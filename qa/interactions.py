@@ -0,0 +1,271 @@
+"""
+Interaction latency for the pax steppers and package-option switches.
+
+Every stepper click and option change re-runs resolveOptionPricing and
+re-renders the total. For each interaction this measures, INP-style, from
+the click event's timestamp to
+
+    dom_ms     the watched total's text changing (MutationObserver)
+    paint_ms   the next frame after that change (rAF + task)
+
+and repeats it --repeat times so the percentiles are stable. The watcher is
+armed before Playwright clicks, so actionability checks and protocol round
+trips are not counted.
+
+Destination page (the total row of the price breakdown):
+
+    adult_plus / adult_minus, child_plus / child_minus,
+    travelers_plus / travelers_minus (private options), option_switch
+
+Cart (the summary total, after adding the destination to the cart):
+
+    cart_plus / cart_minus
+
+With --seeded only the cart steppers run, on a context that starts on
+/cart with qa.state's cached cart instead of adding the destination first.
+
+An interaction whose total never changed (e.g. two options with the same
+price) is counted as unchanged, not timed. The run fails when an
+interaction's p95 paint_ms exceeds --budget-ms (200ms, the INP "good" limit).
+
+Usage:
+    python -m qa.interactions                     # first destination
+    python -m qa.interactions --url http://localhost:3000/destinations/<id> --repeat 50
+    python -m qa.interactions --no-cart --budget-ms 100
+    python -m qa.interactions --seeded
+"""
+
+import argparse
+import json
+import urllib.parse
+
+from playwright.sync_api import Page, sync_playwright
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from qa.browser import launch, new_page
+from qa.config import base_url
+from qa.readiness import (
+    PRICE_BREAKDOWN,
+    expect_cart_update,
+    expect_schedules,
+    wait_for_availability,
+    wait_for_calendar,
+    wait_for_options,
+)
+from qa.state import new_seeded_page
+from qa.stats import summarize
+
+DEFAULT_REPORT = "/tmp/qa_interactions_report.json"
+DESTINATION_TOTAL = f"{PRICE_BREAKDOWN} > div.border-t"
+CART_TOTAL = "span.font-bold.text-primary.text-xl"
+CART_STEPPER = "div.border.rounded-lg.p-1.bg-gray-50"
+PACKAGE_OPTION = 'input[name="package-option"]'
+
+ARM_JS = r"""
+([target, timeoutMs]) => {
+  const read = () => {
+    const el = document.querySelector(target);
+    return el ? el.innerText : null;
+  };
+  const state = (window.__qaInteraction = {
+    before: read(), after: null, clickAt: null, changedAt: null, paintedAt: null,
+  });
+  document.addEventListener('click', (e) => { state.clickAt = e.timeStamp; }, { capture: true, once: true });
+  const observer = new MutationObserver(() => {
+    const text = read();
+    if (state.clickAt === null || text === state.before) return;
+    observer.disconnect();
+    state.changedAt = performance.now();
+    state.after = text;
+    requestAnimationFrame(() => setTimeout(() => { state.paintedAt = performance.now(); }, 0));
+  });
+  observer.observe(document.body, { subtree: true, childList: true, characterData: true });
+  setTimeout(() => observer.disconnect(), timeoutMs);
+}
+"""
+
+
+def measure(page: Page, control, target: str, timeout: int = 3_000) -> dict:
+    """Click `control` and time the text of `target` changing"""
+    page.evaluate(ARM_JS, [target, timeout])
+    control.click()
+    try:
+        page.wait_for_function("() => window.__qaInteraction.paintedAt !== null", timeout=timeout)
+    except PlaywrightTimeoutError:
+        pass
+    state = page.evaluate("() => window.__qaInteraction")
+    if state["paintedAt"] is None:
+        return {"changed": False, "before": state["before"]}
+    return {
+        "changed": True,
+        "dom_ms": state["changedAt"] - state["clickAt"],
+        "paint_ms": state["paintedAt"] - state["clickAt"],
+        "before": state["before"],
+        "after": state["after"],
+    }
+
+
+class Recorder:
+    """Samples per interaction name"""
+
+    def __init__(self):
+        self.samples = {}
+
+    def add(self, name: str, sample: dict):
+        self.samples.setdefault(name, []).append(sample)
+
+    def report(self) -> dict:
+        result = {}
+        for name, samples in self.samples.items():
+            timed = [s for s in samples if s["changed"]]
+            result[name] = {
+                "count": len(samples),
+                "unchanged": len(samples) - len(timed),
+                "dom": summarize([s["dom_ms"] for s in timed]),
+                "paint": summarize([s["paint_ms"] for s in timed]),
+            }
+        return result
+
+
+def _stepper(page: Page, label: str):
+    """(minus, plus) buttons of the Adult/Child/Infant/Travelers row, or None"""
+    row = page.locator(f'div:has(> div > label:has-text("{label}"))').first
+    if not row.is_visible():
+        return None
+    return row.locator('button:has-text("-")').first, row.locator('button:has-text("+")').last
+
+
+def exercise_stepper(page: Page, recorder: Recorder, name: str, minus, plus, target: str, repeat: int):
+    """Alternate + and - so the count stays in range; each click is one sample"""
+    for _ in range(repeat):
+        for direction, button in (("plus", plus), ("minus", minus)):
+            if button.is_disabled():
+                continue
+            recorder.add(f"{name}_{direction}", measure(page, button, target))
+
+
+def open_destination(page: Page, url: str):
+    """Load the page, pick the first available date and the first option"""
+    with expect_schedules(page):
+        page.goto(url)
+    page.locator('button:has-text("Choose Date")').first.click()
+    wait_for_calendar(page)
+    page.locator("button:has(.bg-green-500)").first.click()
+    wait_for_options(page)
+    page.locator(PACKAGE_OPTION).first.check()
+    slots = page.locator(f'label:has({PACKAGE_OPTION}:checked) button')
+    if slots.count() > 0:
+        slots.first.click()
+
+
+def destination_interactions(page: Page, recorder: Recorder, repeat: int):
+    for label in ("Adult", "Child", "Infant", "Travelers"):
+        buttons = _stepper(page, label)
+        if buttons:
+            exercise_stepper(page, recorder, label.lower(), *buttons, DESTINATION_TOTAL, repeat)
+
+    options = page.locator(PACKAGE_OPTION)
+    count = options.count()
+    if count < 2:
+        return
+    for index in range(1, repeat + 1):
+        recorder.add("option_switch", measure(page, options.nth(index % count), DESTINATION_TOTAL))
+    options.first.check()
+
+
+def add_to_cart(page: Page) -> str:
+    """Check availability and add the current selection; returns an error or None"""
+    page.locator('button:has-text("Check")').first.click()
+    wait_for_availability(page)
+    message = page.locator("p.text-green-600").first
+    if not message.is_visible():
+        return "Not available"
+    with expect_cart_update(page):
+        page.locator("#drawer-add-to-cart-btn").click()
+    return None
+
+
+def cart_interactions(page: Page, recorder: Recorder, repeat: int):
+    if urllib.parse.urlsplit(page.url).path != "/cart":
+        page.goto(f"{base_url()}/cart")
+    stepper = page.locator(CART_STEPPER).first
+    stepper.wait_for(state="visible", timeout=5_000)
+    buttons = stepper.locator("button")
+    exercise_stepper(page, recorder, "cart", buttons.first, buttons.last, CART_TOTAL, repeat)
+
+
+def run(url: str = None, repeat: int = 30, cart: bool = True, slow_mo: int = 0, seeded: bool = False) -> dict:
+    report = {"url": url, "repeat": repeat, "cart_error": None}
+    recorder = Recorder()
+    with sync_playwright() as p:
+        browser = launch(p, slow_mo=slow_mo)
+        try:
+            if seeded:
+                page = new_seeded_page(browser)
+                report["url"] = page.url
+            else:
+                page = new_page(browser)
+                if not url:
+                    page.goto(f"{base_url()}/destinations")
+                    page.wait_for_load_state("networkidle")
+                    href = page.locator('a[href*="/destinations/"]:not([href="/destinations"])').first.get_attribute("href")
+                    url = report["url"] = urllib.parse.urljoin(f"{base_url()}/", href)
+                open_destination(page, url)
+                destination_interactions(page, recorder, repeat)
+                if cart:
+                    report["cart_error"] = add_to_cart(page)
+            if (seeded or cart) and not report["cart_error"]:
+                cart_interactions(page, recorder, repeat)
+        finally:
+            browser.close()
+    report["interactions"] = recorder.report()
+    return report
+
+
+def over_budget(report: dict, budget_ms: float) -> list:
+    return [name for name, result in report["interactions"].items()
+            if result["paint"].get("p95_ms", 0) > budget_ms]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Click-to-updated-total latency for steppers and option switches")
+    parser.add_argument("--url", help="Destination detail URL (default: the first destination)")
+    parser.add_argument("--repeat", type=int, default=30, help="Clicks per interaction")
+    parser.add_argument("--no-cart", action="store_true", help="Skip the cart stepper")
+    parser.add_argument("--seeded", action="store_true", help="Only the cart stepper, starting on /cart (qa.state)")
+    parser.add_argument("--budget-ms", type=float, default=200.0, help="Fail when a p95 paint_ms exceeds this")
+    parser.add_argument("--report", default=DEFAULT_REPORT)
+    args = parser.parse_args()
+
+    print("\n" + "="*80)
+    print(f"Interaction latency ({args.repeat} clicks per interaction)")
+    print("="*80)
+    report = run(args.url, args.repeat, cart=not args.no_cart, seeded=args.seeded)
+    report["budget_ms"] = args.budget_ms
+    report["over_budget"] = over_budget(report, args.budget_ms)
+
+    print(f"{report['url']}")
+    print(f"  {'interaction':<18}{'n':>5}{'dom p50':>11}{'dom p95':>11}{'paint p50':>11}{'paint p95':>11}")
+    for name, result in report["interactions"].items():
+        dom, paint = result["dom"], result["paint"]
+        if not paint["count"]:
+            print(f"  {name:<18}{result['count']:>5}  ⚠ total never changed")
+            continue
+        status = "❌" if name in report["over_budget"] else "  "
+        print(f"{status}{name:<18}{paint['count']:>5}{dom['p50_ms']:>9.1f}ms{dom['p95_ms']:>9.1f}ms"
+              f"{paint['p50_ms']:>9.1f}ms{paint['p95_ms']:>9.1f}ms"
+              + (f"  ({result['unchanged']} unchanged)" if result["unchanged"] else ""))
+    if report["cart_error"]:
+        print(f"⚠ Cart skipped: {report['cart_error']}")
+    if not report["over_budget"]:
+        print(f"✅ Every interaction's p95 is within {args.budget_ms}ms")
+
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Report saved to {args.report}")
+    return report
+
+
+if __name__ == "__main__":
+    report = main()
+    raise SystemExit(1 if report["over_budget"] else 0)
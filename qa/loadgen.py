@@ -0,0 +1,272 @@
+"""
+HTTP load generator for the booking API.
+
+Drives concurrent `POST /api/bookings` (CreateBookingBody: customer_id,
+trip_id, pax, total_amount, passengers) and paginated
+`GET /api/v1/schedules?date_from=&date_to=` calls straight at the Next.js
+server - no browser - and reports throughput plus p50/p95/p99 latency per
+endpoint.
+
+Every worker thread keeps its own keep-alive connection, so the numbers
+measure the app rather than TCP/TLS setup.
+
+`--steps` runs the same mix at increasing concurrency and stops at the first
+step that breaks the latency/error budget, which gives the capacity limit.
+
+NOTE: booking mode creates real bookings (notes="qa-loadgen") - point it at
+a staging database.
+
+Usage:
+    python -m qa.loadgen --mode schedules --concurrency 16 --duration 30
+    python -m qa.loadgen --mode bookings --customer-id <uuid> --trip-id <uuid>
+    python -m qa.loadgen --mode mixed --customer-id <uuid> --trip-id <uuid> \\
+        --steps 1 2 4 8 16 32 --slo-p95-ms 800
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import os
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from qa.config import base_url
+from qa.stats import summarize
+
+DEFAULT_REPORT = "/tmp/qa_loadgen_report.json"
+RETRYABLE = (http.client.RemoteDisconnected, http.client.CannotSendRequest,
+             ConnectionResetError, BrokenPipeError)
+
+
+class ConnectionPool:
+    """One keep-alive HTTP(S) connection per worker thread"""
+
+    def __init__(self, url: str, timeout: float = 30):
+        parsed = urllib.parse.urlparse(url)
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        self._local.conn = cls(self.host, self.port, timeout=self.timeout)
+        return self._local.conn
+
+    def _conn(self):
+        return getattr(self._local, "conn", None) or self._connect()
+
+    def request(self, method: str, path: str, body: dict = None) -> tuple:
+        """(status, body bytes, latency ms). Reconnects once on a dropped socket"""
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload else {}
+        for attempt in range(2):
+            conn = self._conn()
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, body=payload, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+                return response.status, data, (time.perf_counter() - started) * 1000
+            except RETRYABLE:
+                conn.close()
+                self._connect()
+                if attempt:
+                    raise
+        raise RuntimeError("unreachable")
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn:
+            conn.close()
+
+
+def booking_body(customer_id: str, trip_id: str, pax: int, unit_price: float) -> dict:
+    passengers = [
+        {"name": f"QA Load {i + 1}", "type": "Adult", "age": None,
+         "passport_number": None, "special_requests": None}
+        for i in range(pax)
+    ]
+    return {
+        "customer_id": customer_id,
+        "trip_id": trip_id,
+        "pax": pax,
+        "total_amount": unit_price * pax,
+        "notes": "qa-loadgen",
+        "passengers": passengers,
+    }
+
+
+def schedules_paths(date_from: str, date_to: str, pages: int, limit: int, tour_id: str = "") -> list:
+    paths = []
+    for page in range(1, pages + 1):
+        query = {"date_from": date_from, "date_to": date_to, "page": page, "limit": limit}
+        if tour_id:
+            query["tour_id"] = tour_id
+        paths.append(f"/api/v1/schedules?{urllib.parse.urlencode(query)}")
+    return paths
+
+
+def build_plan(args) -> list:
+    """Endless cycle source: list of (endpoint label, method, path, body)"""
+    plan = []
+    if args.mode in ("bookings", "mixed"):
+        body = booking_body(args.customer_id, args.trip_id, args.pax, args.unit_price)
+        plan.append(("POST /api/bookings", "POST", "/api/bookings", body))
+    if args.mode in ("schedules", "mixed"):
+        for path in schedules_paths(args.date_from, args.date_to, args.pages, args.limit, args.tour_id):
+            plan.append(("GET /api/v1/schedules", "GET", path, None))
+    return plan
+
+
+def run_load(pool: ConnectionPool, plan: list, concurrency: int,
+             requests: int = 0, duration: float = 0) -> dict:
+    """Run the plan with `concurrency` threads until `requests` or `duration` is hit"""
+    source = itertools.cycle(plan)
+    lock = threading.Lock()
+    samples = {}
+    issued = 0
+    deadline = time.perf_counter() + duration if duration else None
+
+    def next_call():
+        nonlocal issued
+        with lock:
+            if requests and issued >= requests:
+                return None
+            if deadline and time.perf_counter() >= deadline:
+                return None
+            issued += 1
+            return next(source)
+
+    def worker():
+        try:
+            while True:
+                call = next_call()
+                if call is None:
+                    return
+                label, method, path, body = call
+                try:
+                    status, _, latency = pool.request(method, path, body)
+                except Exception as e:
+                    status, latency = f"{type(e).__name__}", None
+                with lock:
+                    entry = samples.setdefault(label, {"latencies": [], "statuses": {}})
+                    if latency is not None:
+                        entry["latencies"].append(latency)
+                    entry["statuses"][str(status)] = entry["statuses"].get(str(status), 0) + 1
+        finally:
+            pool.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(worker)
+    elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    total = errors = 0
+    for label, entry in samples.items():
+        count = sum(entry["statuses"].values())
+        failed = sum(n for s, n in entry["statuses"].items() if not (s.isdigit() and int(s) < 400))
+        total += count
+        errors += failed
+        endpoints[label] = {
+            "requests": count,
+            "errors": failed,
+            "throughput_rps": round(count / elapsed, 2) if elapsed else 0,
+            "statuses": entry["statuses"],
+            "latency": summarize(entry["latencies"]),
+        }
+
+    return {
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0,
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0,
+        "endpoints": endpoints,
+    }
+
+
+def within_budget(step: dict, slo_p95_ms: float, max_error_rate: float) -> bool:
+    if step["error_rate"] > max_error_rate:
+        return False
+    return all(e["latency"].get("p95_ms", 0) <= slo_p95_ms for e in step["endpoints"].values())
+
+
+def print_step(step: dict):
+    print(f"\nconcurrency={step['concurrency']}  {step['requests']} requests in {step['elapsed_s']}s  "
+          f"→ {step['throughput_rps']} req/s, errors {step['errors']} ({step['error_rate']:.1%})")
+    for label, e in step["endpoints"].items():
+        lat = e["latency"]
+        print(f"  {label:<24} {e['throughput_rps']:>8} req/s  "
+              f"p50 {lat.get('p50_ms', 0):>8}ms  p95 {lat.get('p95_ms', 0):>8}ms  "
+              f"p99 {lat.get('p99_ms', 0):>8}ms  statuses {e['statuses']}")
+
+
+def main():
+    today = date.today()
+    parser = argparse.ArgumentParser(description="Load-test /api/bookings and /api/v1/schedules")
+    parser.add_argument("--mode", choices=("bookings", "schedules", "mixed"), default="schedules")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--steps", type=int, nargs="*", help="Concurrency ramp, e.g. 1 2 4 8 16")
+    parser.add_argument("--requests", type=int, default=0, help="Requests per step (0 = use --duration)")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per step")
+    parser.add_argument("--customer-id", default=os.environ.get("QA_LOAD_CUSTOMER_ID", ""))
+    parser.add_argument("--trip-id", default=os.environ.get("QA_LOAD_TRIP_ID", ""))
+    parser.add_argument("--pax", type=int, default=2)
+    parser.add_argument("--unit-price", type=float, default=1000)
+    parser.add_argument("--tour-id", default="")
+    parser.add_argument("--date-from", default=today.isoformat())
+    parser.add_argument("--date-to", default=(today + timedelta(days=90)).isoformat())
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--slo-p95-ms", type=float, default=1000)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--report", default=DEFAULT_REPORT)
+    args = parser.parse_args()
+
+    if args.mode in ("bookings", "mixed") and not (args.customer_id and args.trip_id):
+        parser.error("--customer-id and --trip-id (or QA_LOAD_CUSTOMER_ID/QA_LOAD_TRIP_ID) are required")
+
+    url = base_url()
+    pool = ConnectionPool(url)
+    plan = build_plan(args)
+    steps = args.steps or [args.concurrency]
+
+    print("\n" + "="*80)
+    print(f"Load test {args.mode} against {url}, steps {steps}")
+    print("="*80)
+
+    report = {"base_url": url, "mode": args.mode, "slo_p95_ms": args.slo_p95_ms,
+              "max_error_rate": args.max_error_rate, "steps": [], "capacity": None}
+    for concurrency in steps:
+        step = run_load(pool, plan, concurrency, requests=args.requests,
+                        duration=0 if args.requests else args.duration)
+        print_step(step)
+        report["steps"].append(step)
+        if not within_budget(step, args.slo_p95_ms, args.max_error_rate):
+            print(f"⚠ Budget exceeded at concurrency={concurrency}")
+            break
+        report["capacity"] = {"concurrency": concurrency, "throughput_rps": step["throughput_rps"]}
+
+    if report["capacity"]:
+        print(f"\n✓ Capacity within budget: {report['capacity']['throughput_rps']} req/s "
+              f"at concurrency {report['capacity']['concurrency']}")
+    else:
+        print("\n❌ First step already exceeded the budget")
+
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Report saved to {args.report}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+Request filtering for functional runs: no hero images, fonts, media or
+third-party requests.
+
+QA_NETFILTER holds a profile name, kind=action overrides, or both:
+
+    QA_NETFILTER=functional
+    QA_NETFILTER=functional,third_party=allow
+    QA_NETFILTER=image=abort,font=abort
+
+Kinds are image, media, font and third_party (any host other than the app
+and Supabase, plus QA_NETFILTER_ALLOW_HOSTS). Actions:
+
+    abort   the request fails at the network layer
+    stub    answered locally - a 1x1 GIF for images, empty bodies otherwise -
+            so next/image and onError fallbacks don't kick in
+    allow   sent as usual
+
+When a request matches two kinds (a third-party image) the stronger action
+wins. Documents, /api/*, /rest/v1/* and /auth/v1/* are never filtered,
+whatever their host, so Supabase calls go through even when the QA process
+doesn't know NEXT_PUBLIC_SUPABASE_URL (say it was only passed to next dev).
+
+Profiles:
+
+    functional   images stubbed; media, fonts, third-party aborted
+    strict       images, media, fonts and third-party all aborted
+
+Each context counts what it filtered; bytes saved are estimated from
+.qa-cache/netfilter_sizes.json, which the comparison mode fills in by
+loading pages with and without the filter and measuring both.
+
+Usage:
+    python -m qa.runner --netfilter functional
+    python -m qa.netfilter --profile functional --runs 3
+    python -m qa.netfilter --url http://localhost:3000/destinations/<id>
+"""
+
+import argparse
+import base64
+import json
+import os
+import statistics
+import time
+import urllib.parse
+from pathlib import Path
+
+from qa.config import ROOT, VIEWPORT, base_url, supabase_url
+from qa.replay import is_data_request
+
+SIZES_PATH = Path(os.environ.get("QA_NETFILTER_SIZES", ROOT / ".qa-cache" / "netfilter_sizes.json"))
+DEFAULT_REPORT = "/tmp/qa_netfilter_report.json"
+KINDS = ("image", "media", "font", "third_party")
+ACTIONS = ("allow", "stub", "abort")
+PROFILES = {
+    "off": {},
+    "functional": {"image": "stub", "media": "abort", "font": "abort", "third_party": "abort"},
+    "strict": {"image": "abort", "media": "abort", "font": "abort", "third_party": "abort"},
+}
+
+PIXEL_GIF = base64.b64decode("R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7")
+STUBS = {
+    "image": {"status": 200, "content_type": "image/gif", "body": PIXEL_GIF},
+    "script": {"status": 200, "content_type": "text/javascript", "body": b""},
+    "stylesheet": {"status": 200, "content_type": "text/css", "body": b""},
+}
+EMPTY_STUB = {"status": 204, "content_type": "text/plain", "body": b""}
+
+
+def parse_spec(spec: str) -> dict:
+    """{"image": "stub", ...} from 'profile,kind=action,...'"""
+    rules = {}
+    for part in (p.strip() for p in (spec or "").split(",")):
+        if not part:
+            continue
+        if "=" not in part:
+            if part not in PROFILES:
+                raise ValueError(f"Unknown netfilter profile '{part}' (known: {', '.join(PROFILES)})")
+            rules.update(PROFILES[part])
+            continue
+        kind, action = (s.strip() for s in part.split("=", 1))
+        if kind not in KINDS or action not in ACTIONS:
+            raise ValueError(f"Bad netfilter rule '{part}' (kinds: {', '.join(KINDS)}; actions: {', '.join(ACTIONS)})")
+        rules[kind] = action
+    return {kind: action for kind, action in rules.items() if action != "allow"}
+
+
+def allowed_hosts() -> set:
+    hosts = {urllib.parse.urlsplit(base_url()).hostname}
+    if supabase_url():
+        hosts.add(urllib.parse.urlsplit(supabase_url()).hostname)
+    hosts.update(h.strip() for h in os.environ.get("QA_NETFILTER_ALLOW_HOSTS", "").split(",") if h.strip())
+    return hosts
+
+
+def request_kinds(url: str, resource_type: str, hosts: set) -> list:
+    if is_data_request(url) or urllib.parse.urlsplit(url).path.startswith("/auth/v1/"):
+        return []
+    kinds = [resource_type] if resource_type in KINDS else []
+    if urllib.parse.urlsplit(url).hostname not in hosts:
+        kinds.append("third_party")
+    return kinds
+
+
+def size_key(url: str) -> str:
+    parts = urllib.parse.urlsplit(url)
+    return f"{parts.netloc}{parts.path}"
+
+
+def load_sizes(path: Path = SIZES_PATH) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_sizes(sizes: dict, path: Path = SIZES_PATH):
+    merged = load_sizes(path)
+    merged.update(sizes)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(merged, indent=1, sort_keys=True), encoding="utf-8")
+    tmp.replace(path)
+
+
+class NetFilter:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.spec = os.environ.get("QA_NETFILTER", "")
+        self._stats = {"profile": self.spec, "blocked": 0, "by_kind": {}, "by_action": {},
+                       "estimated_bytes_saved": 0, "unknown_size": 0}
+        self._sizes = None
+        self._hosts = None
+
+    def install(self, context, spec: str = None):
+        rules = parse_spec(self.spec if spec is None else spec)
+        if rules:
+            context.route("**/*", lambda route: self._handle(route, rules))
+
+    def _handle(self, route, rules: dict):
+        request = route.request
+        if self._hosts is None:
+            self._hosts = allowed_hosts()
+        matched = [(ACTIONS.index(rules[k]), k) for k in request_kinds(request.url, request.resource_type, self._hosts)
+                   if k in rules and request.resource_type != "document"]
+        if not matched:
+            route.fallback()
+            return
+        rank, kind = max(matched)
+        action = ACTIONS[rank]
+        self._count(kind, action, request.url)
+        if action == "abort":
+            route.abort("blockedbyclient")
+            return
+        stub = STUBS.get(request.resource_type, EMPTY_STUB)
+        route.fulfill(status=stub["status"], content_type=stub["content_type"], body=stub["body"])
+
+    def _count(self, kind: str, action: str, url: str):
+        stats = self._stats
+        stats["blocked"] += 1
+        stats["by_kind"][kind] = stats["by_kind"].get(kind, 0) + 1
+        stats["by_action"][action] = stats["by_action"].get(action, 0) + 1
+        if self._sizes is None:
+            self._sizes = load_sizes()
+        size = self._sizes.get(size_key(url))
+        if size is None:
+            stats["unknown_size"] += 1
+        else:
+            stats["estimated_bytes_saved"] += size
+
+    def stats(self) -> dict:
+        return dict(self._stats, by_kind=dict(self._stats["by_kind"]), by_action=dict(self._stats["by_action"]))
+
+
+_filter = NetFilter()
+
+
+def install(context, spec: str = None):
+    _filter.install(context, spec)
+
+
+def reset():
+    _filter.reset()
+
+
+def stats() -> dict:
+    return _filter.stats()
+
+
+# -- with/without comparison -------------------------------------------------
+
+def load_page(browser, url: str, spec: str) -> dict:
+    """Load url in a bare context (no qa.browser hooks); bytes per request and load timings"""
+    filtered = NetFilter()
+    context = browser.new_context(viewport=VIEWPORT)
+    filtered.install(context, spec)
+    hosts = allowed_hosts()
+    requests = []
+
+    def on_finished(request):
+        try:
+            size = request.sizes()["responseBodySize"]
+        except Exception:
+            size = 0
+        requests.append({"url": request.url, "resource_type": request.resource_type, "bytes": size})
+
+    context.on("requestfinished", on_finished)
+    page = context.new_page()
+    try:
+        started = time.perf_counter()
+        page.goto(url, wait_until="load")
+        load_s = time.perf_counter() - started
+        page.wait_for_load_state("networkidle")
+        idle_s = time.perf_counter() - started
+    finally:
+        context.close()
+    return {
+        "load_ms": load_s * 1000,
+        "networkidle_ms": idle_s * 1000,
+        "requests": len(requests),
+        "bytes": sum(r["bytes"] for r in requests),
+        "blocked": filtered.stats()["blocked"],
+        "sizes": {size_key(r["url"]): r["bytes"] for r in requests
+                  if r["bytes"] and request_kinds(r["url"], r["resource_type"], hosts)},
+    }
+
+
+def compare(urls: list, spec: str, runs: int = 3) -> dict:
+    from playwright.sync_api import sync_playwright
+
+    from qa.browser import launch
+
+    report = {"profile": spec, "runs": runs, "pages": []}
+    sizes = {}
+    with sync_playwright() as p:
+        browser = launch(p)
+        try:
+            for url in urls:
+                samples = {"unfiltered": [], "filtered": []}
+                for _ in range(runs):
+                    for label, page_spec in (("unfiltered", ""), ("filtered", spec)):
+                        result = load_page(browser, url, page_spec)
+                        if label == "unfiltered":
+                            sizes.update(result.pop("sizes"))
+                        else:
+                            result.pop("sizes")
+                        samples[label].append(result)
+                entry = {"url": url}
+                for label, results in samples.items():
+                    entry[label] = {field: round(statistics.median(r[field] for r in results), 1)
+                                    for field in ("load_ms", "networkidle_ms", "requests", "bytes", "blocked")}
+                entry["bytes_saved"] = entry["unfiltered"]["bytes"] - entry["filtered"]["bytes"]
+                entry["load_ms_saved"] = round(entry["unfiltered"]["load_ms"] - entry["filtered"]["load_ms"], 1)
+                entry["networkidle_ms_saved"] = round(
+                    entry["unfiltered"]["networkidle_ms"] - entry["filtered"]["networkidle_ms"], 1)
+                report["pages"].append(entry)
+        finally:
+            browser.close()
+    save_sizes(sizes)
+    report["sizes_learned"] = len(sizes)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure what a netfilter profile saves")
+    parser.add_argument("--profile", default="functional", help="Profile/rules, as in QA_NETFILTER")
+    parser.add_argument("--url", nargs="*", help="Pages to load (default: / and /destinations)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--report", default=DEFAULT_REPORT)
+    args = parser.parse_args()
+    parse_spec(args.profile)
+
+    urls = args.url or [f"{base_url()}/", f"{base_url()}/destinations"]
+    print("\n" + "="*80)
+    print(f"Netfilter '{args.profile}': {len(urls)} pages, {args.runs} runs each")
+    print("="*80)
+    report = compare(urls, args.profile, args.runs)
+
+    for entry in report["pages"]:
+        before, after = entry["unfiltered"], entry["filtered"]
+        print(f"\n{entry['url']}")
+        print(f"  bytes     {before['bytes'] / 1024:>10.1f} KB -> {after['bytes'] / 1024:>10.1f} KB"
+              f"  (saved {entry['bytes_saved'] / 1024:.1f} KB, {after['blocked']:.0f} requests filtered)")
+        print(f"  load      {before['load_ms']:>10.1f} ms -> {after['load_ms']:>10.1f} ms"
+              f"  (saved {entry['load_ms_saved']} ms)")
+        print(f"  idle      {before['networkidle_ms']:>10.1f} ms -> {after['networkidle_ms']:>10.1f} ms"
+              f"  (saved {entry['networkidle_ms_saved']} ms)")
+    print(f"\n✓ {report['sizes_learned']} asset sizes saved to {SIZES_PATH}")
+
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Report saved to {args.report}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
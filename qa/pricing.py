@@ -0,0 +1,387 @@
+"""
+Pure-Python mirror of the app's pricing rules, used as an oracle by the flows.
+
+Mirrors, function for function:
+    lib/pricing.ts                      resolveTierPrice, resolveOptionPricing
+    lib/cart/local-cart.ts              clampPax, recalculateLocalCartItem, addLocalCartItem
+    app/(public)/destinations/[slug]    getOptionPaxRange, isPrivateOption, passengerPricing
+    app/(public)/cart/page.tsx          summary (guests / subtotal / total)
+
+Options and cart items are plain dicts with the app's camelCase keys, so a
+cart read straight out of localStorage can be fed back in. A key that is
+absent behaves like JS `undefined`; a key set to None behaves like `null`.
+
+Usage:
+    python -m qa.pricing --sweep 20000    # invariant sweep, no browser
+"""
+
+import argparse
+import math
+import random
+import re
+
+MISSING = object()
+AMOUNT = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+# -- JS number semantics ---------------------------------------------------
+
+def _js_number(value) -> float:
+    """JS Number(value) for the value types that reach the pricing code"""
+    if value is MISSING:
+        return math.nan
+    if value is None:
+        return 0.0
+    if isinstance(value, bool):
+        return 1.0 if value else 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        text = value.strip()
+        if not text:
+            return 0.0
+        try:
+            return float(text)
+        except ValueError:
+            return math.nan
+    return math.nan
+
+
+def to_finite_number(value, fallback: float = 0) -> float:
+    parsed = _js_number(value)
+    return parsed if math.isfinite(parsed) else fallback
+
+
+def normalize_pax(pax) -> int:
+    return max(1, math.floor(to_finite_number(pax, 1)))
+
+
+def _is_number(value) -> bool:
+    """JS `typeof value === "number"`"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+# -- lib/pricing.ts --------------------------------------------------------
+
+def resolve_tier_price(tiers, pax):
+    normalized = normalize_pax(pax)
+    for tier in tiers or []:
+        low = to_finite_number(tier.get("minPax", MISSING), 0)
+        max_pax = tier.get("maxPax", MISSING)
+        high = math.inf if max_pax is None or max_pax is MISSING else to_finite_number(max_pax, math.inf)
+        if low <= normalized <= high:
+            return tier
+    return None
+
+
+def resolve_option_pricing(option, pax, fallback_base_price) -> dict:
+    """{"unitPrice", "total", "isFlatRate"} exactly as resolveOptionPricing"""
+    normalized = normalize_pax(pax)
+    fallback = to_finite_number(fallback_base_price, 0)
+
+    if not option:
+        return {"unitPrice": fallback, "total": fallback * normalized, "isFlatRate": False}
+
+    if option.get("isFlatRate") is True:
+        flat = to_finite_number(option.get("flatRatePrice", MISSING), fallback)
+        return {"unitPrice": flat, "total": flat, "isFlatRate": True}
+
+    tier = resolve_tier_price(option.get("pricingTiers") or [], normalized)
+    if tier:
+        unit = to_finite_number(tier.get("pricePerPerson", MISSING), fallback)
+        return {"unitPrice": unit, "total": unit * normalized, "isFlatRate": False}
+
+    return {"unitPrice": fallback, "total": fallback * normalized, "isFlatRate": False}
+
+
+# -- destination detail page -----------------------------------------------
+
+def option_pax_range(option) -> dict:
+    """getOptionPaxRange: {"min", "max"} from tiers, then quota"""
+    if not option:
+        return {"min": 1, "max": None}
+    tiers = option.get("pricingTiers")
+    tiers = tiers if isinstance(tiers, list) else []
+    mins = [v for v in (_js_number(t.get("minPax", MISSING)) for t in tiers) if math.isfinite(v) and v > 0]
+    maxes = [v for v in (_js_number(t.get("maxPax", MISSING)) for t in tiers) if math.isfinite(v) and v > 0]
+    quota = _js_number(option.get("quota", MISSING))
+    from_quota = math.floor(quota) if math.isfinite(quota) and quota > 0 else None
+    return {
+        "min": max(1, min(mins) if mins else 1),
+        "max": max(maxes) if maxes else from_quota,
+    }
+
+
+def is_private_option(option) -> bool:
+    if not option:
+        return False
+    if option.get("groupType") == "private" or option.get("isFlatRate") is True:
+        return True
+    return bool(re.match(r"private\b", option.get("description") or "", re.IGNORECASE))
+
+
+def pricing_option(option):
+    """selectedPricingOption: private options are priced as a flat rate"""
+    if not option or not is_private_option(option):
+        return option
+    adult_price = option.get("adultPrice", MISSING)
+    flat = adult_price if _is_number(adult_price) and adult_price > 0 else option.get("flatRatePrice", MISSING)
+    priced = dict(option, isFlatRate=True)
+    if flat is MISSING:
+        priced.pop("flatRatePrice", None)
+    else:
+        priced["flatRatePrice"] = flat
+    return priced
+
+
+def passenger_pricing(option, adults: int, children: int, infants: int, base_price) -> dict:
+    """The detail page's price breakdown for an option and pax split"""
+    private = is_private_option(option)
+    billable = adults if private else adults + children
+    pricing = resolve_option_pricing(pricing_option(option), billable, base_price)
+    option = option or {}
+
+    def unit(key, default):
+        value = option.get(key, MISSING)
+        return value if _is_number(value) and value >= 0 else default
+
+    adult_unit = unit("adultPrice", pricing["unitPrice"])
+    child_unit = unit("childPrice", adult_unit)
+    infant_unit = unit("infantPrice", 0)
+    if pricing["isFlatRate"]:
+        total = pricing["total"]
+    else:
+        total = adults * adult_unit + children * child_unit + infants * infant_unit
+    return {
+        "adultUnit": adult_unit,
+        "childUnit": child_unit,
+        "infantUnit": infant_unit,
+        "total": total,
+        "isFlatRate": pricing["isFlatRate"],
+        "travelers": adults if private else adults + children + infants,
+    }
+
+
+# -- lib/cart/local-cart.ts ------------------------------------------------
+
+def _to_int(value, fallback):
+    parsed = _js_number(value)
+    return math.floor(parsed) if math.isfinite(parsed) else fallback
+
+
+def build_pricing_option(item: dict):
+    tiers = item.get("pricingTiers")
+    has_tiers = isinstance(tiers, list) and len(tiers) > 0
+    if not item.get("isFlatRate") and not has_tiers:
+        return None
+    option = {"isFlatRate": item.get("isFlatRate") or False, "pricingTiers": tiers or []}
+    if "flatRatePrice" in item:
+        option["flatRatePrice"] = item["flatRatePrice"]
+    return option
+
+
+def clamp_pax(item: dict, pax) -> int:
+    min_raw = item.get("minPax")
+    low = max(1, _to_int(1 if min_raw is None else min_raw, 1))
+    max_raw = item.get("maxPax")
+    high = _to_int(MISSING if max_raw is None else max_raw, None)
+    high = high if high is not None and high > 0 else None
+    normalized = max(low, _to_int(pax, low))
+    return min(high, normalized) if high else normalized
+
+
+def recalculate_local_cart_item(item: dict, pax) -> dict:
+    next_pax = clamp_pax(item, pax)
+    passengers = item.get("passengers")
+    has_split = any(_is_number(item.get(k, MISSING)) for k in ("adultUnitPrice", "childUnitPrice", "infantUnitPrice"))
+
+    if not item.get("isFlatRate") and passengers and has_split:
+        delta = next_pax - item["pax"]
+        adults = max(1, passengers["adult"] + delta)
+        children = max(0, passengers["child"])
+        infants = max(0, passengers["infant"])
+
+        adult_unit = item.get("adultUnitPrice")
+        adult_unit = item["unitPrice"] if adult_unit is None else adult_unit
+        child_unit = item.get("childUnitPrice")
+        child_unit = adult_unit if child_unit is None else child_unit
+        infant_unit = item.get("infantUnitPrice")
+        infant_unit = 0 if infant_unit is None else infant_unit
+
+        updated = dict(item)
+        updated.update(
+            pax=adults + children + infants,
+            passengers={"adult": adults, "child": children, "infant": infants},
+            unitPrice=adult_unit,
+            totalPrice=adults * adult_unit + children * child_unit + infants * infant_unit,
+            isFlatRate=False,
+        )
+        updated.pop("flatRatePrice", None)
+        return updated
+
+    base = item.get("basePrice")
+    pricing = resolve_option_pricing(build_pricing_option(item), next_pax,
+                                     item["unitPrice"] if base is None else base)
+    updated = dict(item)
+    updated.update(
+        pax=next_pax,
+        unitPrice=pricing["unitPrice"],
+        totalPrice=pricing["total"],
+        isFlatRate=pricing["isFlatRate"],
+    )
+    if item.get("isFlatRate"):
+        updated["passengers"] = {"adult": next_pax, "child": 0, "infant": 0}
+    if pricing["isFlatRate"]:
+        updated["flatRatePrice"] = pricing["unitPrice"]
+    else:
+        updated.pop("flatRatePrice", None)
+    return updated
+
+
+def add_local_cart_item(cart: list, new_item: dict) -> list:
+    """New cart list after addLocalCartItem (merges same package/trip/option)"""
+    cart = list(cart)
+    for index, existing in enumerate(cart):
+        if (existing.get("packageId") == new_item.get("packageId")
+                and existing.get("tripId") == new_item.get("tripId")
+                and (existing.get("optionId") or "") == (new_item.get("optionId") or "")):
+            next_pax = existing["pax"] + new_item["pax"]
+            merged = dict(existing)
+            merged.update(new_item)
+            merged["pax"] = next_pax
+            cart[index] = recalculate_local_cart_item(merged, next_pax)
+            return cart
+    cart.append(recalculate_local_cart_item(new_item, new_item["pax"]))
+    return cart
+
+
+def cart_min_pax(item: dict) -> int:
+    """Cart page getMinPax (the - button disables at this value)"""
+    raw = item.get("minPax")
+    value = _js_number(1 if raw is None else raw)
+    return max(1, value if value and not math.isnan(value) else 1)
+
+
+def cart_max_pax(item: dict):
+    value = _js_number(item.get("maxPax") if item.get("maxPax") is not None else 0)
+    return math.floor(value) if math.isfinite(value) and value > 0 else None
+
+
+def cart_summary(items: list) -> dict:
+    subtotal = sum(item["totalPrice"] for item in items)
+    return {"totalGuests": sum(item["pax"] for item in items), "subtotal": subtotal, "total": subtotal}
+
+
+# -- checking scraped values -----------------------------------------------
+
+def parse_amount(text: str):
+    """Last number in a display string ('Total (3 travelers) 4,500 THB' -> 4500)"""
+    amounts = AMOUNT.findall(text or "")
+    return float(amounts[-1].replace(",", "")) if amounts else None
+
+
+def check_breakdown(lines: list) -> list:
+    """Mismatches in a scraped price breakdown (qa.extract price_lines/totals)
+
+    Every "Adult: 2 × 1,500 THB  3,000 THB" row must equal count × unit, and
+    the "Total" row must equal the sum of the rows.
+    """
+    problems = []
+    row_sum = 0.0
+    total = None
+    for line in lines:
+        kind, amounts = line.get("kind"), line.get("amounts") or []
+        if kind in ("adult", "child", "infant") and len(amounts) >= 3:
+            count, unit, amount = amounts[-3:]
+            row_sum += amount
+            if abs(count * unit - amount) > 0.5:
+                problems.append(f"{line['text']}: {count} × {unit} != {amount}")
+        elif kind == "total" and amounts:
+            total = amounts[-1]
+    if total is not None and row_sum and abs(total - row_sum) > 0.5:
+        problems.append(f"Total {total} != sum of rows {row_sum}")
+    return problems
+
+
+def same_amount(a, b) -> bool:
+    return a is not None and b is not None and abs(float(a) - float(b)) < 0.005
+
+
+# -- invariant sweep -------------------------------------------------------
+
+def _random_option(rng: random.Random) -> dict:
+    if rng.random() < 0.2:
+        return {"isFlatRate": True, "flatRatePrice": rng.choice([None, 0, 4500, "6000", MISSING])}
+    tiers, low = [], 1
+    for _ in range(rng.randint(0, 4)):
+        high = low + rng.randint(0, 5)
+        tiers.append({"minPax": low, "maxPax": high, "pricePerPerson": rng.randint(5, 40) * 100})
+        low = high + 1 + rng.randint(0, 2)
+    if tiers and rng.random() < 0.3:
+        tiers[-1]["maxPax"] = None
+    return {"isFlatRate": False, "pricingTiers": tiers}
+
+
+def sweep(iterations: int = 10_000, seed: int = 0) -> list:
+    """Check pricing/cart invariants over random options, pax and cart edits"""
+    rng = random.Random(seed)
+    failures = []
+    for i in range(iterations):
+        option = _random_option(rng)
+        base = rng.choice([0, 1000, 1500, "2000"])
+        pax = rng.choice([-3, 0, 0.5, 1, 2, 3, 7, 12, 40, "4", None])
+        priced = resolve_option_pricing(option, pax, base)
+        n = normalize_pax(pax)
+
+        if priced["isFlatRate"]:
+            if priced["total"] != priced["unitPrice"]:
+                failures.append(f"#{i} flat total != rate: {option} {priced}")
+        elif priced["total"] != priced["unitPrice"] * n:
+            failures.append(f"#{i} total != unit × pax: {option} pax={pax} {priced}")
+
+        tier = resolve_tier_price(option.get("pricingTiers"), pax)
+        if not priced["isFlatRate"] and tier is None and priced["unitPrice"] != to_finite_number(base):
+            failures.append(f"#{i} no tier but unit != base: {option} pax={pax}")
+
+        item = {
+            "pax": n, "unitPrice": priced["unitPrice"], "totalPrice": priced["total"],
+            "basePrice": to_finite_number(base), "pricingTiers": option.get("pricingTiers") or [],
+            "isFlatRate": priced["isFlatRate"], "minPax": rng.choice([None, 1, 2]),
+            "maxPax": rng.choice([None, 0, 10]),
+        }
+        if rng.random() < 0.5 and not priced["isFlatRate"]:
+            item.update(passengers={"adult": n, "child": 0, "infant": 0},
+                        adultUnitPrice=priced["unitPrice"], childUnitPrice=priced["unitPrice"] // 2,
+                        infantUnitPrice=0)
+        for step in (1, -1, -100, 100):
+            after = recalculate_local_cart_item(item, item["pax"] + step)
+            low, high = cart_min_pax(item), cart_max_pax(item)
+            if "passengers" not in item or item["isFlatRate"]:
+                if after["pax"] < low or (high and after["pax"] > high):
+                    failures.append(f"#{i} pax {after['pax']} outside [{low}, {high}]: {item}")
+            if after["totalPrice"] < 0:
+                failures.append(f"#{i} negative total: {after}")
+            again = recalculate_local_cart_item(after, after["pax"])
+            if again["totalPrice"] != after["totalPrice"] or again["pax"] != after["pax"]:
+                failures.append(f"#{i} recalculation not idempotent: {after} -> {again}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pricing oracle self-check")
+    parser.add_argument("--sweep", type=int, default=10_000, help="Random combinations to check")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    failures = sweep(args.sweep, args.seed)
+    if failures:
+        print(f"❌ {len(failures)} invariant violations")
+        for failure in failures[:20]:
+            print(f"  - {failure}")
+    else:
+        print(f"✅ {args.sweep} pricing/cart combinations passed")
+    return failures
+
+
+if __name__ == "__main__":
+    raise SystemExit(1 if main() else 0)
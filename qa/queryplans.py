@@ -0,0 +1,373 @@
+"""
+Query-plan benchmark for the lib/supabase access patterns.
+
+Replays the SQL that PostgREST generates for the app's list/dashboard
+queries against the seeded local Postgres (qa.pg + qa.seed), runs each with
+EXPLAIN (ANALYZE, BUFFERS) and flags:
+
+    seq-scan          a Seq Scan that reads >= --seq-scan-rows rows
+    sort              a Sort over >= --seq-scan-rows rows (no index gives the order)
+    sort-spill        a Sort that went to disk
+    missing-index     no non-partial index leads with the columns the query
+                      filters and orders on (suggested DDL included)
+
+Embeds such as select('*, customers(*), trips(*, packages(*))') become the
+LEFT JOIN LATERAL ... row_to_json() shape PostgREST emits, and
+count: 'exact' becomes a separate count(*) over the same filters.
+
+Results are saved under .qa-cache/queryplans/<label>.json so a schema change
+can be measured: run with --label before, apply the migration, run with
+--label after --compare before.
+
+Usage:
+    python -m qa.queryplans --label before
+    python -m qa.queryplans --label after --compare before --fail-on-regression 20
+"""
+
+import argparse
+import json
+import statistics
+from datetime import date, timedelta
+
+from qa import pg
+from qa.config import ROOT
+
+RESULTS_DIR = ROOT / ".qa-cache" / "queryplans"
+DEFAULT_REPORT = "/tmp/qa_queryplans_report.json"
+
+BOOKING_EMBEDS = """
+    left join lateral (
+      select customers_1.* from public.customers as customers_1
+      where customers_1.id = bookings.customer_id
+    ) as bookings_customers_1 on true
+    left join lateral (
+      select trips_1.*, row_to_json(trips_packages_2.*) as packages
+      from public.trips as trips_1
+      left join lateral (
+        select packages_2.* from public.packages as packages_2
+        where packages_2.id = trips_1.package_id
+      ) as trips_packages_2 on true
+      where trips_1.id = bookings.trip_id
+    ) as bookings_trips_1 on true
+"""
+BOOKING_SELECT = ("select bookings.*, row_to_json(bookings_customers_1.*) as customers, "
+                  "row_to_json(bookings_trips_1.*) as trips from public.bookings")
+
+# name, source, sql (with %(param)s placeholders), expected index (table, columns) or None
+QUERIES = (
+    ("schedules_by_tour", "schedules.ts:getSchedules({tourId, dateFrom, dateTo})", """
+        select * from public.tour_schedules
+        where tour_id = %(tour_id)s and start_date >= %(date_from)s and start_date <= %(date_to)s
+        order by start_date asc, start_time asc
+        limit 50 offset 0
+     """, ("tour_schedules", ("tour_id", "start_date", "start_time"))),
+    ("schedules_by_tour_count", "schedules.ts:getSchedules count: 'exact'", """
+        select count(*) from public.tour_schedules
+        where tour_id = %(tour_id)s and start_date >= %(date_from)s and start_date <= %(date_to)s
+     """, ("tour_schedules", ("tour_id", "start_date"))),
+    ("schedules_by_status", "schedules.ts:getSchedules({status, dateFrom, dateTo})", """
+        select * from public.tour_schedules
+        where status = 'open' and start_date >= %(date_from)s and start_date <= %(date_to)s
+        order by start_date asc, start_time asc
+        limit 50 offset 0
+     """, ("tour_schedules", ("status", "start_date", "start_time"))),
+    ("schedules_by_status_count", "schedules.ts:getSchedules count: 'exact'", """
+        select count(*) from public.tour_schedules
+        where status = 'open' and start_date >= %(date_from)s and start_date <= %(date_to)s
+     """, ("tour_schedules", ("status", "start_date"))),
+    ("schedules_deep_page", "GET /api/v1/schedules?page=40&limit=200", """
+        select * from public.tour_schedules
+        where start_date >= %(date_from)s and start_date <= %(date_to)s
+        order by start_date asc, start_time asc
+        limit 200 offset 7800
+     """, ("tour_schedules", ("start_date", "start_time"))),
+    ("dashboard_recent_bookings", "dashboard.ts:getRecentBookings(10)", BOOKING_SELECT + BOOKING_EMBEDS + """
+        order by bookings.booking_date desc
+        limit 10 offset 0
+     """, ("bookings", ("booking_date",))),
+    ("bookings_by_status", "bookings.ts:getBookings({status})", BOOKING_SELECT + BOOKING_EMBEDS + """
+        where bookings.status = 'confirmed'
+        order by bookings.booking_date desc
+        limit 20 offset 0
+     """, ("bookings", ("status", "booking_date"))),
+    ("bookings_by_status_count", "bookings.ts:getBookings count: 'exact'", """
+        select count(*) from public.bookings where status = 'confirmed'
+     """, ("bookings", ("status",))),
+    ("bookings_by_payment_status", "bookings.ts:getBookings({paymentStatus})", BOOKING_SELECT + BOOKING_EMBEDS + """
+        where bookings.payment_status = 'partial'
+        order by bookings.booking_date desc
+        limit 20 offset 0
+     """, ("bookings", ("payment_status", "booking_date"))),
+    ("bookings_by_customer", "bookings.ts:getBookings({customerId})", BOOKING_SELECT + BOOKING_EMBEDS + """
+        where bookings.customer_id = %(customer_id)s
+        order by bookings.booking_date desc
+        limit 20 offset 0
+     """, ("bookings", ("customer_id", "booking_date"))),
+    ("dashboard_upcoming_trips", "dashboard.ts:getUpcomingTrips(10)", """
+        select trips.*, row_to_json(trips_packages_1.*) as packages
+        from public.trips
+        left join lateral (
+          select packages_1.* from public.packages as packages_1 where packages_1.id = trips.package_id
+        ) as trips_packages_1 on true
+        where trips.date >= %(today)s
+        order by trips.date asc
+        limit 10
+     """, ("trips", ("date",))),
+    ("dashboard_revenue", "dashboard.ts:getDashboardStats payments", """
+        select amount from public.payments where status = 'completed'
+     """, None),
+    ("dashboard_upcoming_count", "dashboard.ts:getDashboardStats trips count", """
+        select count(*) from public.trips where date >= %(today)s
+     """, ("trips", ("date",))),
+    ("booking_detail", "bookings.ts:getBookingById", """
+        select bookings.*, row_to_json(bookings_customers_1.*) as customers,
+               row_to_json(bookings_trips_1.*) as trips,
+               coalesce(bookings_passengers_1.rows, '[]') as booking_passengers,
+               coalesce(bookings_payments_1.rows, '[]') as payments
+        from public.bookings
+     """ + BOOKING_EMBEDS + """
+        left join lateral (
+          select json_agg(p.*) as rows from public.booking_passengers as p where p.booking_id = bookings.id
+        ) as bookings_passengers_1 on true
+        left join lateral (
+          select json_agg(pay.*) as rows from public.payments as pay where pay.booking_id = bookings.id
+        ) as bookings_payments_1 on true
+        where bookings.id = %(booking_id)s
+     """, None),
+)
+
+
+def literal(value) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def inline(sql: str, params: dict) -> str:
+    """Bind params as literals so EXPLAIN sees a custom plan, as PostgREST's first executions do"""
+    return sql % {name: literal(value) for name, value in params.items()}
+
+
+def sample_params(conn) -> dict:
+    """Filter values that exist in the seeded data"""
+    today = date.today()
+    tour = pg.fetch_one(conn, "select tour_id from public.tour_schedules group by tour_id "
+                              "order by count(*) desc limit 1")
+    customer = pg.fetch_one(conn, "select customer_id from public.bookings group by customer_id "
+                                  "order by count(*) desc limit 1")
+    booking = pg.fetch_one(conn, "select id from public.bookings order by booking_date desc limit 1")
+    return {
+        "today": today.isoformat(),
+        "date_from": (today - timedelta(days=180)).isoformat(),
+        "date_to": (today + timedelta(days=90)).isoformat(),
+        "tour_id": str(tour[0]) if tour else None,
+        "customer_id": str(customer[0]) if customer else None,
+        "booking_id": str(booking[0]) if booking else None,
+    }
+
+
+def table_sizes(conn) -> dict:
+    rows = pg.execute(conn, """
+        select relname, reltuples::bigint from pg_class c
+        join pg_namespace n on n.oid = c.relnamespace
+        where n.nspname = 'public' and c.relkind = 'r'
+          and relname in ('customers', 'packages', 'trips', 'tours', 'tour_schedules',
+                          'bookings', 'booking_passengers', 'payments')
+    """)
+    return {name: count for name, count in rows}
+
+
+def index_columns(conn, table: str) -> dict:
+    """{index name: [column, ...]} for the table's non-partial indexes"""
+    rows = pg.execute(conn, """
+        select ic.relname,
+               array(select a.attname
+                     from unnest(i.indkey) with ordinality as k(attnum, n)
+                     join pg_attribute a on a.attrelid = i.indrelid and a.attnum = k.attnum
+                     order by k.n)
+        from pg_index i
+        join pg_class ic on ic.oid = i.indexrelid
+        join pg_class tc on tc.oid = i.indrelid
+        join pg_namespace ns on ns.oid = tc.relnamespace
+        where ns.nspname = 'public' and tc.relname = %s and i.indpred is null
+    """, (table,))
+    return {name: list(columns) for name, columns in rows}
+
+
+def covering_index(conn, table: str, columns: tuple):
+    """Name of an index whose leading columns are exactly `columns`, or None"""
+    for name, indexed in index_columns(conn, table).items():
+        if tuple(indexed[:len(columns)]) == tuple(columns):
+            return name
+    return None
+
+
+def walk(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk(child)
+
+
+def scanned_rows(node: dict) -> int:
+    per_loop = node.get("Actual Rows", 0) + node.get("Rows Removed by Filter", 0)
+    return int(per_loop * node.get("Actual Loops", 1))
+
+
+def plan_flags(plan: dict, min_rows: int) -> list:
+    flags = []
+    for node in walk(plan):
+        kind = node["Node Type"]
+        if kind == "Seq Scan" and scanned_rows(node) >= min_rows:
+            flags.append({"flag": "seq-scan", "relation": node.get("Relation Name"),
+                          "rows": scanned_rows(node), "filter": node.get("Filter")})
+        elif kind in ("Sort", "Incremental Sort"):
+            sort_input = node["Plans"][0] if node.get("Plans") else node
+            sorted_rows = int(sort_input.get("Actual Rows", 0) * sort_input.get("Actual Loops", 1))
+            if sorted_rows >= min_rows:
+                flags.append({"flag": "sort", "rows": sorted_rows, "key": node.get("Sort Key")})
+            if "external" in str(node.get("Sort Method", "")).lower():
+                flags.append({"flag": "sort-spill", "method": node.get("Sort Method"),
+                              "space_kb": node.get("Sort Space Used")})
+    return flags
+
+
+def explain(conn, sql: str) -> dict:
+    row = pg.fetch_one(conn, "explain (analyze, buffers, format json) " + sql)
+    document = row[0]
+    if isinstance(document, str):
+        document = json.loads(document)
+    return document[0]
+
+
+def run_query(conn, name: str, source: str, sql: str, index_hint, params: dict, runs: int, min_rows: int) -> dict:
+    statement = inline(sql, params)
+    explain(conn, statement)  # warm-up: caches, catalog lookups
+    samples = [explain(conn, statement) for _ in range(runs)]
+    execution = [s["Execution Time"] for s in samples]
+    planning = [s["Planning Time"] for s in samples]
+    last = samples[-1]
+    plan = last["Plan"]
+
+    flags = plan_flags(plan, min_rows)
+    if index_hint:
+        table, columns = index_hint
+        if not covering_index(conn, table, columns):
+            flags.append({"flag": "missing-index", "table": table, "columns": list(columns),
+                          "ddl": f"create index on public.{table} ({', '.join(columns)});"})
+
+    return {
+        "name": name,
+        "source": source,
+        "sql": " ".join(statement.split()),
+        "execution_ms": round(statistics.median(execution), 3),
+        "execution_ms_runs": [round(v, 3) for v in execution],
+        "planning_ms": round(statistics.median(planning), 3),
+        "rows": plan.get("Actual Rows"),
+        "shared_hit_blocks": plan.get("Shared Hit Blocks"),
+        "shared_read_blocks": plan.get("Shared Read Blocks"),
+        "node_types": sorted({n["Node Type"] for n in walk(plan)}),
+        "indexes_used": sorted({n["Index Name"] for n in walk(plan) if n.get("Index Name")}),
+        "flags": flags,
+        "plan": plan,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold_pct: float) -> list:
+    """Per-query deltas against a saved run; regressions are slower than threshold_pct"""
+    before = {q["name"]: q for q in baseline["queries"]}
+    rows = []
+    for query in current["queries"]:
+        old = before.get(query["name"])
+        if not old:
+            continue
+        delta = ((query["execution_ms"] - old["execution_ms"]) / old["execution_ms"] * 100
+                 if old["execution_ms"] else 0.0)
+        rows.append({
+            "name": query["name"],
+            "before_ms": old["execution_ms"],
+            "after_ms": query["execution_ms"],
+            "delta_pct": round(delta, 1),
+            "regression": delta > threshold_pct,
+            "plan_changed": old["node_types"] != query["node_types"] or old["indexes_used"] != query["indexes_used"],
+            "flags_before": sorted({f["flag"] for f in old["flags"]}),
+            "flags_after": sorted({f["flag"] for f in query["flags"]}),
+        })
+    return rows
+
+
+def describe_flag(flag: dict) -> str:
+    kind = flag["flag"]
+    if kind == "seq-scan":
+        return f"seq scan on {flag['relation']} ({flag['rows']:,} rows)"
+    if kind == "sort":
+        return f"sort of {flag['rows']:,} rows on {', '.join(flag['key'] or [])}"
+    if kind == "sort-spill":
+        return f"sort spilled to disk ({flag['space_kb']} kB)"
+    return f"missing index: {flag['ddl']}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN ANALYZE the app's query shapes on the local Postgres")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per query (median reported)")
+    parser.add_argument("--only", nargs="*", help="Query names to run")
+    parser.add_argument("--seq-scan-rows", type=int, default=1000, help="Flag scans/sorts reading at least this many rows")
+    parser.add_argument("--label", default="latest", help=f"Save results as {RESULTS_DIR}/<label>.json")
+    parser.add_argument("--compare", help="Label of a saved run to compare against")
+    parser.add_argument("--fail-on-regression", type=float, metavar="PCT",
+                        help="Exit 1 if any query is slower than the baseline by more than PCT%%")
+    parser.add_argument("--report", default=DEFAULT_REPORT)
+    args = parser.parse_args()
+
+    conn = pg.prepare()
+    sizes = table_sizes(conn)
+    if sizes.get("bookings", 0) <= 0:
+        print("⚠ bookings looks empty; seed first: python -m qa.seed --bookings 100000 --truncate")
+    params = sample_params(conn)
+
+    print("\n" + "="*80)
+    print(f"Query plans on {pg.dsn().rsplit('@', 1)[-1]} "
+          f"({sizes.get('bookings', 0):,} bookings, {sizes.get('tour_schedules', 0):,} schedules)")
+    print("="*80)
+
+    report = {"label": args.label, "sizes": sizes, "params": params, "queries": []}
+    for name, source, sql, index_hint in QUERIES:
+        if args.only and name not in args.only:
+            continue
+        result = run_query(conn, name, source, sql, index_hint, params, args.runs, args.seq_scan_rows)
+        report["queries"].append(result)
+        status = "⚠" if result["flags"] else "✓"
+        print(f"{status} {name:<28} {result['execution_ms']:>9.2f}ms  rows {result['rows']}  "
+              f"indexes {', '.join(result['indexes_used']) or '-'}")
+        for flag in result["flags"]:
+            print(f"    {describe_flag(flag)}")
+    conn.close()
+
+    failed = []
+    if args.compare:
+        with open(RESULTS_DIR / f"{args.compare}.json") as f:
+            baseline = json.load(f)
+        report["compare"] = {"baseline": args.compare,
+                             "queries": compare(report, baseline, args.fail_on_regression or 0)}
+        print(f"\nCompared with '{args.compare}':")
+        for row in report["compare"]["queries"]:
+            status = "❌" if row["regression"] and args.fail_on_regression is not None else "✓"
+            plan_note = "  plan changed" if row["plan_changed"] else ""
+            print(f"{status} {row['name']:<28} {row['before_ms']:>9.2f}ms → {row['after_ms']:>9.2f}ms "
+                  f"({row['delta_pct']:+.1f}%){plan_note}")
+            if row["regression"] and args.fail_on_regression is not None:
+                failed.append(row["name"])
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(RESULTS_DIR / f"{args.label}.json", "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"\n✅ Saved as '{args.label}' ({RESULTS_DIR / (args.label + '.json')}), report at {args.report}")
+    return report, failed
+
+
+if __name__ == "__main__":
+    _, failed = main()
+    raise SystemExit(1 if failed else 0)
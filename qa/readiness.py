@@ -0,0 +1,132 @@
+"""
+Event-driven readiness waits for the booking flows.
+
+Instead of sleeping a fixed time after each click, wait for the signal the
+click actually produces:
+
+- the `6cat-cart-updated` window event fired by setLocalCart()
+  (lib/cart/local-cart.ts) after any cart write
+- the schedule/trip response a page needs before its calendar is usable
+  (/api/v1/schedules, /api/v1/tours/[id]/schedules, or the Supabase
+  `trips` query the destination page issues directly)
+- the price breakdown text no longer changing
+
+A readiness wait that times out only logs a warning: it replaces pacing, it
+is not an assertion. The checks that follow it decide pass/fail.
+"""
+
+from contextlib import contextmanager
+
+from playwright.sync_api import BrowserContext, Page, Response
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+CART_EVENT = "6cat-cart-updated"
+# The breakdown box, not the dashed empty-state boxes that share its classes
+PRICE_BREAKDOWN = "div.bg-gray-50.rounded-xl:has(> div.border-t)"
+AVAILABILITY_MESSAGE = "p.text-green-600, p.text-destructive"
+
+INIT_SCRIPT = """
+(() => {
+  window.__qaCartUpdates = 0;
+  window.addEventListener('%s', () => { window.__qaCartUpdates += 1; });
+})();
+""" % CART_EVENT
+
+SETTLE_JS = """
+([selector, quietMs]) => {
+  // A missing element counts as settled once it has stayed missing for quietMs
+  const el = document.querySelector(selector);
+  const text = el ? el.innerText : null;
+  const now = performance.now();
+  const state = (window.__qaSettle = window.__qaSettle || {});
+  const last = state[selector];
+  if (!last || last.text !== text) {
+    state[selector] = { text, since: now };
+    return false;
+  }
+  return now - last.since >= quietMs;
+}
+"""
+
+
+def install(context: BrowserContext):
+    """Register the cart-event counter on every page of the context"""
+    context.add_init_script(INIT_SCRIPT)
+
+
+def is_schedules_response(response: Response) -> bool:
+    url = response.url
+    return (
+        "/api/v1/schedules" in url
+        or ("/api/v1/tours/" in url and "/schedules" in url)
+        or "/rest/v1/trips" in url
+    )
+
+
+def _warn(what: str, timeout: int):
+    print(f"⚠ Readiness: no {what} within {timeout}ms, continuing")
+
+
+@contextmanager
+def expect_cart_update(page: Page, timeout: int = 10_000):
+    """Wait until the wrapped action fires at least one cart-updated event"""
+    before = page.evaluate("() => window.__qaCartUpdates ?? 0")
+    yield
+    try:
+        page.wait_for_function(
+            "n => (window.__qaCartUpdates ?? 0) > n", arg=before, timeout=timeout
+        )
+    except PlaywrightTimeoutError:
+        _warn(f"'{CART_EVENT}' event", timeout)
+
+
+@contextmanager
+def expect_schedules(page: Page, timeout: int = 15_000):
+    """Wait until the wrapped action gets its schedule/trip data back"""
+    seen = []
+
+    def on_response(response: Response):
+        if is_schedules_response(response):
+            seen.append(response)
+
+    page.on("response", on_response)
+    try:
+        yield
+        if not seen:
+            try:
+                page.wait_for_event("response", predicate=is_schedules_response, timeout=timeout)
+            except PlaywrightTimeoutError:
+                _warn("schedules response", timeout)
+    finally:
+        page.remove_listener("response", on_response)
+
+
+def settle(page: Page, selector: str = PRICE_BREAKDOWN, quiet_ms: int = 150, timeout: int = 5_000):
+    """Wait until the text of `selector` (or its absence) has stopped changing for quiet_ms"""
+    page.evaluate("s => { if (window.__qaSettle) delete window.__qaSettle[s]; }", selector)
+    try:
+        page.wait_for_function(SETTLE_JS, arg=[selector, quiet_ms], timeout=timeout)
+    except PlaywrightTimeoutError:
+        _warn(f"stable text for {selector}", timeout)
+
+
+def _wait_visible(page: Page, selector: str, what: str, timeout: int):
+    try:
+        page.locator(selector).first.wait_for(state="visible", timeout=timeout)
+    except PlaywrightTimeoutError:
+        _warn(what, timeout)
+
+
+def wait_for_calendar(page: Page, timeout: int = 5_000):
+    """Wait for the date picker grid opened by Choose Date"""
+    _wait_visible(page, 'text="Green dots = available"', "date picker", timeout)
+
+
+def wait_for_options(page: Page, timeout: int = 5_000):
+    """Wait for the package option list rendered after a date is picked"""
+    _wait_visible(page, 'h3:has-text("Choose your package option")', "package options", timeout)
+
+
+def wait_for_availability(page: Page, timeout: int = 5_000):
+    """Wait for the Check button's success or error message to render"""
+    _wait_visible(page, AVAILABILITY_MESSAGE, "availability message", timeout)
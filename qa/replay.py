@@ -0,0 +1,264 @@
+"""
+Record and replay of the app's API and Supabase REST traffic.
+
+QA_NETWORK selects the mode for every context made by qa.browser:
+
+    record   requests to /api/* and Supabase /rest/v1/* go to the network
+             as usual and each response is saved to the store
+    replay   the same requests are answered from the store through
+             context.route; nothing reaches the backend. A request with no
+             recording is aborted (or sent to the network with
+             QA_NETWORK_MISS=continue) and counted as a miss
+
+Requests are keyed by method, normalized URL (host dropped, query sorted,
+QA_NETWORK_IGNORE_PARAMS removed) and normalized body (JSON re-serialized
+with sorted keys, QA_NETWORK_IGNORE_FIELDS removed at any depth). When one
+key is requested several times in a run - trips re-fetched after a booking,
+say - the responses are replayed in recorded order and the last one repeats.
+
+Store layout (QA_NETWORK_STORE, default .qa-cache/network/default):
+
+    index.<scope>.json   {key: {"method", "url", "responses": [...]}}
+    bodies/<sha1>        response bodies, shared between scopes
+
+The scope is the flow name under qa.runner (QA_NETWORK_SCOPE), so parallel
+workers never write the same index and each flow replays its own sequence;
+keys missing from a flow's index fall back to the other scopes.
+
+The Next.js server still serves pages and assets; only the data requests
+are recorded.
+
+Usage:
+    python -m qa.runner --record-network good-run
+    python -m qa.runner --replay-network good-run --fast
+    python -m qa.replay good-run                  # summarize a store
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import urllib.parse
+from pathlib import Path
+
+from qa.config import ROOT
+from qa.routes import route_key
+
+MODES = ("record", "replay")
+STORE_ROOT = ROOT / ".qa-cache" / "network"
+DROP_HEADERS = {"content-length", "content-encoding", "transfer-encoding", "connection", "keep-alive"}
+
+
+def _env_list(name: str) -> set:
+    return {item.strip() for item in os.environ.get(name, "").split(",") if item.strip()}
+
+
+def mode() -> str:
+    value = os.environ.get("QA_NETWORK", "").strip().lower()
+    return value if value in MODES else ""
+
+
+def store_path(name: str = None) -> Path:
+    """A store name resolves under .qa-cache/network, a path is used as is"""
+    name = name or os.environ.get("QA_NETWORK_STORE") or "default"
+    path = Path(name)
+    return path if path.is_absolute() or os.sep in name else STORE_ROOT / name
+
+
+def is_data_request(url: str) -> bool:
+    path = urllib.parse.urlsplit(url).path
+    return path.startswith("/api/") or path.startswith("/rest/v1/")
+
+
+def normalize_url(url: str) -> str:
+    parts = urllib.parse.urlsplit(url)
+    ignored = _env_list("QA_NETWORK_IGNORE_PARAMS")
+    query = sorted((k, v) for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+                   if k not in ignored)
+    return parts.path + (f"?{urllib.parse.urlencode(query)}" if query else "")
+
+
+def _strip_fields(value, ignored: set):
+    if isinstance(value, dict):
+        return {k: _strip_fields(v, ignored) for k, v in value.items() if k not in ignored}
+    if isinstance(value, list):
+        return [_strip_fields(v, ignored) for v in value]
+    return value
+
+
+def normalize_body(body) -> str:
+    if not body:
+        return ""
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    try:
+        document = json.loads(body)
+    except ValueError:
+        return body
+    return json.dumps(_strip_fields(document, _env_list("QA_NETWORK_IGNORE_FIELDS")),
+                      sort_keys=True, separators=(",", ":"))
+
+
+def request_key(method: str, url: str, body) -> str:
+    raw = f"{method.upper()} {normalize_url(url)}\n{normalize_body(body)}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class NetworkStore:
+    def __init__(self, path: Path, scope: str):
+        self.path = Path(path)
+        self.scope = scope
+        self.index_path = self.path / f"index.{scope}.json"
+        self.entries = self._read(self.index_path)
+        self._fallback = None
+
+    @staticmethod
+    def _read(path: Path) -> dict:
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def fallback(self) -> dict:
+        """Entries from every other scope's index"""
+        if self._fallback is None:
+            self._fallback = {}
+            for path in sorted(self.path.glob("index.*.json")):
+                if path != self.index_path:
+                    for key, entry in self._read(path).items():
+                        self._fallback.setdefault(key, entry)
+        return self._fallback
+
+    def lookup(self, key: str):
+        return self.entries.get(key) or self.fallback().get(key)
+
+    def add(self, key: str, method: str, url: str, status: int, headers: dict, body: bytes):
+        digest = hashlib.sha1(body).hexdigest()
+        body_path = self.path / "bodies" / digest
+        if not body_path.exists():
+            body_path.parent.mkdir(parents=True, exist_ok=True)
+            body_path.write_bytes(body)
+        entry = self.entries.setdefault(key, {"method": method, "url": normalize_url(url), "responses": []})
+        entry["responses"].append({
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in DROP_HEADERS},
+            "body": digest,
+        })
+        self.save()
+
+    def body(self, digest: str) -> bytes:
+        return (self.path / "bodies" / digest).read_bytes()
+
+    def save(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self.entries, indent=1, sort_keys=True), encoding="utf-8")
+        tmp.replace(self.index_path)
+
+
+class NetworkReplay:
+    def __init__(self):
+        self._store = None
+        self.reset()
+
+    def reset(self):
+        """Start a new run: occurrence counters and stats go back to zero"""
+        self._store = None
+        self._seen = {}
+        self._stats = {"mode": mode(), "recorded": 0, "replayed": 0, "misses": []}
+
+    def store(self) -> NetworkStore:
+        if self._store is None:
+            self._store = NetworkStore(store_path(), os.environ.get("QA_NETWORK_SCOPE", "default"))
+            if mode() == "record":
+                self._store.entries = {}
+        return self._store
+
+    def install(self, context):
+        if mode():
+            context.route(is_data_request, self._handle)
+
+    def _occurrence(self, key: str) -> int:
+        self._seen[key] = self._seen.get(key, 0) + 1
+        return self._seen[key] - 1
+
+    def _handle(self, route):
+        request = route.request
+        key = request_key(request.method, request.url, request.post_data_buffer)
+        occurrence = self._occurrence(key)
+        if mode() == "record":
+            response = route.fetch()
+            body = response.body()
+            self.store().add(key, request.method, request.url, response.status, response.headers, body)
+            self._stats["recorded"] += 1
+            route.fulfill(response=response, body=body)
+            return
+
+        entry = self.store().lookup(key)
+        if not entry:
+            self._stats["misses"].append(f"{request.method} {route_key(request.url)} ({normalize_url(request.url)})")
+            if os.environ.get("QA_NETWORK_MISS") == "continue":
+                route.continue_()
+            else:
+                route.abort("internetdisconnected")
+            return
+        recorded = entry["responses"][min(occurrence, len(entry["responses"]) - 1)]
+        self._stats["replayed"] += 1
+        route.fulfill(status=recorded["status"], headers=recorded["headers"],
+                      body=self.store().body(recorded["body"]))
+
+    def stats(self) -> dict:
+        return dict(self._stats, misses=list(self._stats["misses"]))
+
+
+_replay = NetworkReplay()
+
+
+def install(context):
+    _replay.install(context)
+
+
+def reset():
+    _replay.reset()
+
+
+def stats() -> dict:
+    return _replay.stats()
+
+
+def describe(path: Path) -> dict:
+    """Entry, response and byte counts per scope and per route"""
+    summary = {"store": str(path), "scopes": {}, "routes": {}, "bodies": 0, "body_bytes": 0}
+    for index in sorted(path.glob("index.*.json")):
+        entries = NetworkStore._read(index)
+        scope = index.name[len("index."):-len(".json")]
+        summary["scopes"][scope] = {"keys": len(entries),
+                                    "responses": sum(len(e["responses"]) for e in entries.values())}
+        for entry in entries.values():
+            name = f"{entry['method']} {route_key(entry['url'])}"
+            summary["routes"][name] = summary["routes"].get(name, 0) + len(entry["responses"])
+    for body in (path / "bodies").glob("*"):
+        summary["bodies"] += 1
+        summary["body_bytes"] += body.stat().st_size
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a recorded network store")
+    parser.add_argument("store", nargs="?", help="Store name or path (default: QA_NETWORK_STORE or 'default')")
+    args = parser.parse_args()
+
+    summary = describe(store_path(args.store))
+    print("\n" + "="*80)
+    print(f"Network store {summary['store']}")
+    print("="*80)
+    for scope, counts in summary["scopes"].items():
+        print(f"  {scope:<30} {counts['keys']:>5} keys {counts['responses']:>6} responses")
+    print(f"\n{summary['bodies']} bodies, {summary['body_bytes'] / 1024:.1f} KB")
+    for name, count in sorted(summary["routes"].items(), key=lambda item: -item[1]):
+        print(f"  {count:>6}  {name}")
+    return summary
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""
+URL → route pattern, so caches and traces group /destinations/<uuid> pages
+together.
+"""
+
+import re
+from urllib.parse import urlsplit
+
+ID_SEGMENT = re.compile(
+    r"/(?:[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|\d+)(?=/|$)",
+    re.IGNORECASE,
+)
+
+
+def route_key(url: str) -> str:
+    """'/destinations/:id' for http://host/destinations/<uuid>?x=1"""
+    path = urlsplit(url).path or "/"
+    path = ID_SEGMENT.sub("/:id", path)
+    if path != "/":
+        path = path.rstrip("/")
+    return path
@@ -0,0 +1,291 @@
+"""
+Parallel runner for the qa_*.py booking flows.
+
+Each flow runs in its own worker process with its own browser, so flows never
+share cookies, localStorage or the cart. Their `results` dicts are merged into
+one report.
+
+Every page a flow visits records web vitals and navigation timing (see
+qa.vitals). The report carries the per-route medians, and a route whose
+metric regresses more than --vitals-threshold percent over the saved
+baseline fails the run.
+
+--record-network STORE saves every flow's /api/* and Supabase REST
+responses; --replay-network STORE serves them back offline (see qa.replay).
+--netfilter PROFILE drops images, fonts, media and third-party requests
+(see qa.netfilter); --ci uses the "functional" profile unless QA_NETFILTER
+is set.
+
+Usage:
+    python -m qa.runner                 # all flows, one worker per core
+    python -m qa.runner --workers 2
+    python -m qa.runner --only qa_join_final qa_join_valid
+    python -m qa.runner --fast          # headless, no slow_mo (QA_FAST=1)
+    python -m qa.runner --ci            # --fast + failure-only evidence + small traces
+    python -m qa.runner --update-vitals-baseline
+    python -m qa.runner --vitals-threshold 30
+    python -m qa.runner --record-network good-run
+    python -m qa.runner --replay-network good-run --fast
+    python -m qa.runner --netfilter functional,third_party=allow
+"""
+
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_REPORT = "/tmp/qa_runner_report.json"
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def discover_flows(root: Path = ROOT) -> list:
+    """Find flow modules: root-level qa_*.py files that define main()"""
+    flows = []
+    for path in sorted(root.glob("qa_*.py")):
+        source = path.read_text(encoding="utf-8")
+        if "def main(" in source:
+            flows.append(path.stem)
+    return flows
+
+
+def run_flow(name: str) -> dict:
+    """Run one flow in the current (worker) process and return its record"""
+    log_path = f"/tmp/qa_runner_{name}.log"
+    record = {"flow": name, "log": log_path, "results": None, "error": None}
+    started = time.perf_counter()
+
+    os.environ["QA_NETWORK_SCOPE"] = name
+    from qa import evidence, netfilter, replay, vitals
+
+    evidence.reset()
+    vitals.reset()
+    replay.reset()
+    netfilter.reset()
+    with open(log_path, "w", encoding="utf-8") as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            module = importlib.import_module(name)
+            record["results"] = module.main()
+        except Exception as e:
+            traceback.print_exc()
+            record["error"] = f"{type(e).__name__}: {e}"
+
+    record["vitals"] = vitals.samples()
+    record["network"] = replay.stats()
+    record["netfilter"] = netfilter.stats()
+    record["duration_s"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+def _collect_checks(results, prefix: str = "") -> tuple:
+    """Flatten a flow's results dict into (passed, failed) check lists.
+
+    Flows report either explicit "pass"/"fail" lists or nested
+    {check_name: True/False/None} dicts (qa_booking_flow.py style).
+    """
+    passed, failed = [], []
+    if not isinstance(results, dict):
+        return passed, failed
+
+    passed.extend(str(item) for item in results.get("pass", []))
+    failed.extend(str(item) for item in results.get("fail", []))
+
+    for key, value in results.items():
+        if key in ("pass", "fail", "evidence", "data"):
+            continue
+        label = f"{prefix}{key}"
+        if value is True:
+            passed.append(label)
+        elif value is False:
+            failed.append(label)
+        elif isinstance(value, dict):
+            sub_passed, sub_failed = _collect_checks(value, prefix=f"{label}.")
+            passed.extend(sub_passed)
+            failed.extend(sub_failed)
+    return passed, failed
+
+
+def merge_reports(records: list, wall_clock_s: float, workers: int) -> dict:
+    """Merge per-flow records into one suite report"""
+    from qa import vitals
+
+    report = {
+        "workers": workers,
+        "wall_clock_s": round(wall_clock_s, 3),
+        "serial_time_s": round(sum(r.get("duration_s", 0) for r in records), 3),
+        "flows": {},
+        "evidence": [],
+        "vitals": {"routes": vitals.summarize([s for r in records for s in r.get("vitals") or []])},
+        "network": {"mode": os.environ.get("QA_NETWORK", ""), "recorded": 0, "replayed": 0, "misses": []},
+        "netfilter": {"profile": os.environ.get("QA_NETFILTER", ""), "blocked": 0, "by_kind": {},
+                      "estimated_bytes_saved": 0, "unknown_size": 0},
+        "pass": [],
+        "fail": [],
+    }
+
+    for record in sorted(records, key=lambda r: r["flow"]):
+        name = record["flow"]
+        passed, failed = _collect_checks(record.get("results"))
+        if record.get("error"):
+            failed.append(f"Exception: {record['error']}")
+
+        report["flows"][name] = record
+        network = record.get("network") or {}
+        for field in ("recorded", "replayed"):
+            report["network"][field] += network.get(field, 0)
+        report["network"]["misses"].extend(f"[{name}] {miss}" for miss in network.get("misses", []))
+        filtered = record.get("netfilter") or {}
+        for field in ("blocked", "estimated_bytes_saved", "unknown_size"):
+            report["netfilter"][field] += filtered.get(field, 0)
+        for kind, count in (filtered.get("by_kind") or {}).items():
+            report["netfilter"]["by_kind"][kind] = report["netfilter"]["by_kind"].get(kind, 0) + count
+        manifest = (record.get("results") or {}).get("evidence_manifest") or {}
+        report["evidence"].extend(manifest.get("files", []))
+        report["pass"].extend(f"[{name}] {item}" for item in passed)
+        report["fail"].extend(f"[{name}] {item}" for item in failed)
+
+    return report
+
+
+def run_suite(flows: list, workers: int) -> dict:
+    """Shard flows across a process pool and merge their results"""
+    started = time.perf_counter()
+    records = []
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_flow, name): name for name in flows}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                record = future.result()
+            except Exception as e:
+                record = {"flow": name, "results": None, "error": f"Worker crashed: {e}", "duration_s": 0}
+            status = "❌" if record.get("error") else "✓"
+            print(f"{status} {name} finished in {record.get('duration_s', 0)}s (log: {record.get('log', 'N/A')})")
+            records.append(record)
+
+    return merge_reports(records, time.perf_counter() - started, workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the QA booking flows in parallel")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--only", nargs="*", help="Flow module names to run (default: all)")
+    parser.add_argument("--report", default=DEFAULT_REPORT)
+    parser.add_argument("--fast", action="store_true", help="Headless with slow_mo=0 (sets QA_FAST=1)")
+    parser.add_argument("--ci", action="store_true",
+                        help="CI profile: --fast, failure-only screenshots, small trace buffers")
+    parser.add_argument("--vitals-threshold", type=float, default=20.0, metavar="PCT",
+                        help="Fail when a route's vitals metric regresses more than PCT%% over the baseline")
+    parser.add_argument("--update-vitals-baseline", action="store_true",
+                        help="Save this run's per-route vitals as the new baseline")
+    network = parser.add_mutually_exclusive_group()
+    network.add_argument("--record-network", metavar="STORE", help="Record API/Supabase responses to STORE")
+    network.add_argument("--replay-network", metavar="STORE", help="Serve API/Supabase responses from STORE")
+    parser.add_argument("--netfilter", metavar="PROFILE",
+                        help="Request filter profile/rules, e.g. functional or strict (sets QA_NETFILTER)")
+    args = parser.parse_args()
+
+    if args.netfilter is not None:
+        from qa import netfilter
+
+        try:
+            netfilter.parse_spec(args.netfilter)
+        except ValueError as e:
+            parser.error(str(e))
+        os.environ["QA_NETFILTER"] = args.netfilter
+
+    if args.record_network or args.replay_network:
+        os.environ["QA_NETWORK"] = "record" if args.record_network else "replay"
+        os.environ["QA_NETWORK_STORE"] = args.record_network or args.replay_network
+
+    if args.fast or args.ci:
+        os.environ["QA_FAST"] = "1"
+    if args.ci:
+        os.environ.setdefault("QA_EVIDENCE", "on-failure")
+        os.environ.setdefault("QA_TRACE_CAPACITY", "200")
+        os.environ.setdefault("QA_NETFILTER", "functional")
+
+    flows = discover_flows()
+    if args.only:
+        unknown = sorted(set(args.only) - set(flows))
+        if unknown:
+            parser.error(f"Unknown flows: {', '.join(unknown)} (found: {', '.join(flows)})")
+        flows = [name for name in flows if name in args.only]
+
+    workers = max(1, min(args.workers, len(flows)))
+    print("\n" + "="*80)
+    print(f"Running {len(flows)} flows on {workers} workers")
+    print("="*80)
+
+    report = run_suite(flows, workers)
+
+    from qa import vitals
+
+    routes = report["vitals"]["routes"]
+    if args.update_vitals_baseline:
+        vitals.save_baseline(routes)
+        report["vitals"]["regressions"] = []
+    else:
+        baseline = vitals.load_baseline()
+        report["vitals"]["baseline"] = str(vitals.baseline_path()) if baseline else None
+        report["vitals"]["regressions"] = vitals.regressions(routes, baseline, args.vitals_threshold)
+    report["fail"].extend(
+        f"[vitals] {r['route']} {r['metric']} {r['baseline']} -> {r['current']} (+{r['delta_pct']}%)"
+        for r in report["vitals"]["regressions"]
+    )
+
+    print("\n" + "="*80)
+    print("FINAL RESULTS")
+    print("="*80)
+    print(f"\n✅ PASSED ({len(report['pass'])}):")
+    for item in report["pass"]:
+        print(f"  - {item}")
+
+    print(f"\n❌ FAILED ({len(report['fail'])}):")
+    for item in report["fail"]:
+        print(f"  - {item}")
+
+    print(f"\n⏱  Wall clock: {report['wall_clock_s']}s (serial sum: {report['serial_time_s']}s)")
+    print(f"📸 Evidence files: {len(report['evidence'])}")
+    if report["network"]["mode"] == "record":
+        print(f"📼 Recorded {report['network']['recorded']} responses to {os.environ['QA_NETWORK_STORE']}")
+    elif report["network"]["mode"] == "replay":
+        print(f"📼 Replayed {report['network']['replayed']} responses, "
+              f"{len(report['network']['misses'])} misses")
+        for miss in report["network"]["misses"][:20]:
+            print(f"  ⚠ {miss}")
+    filtered = report["netfilter"]
+    if filtered["profile"]:
+        kinds = ", ".join(f"{kind} {count}" for kind, count in sorted(filtered["by_kind"].items()))
+        print(f"🚫 Netfilter '{filtered['profile']}': {filtered['blocked']} requests filtered ({kinds or 'none'}), "
+              f"~{filtered['estimated_bytes_saved'] / 1024:.0f} KB saved"
+              + (f", {filtered['unknown_size']} of unknown size (see python -m qa.netfilter)"
+                 if filtered["unknown_size"] else ""))
+    if args.update_vitals_baseline:
+        print(f"🔎 Vitals: {len(routes)} routes saved as baseline ({vitals.baseline_path()})")
+    elif report["vitals"]["baseline"]:
+        print(f"🔎 Vitals: {len(routes)} routes, {len(report['vitals']['regressions'])} regressions "
+              f"over {args.vitals_threshold}%")
+    else:
+        print(f"🔎 Vitals: {len(routes)} routes, no baseline yet (run with --update-vitals-baseline)")
+
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Report saved to {args.report}")
+
+    return report
+
+
+if __name__ == "__main__":
+    report = main()
+    sys.exit(1 if report["fail"] else 0)
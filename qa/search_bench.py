@@ -0,0 +1,324 @@
+"""
+Booking list search benchmark for the backoffice bookings page.
+
+getBookings (lib/supabase/bookings.ts) searches with
+booking_ref/customers.name/customers.email ilike '%term%', orders by
+booking_date, pages with OFFSET and asks for count: 'exact', all under the
+customers + trips + packages embed. A leading wildcard can't use a btree,
+so every keystroke scans bookings and customers twice (page and count).
+
+For each --sizes entry the local Postgres stand-in is reseeded with qa.seed
+and each search term runs at each --pages page in three modes:
+
+    ilike      the app's query and its count(*) as PostgREST sends them,
+               with the schema's indexes
+    trigram    the same match through pg_trgm GIN indexes on
+               bookings.booking_ref, customers.name and customers.email
+               (a UNION of the booking_ref and customer matches, so each
+               side can use its index), OFFSET paging and an exact count
+    keyset     the trigram match paged by (booking_date, id) < cursor with
+               limit + 1 rows instead of OFFSET and count - the cursor is
+               the last row of the previous page, as a client would hold it
+
+The trigram and keyset modes order by (booking_date desc, id desc) so pages
+are stable; their indexes are created after the ilike runs (build time and
+size are reported) and dropped again unless --keep-indexes is given.
+
+Terms come from the seeded data: part of a booking ref (one match), a
+common last name, an email prefix and a term that matches nothing. The run
+checks that trigram finds as many bookings as ilike and that keyset pages
+hold the same rows as trigram's OFFSET pages.
+
+Usage:
+    python -m qa.search_bench --sizes 10000 100000 1000000
+    python -m qa.search_bench --no-seed --pages 1 50 500 --runs 10
+    python -m qa.search_bench --no-seed --terms saetang BK-20 --keep-indexes
+"""
+
+import argparse
+import json
+import time
+
+from qa import pg, seed
+from qa.queryplans import BOOKING_EMBEDS, BOOKING_SELECT, explain, inline, plan_flags, walk
+from qa.stats import summarize
+
+DEFAULT_REPORT = "/tmp/qa_search_bench_report.json"
+MODES = ("ilike", "trigram", "keyset")
+
+ILIKE_MATCH = """
+    (bookings.booking_ref ilike %(pattern)s
+     or bookings_customers_1.name ilike %(pattern)s
+     or bookings_customers_1.email ilike %(pattern)s)
+"""
+ILIKE_PAGE = BOOKING_SELECT + BOOKING_EMBEDS + " where " + ILIKE_MATCH + """
+    order by bookings.booking_date desc
+    limit %(limit)s offset %(offset)s
+"""
+ILIKE_COUNT = """
+    select count(*) from public.bookings
+    left join lateral (
+      select customers_1.* from public.customers as customers_1
+      where customers_1.id = bookings.customer_id
+    ) as bookings_customers_1 on true
+    where """ + ILIKE_MATCH
+
+TRIGRAM_MATCH = """
+    bookings.id in (
+      select id from public.bookings where booking_ref ilike %(pattern)s
+      union
+      select b.id from public.bookings as b
+      join public.customers as c on c.id = b.customer_id
+      where c.name ilike %(pattern)s or c.email ilike %(pattern)s
+    )
+"""
+TRIGRAM_PAGE = BOOKING_SELECT + BOOKING_EMBEDS + " where " + TRIGRAM_MATCH + """
+    order by bookings.booking_date desc, bookings.id desc
+    limit %(limit)s offset %(offset)s
+"""
+TRIGRAM_COUNT = "select count(*) from public.bookings where " + TRIGRAM_MATCH
+KEYSET_PAGE = BOOKING_SELECT + BOOKING_EMBEDS + " where " + TRIGRAM_MATCH + """
+      and (%(after_date)s::timestamptz is null
+           or (bookings.booking_date, bookings.id) < (%(after_date)s::timestamptz, %(after_id)s::uuid))
+    order by bookings.booking_date desc, bookings.id desc
+    limit %(limit)s
+"""
+# The row a client on page N holds as its cursor: the last row of page N - 1
+KEYSET_CURSOR = """
+    select bookings.booking_date, bookings.id from public.bookings where """ + TRIGRAM_MATCH + """
+    order by bookings.booking_date desc, bookings.id desc
+    limit 1 offset %(offset)s
+"""
+
+INDEXES = (
+    ("qa_search_bookings_ref_trgm", "create index qa_search_bookings_ref_trgm "
+                                    "on public.bookings using gin (booking_ref gin_trgm_ops)"),
+    ("qa_search_customers_name_trgm", "create index qa_search_customers_name_trgm "
+                                      "on public.customers using gin (name gin_trgm_ops)"),
+    ("qa_search_customers_email_trgm", "create index qa_search_customers_email_trgm "
+                                       "on public.customers using gin (email gin_trgm_ops)"),
+    ("qa_search_bookings_date_id", "create index qa_search_bookings_date_id "
+                                   "on public.bookings (booking_date desc, id desc)"),
+)
+
+
+def sample_terms(conn) -> dict:
+    """Search terms that exist in the seeded data, from selective to broad"""
+    ref = pg.fetch_one(conn, "select booking_ref from public.bookings order by booking_date desc limit 1")
+    last_name = pg.fetch_one(conn, """
+        select split_part(name, ' ', 2) from public.customers group by 1 order by count(*) desc limit 1
+    """)
+    email = pg.fetch_one(conn, "select split_part(email, '@', 1) from public.customers limit 1")
+    terms = {"no_match": "qzxj"}
+    if ref:
+        terms["ref"] = ref[0][-4:]
+    if last_name:
+        terms["last_name"] = last_name[0].lower()
+    if email:
+        terms["email"] = email[0].split(".")[0] + "."
+    return terms
+
+
+def drop_indexes(conn):
+    for name, _ in INDEXES:
+        pg.execute(conn, f"drop index if exists public.{name}")
+
+
+def create_indexes(conn) -> dict:
+    """Build time and size per index; None if pg_trgm isn't available"""
+    try:
+        pg.execute(conn, "create extension if not exists pg_trgm")
+    except Exception as e:
+        print(f"⚠ pg_trgm unavailable, skipping the indexed modes ({type(e).__name__}: {e})".strip())
+        return None
+    built = {}
+    for name, ddl in INDEXES:
+        started = time.perf_counter()
+        pg.execute(conn, ddl)
+        size = pg.fetch_one(conn, "select pg_relation_size(%s::regclass)", (f"public.{name}",))[0]
+        built[name] = {"seconds": round(time.perf_counter() - started, 2), "bytes": size, "ddl": ddl}
+    pg.execute(conn, "analyze public.bookings, public.customers")
+    return built
+
+
+def timed(conn, sql: str, params: dict) -> tuple:
+    started = time.perf_counter()
+    rows = pg.execute(conn, sql, params)
+    return rows, (time.perf_counter() - started) * 1000
+
+
+# -- modes -------------------------------------------------------------------
+# Each returns (ids on the page, total or None, {part: ms}) for one keystroke
+
+def search_ilike(conn, params: dict) -> tuple:
+    rows, page_ms = timed(conn, ILIKE_PAGE, params)
+    count, count_ms = timed(conn, ILIKE_COUNT, params)
+    return [row[0] for row in rows], count[0][0], {"page_ms": page_ms, "count_ms": count_ms}
+
+
+def search_trigram(conn, params: dict) -> tuple:
+    rows, page_ms = timed(conn, TRIGRAM_PAGE, params)
+    count, count_ms = timed(conn, TRIGRAM_COUNT, params)
+    return [row[0] for row in rows], count[0][0], {"page_ms": page_ms, "count_ms": count_ms}
+
+
+def search_keyset(conn, params: dict) -> tuple:
+    rows, page_ms = timed(conn, KEYSET_PAGE, dict(params, limit=params["limit"] + 1))
+    return [row[0] for row in rows[:params["limit"]]], None, {"page_ms": page_ms, "count_ms": 0.0}
+
+
+SEARCHES = {"ilike": search_ilike, "trigram": search_trigram, "keyset": search_keyset}
+PLANNED = {"ilike": (ILIKE_PAGE, ILIKE_COUNT), "trigram": (TRIGRAM_PAGE, TRIGRAM_COUNT), "keyset": (KEYSET_PAGE,)}
+
+
+def query_params(conn, mode: str, term: str, page: int, limit: int) -> dict:
+    params = {"pattern": f"%{term}%", "limit": limit, "offset": (page - 1) * limit,
+              "after_date": None, "after_id": None}
+    if mode == "keyset" and page > 1:
+        cursor = pg.fetch_one(conn, KEYSET_CURSOR, dict(params, offset=params["offset"] - 1))
+        if cursor:
+            params.update(after_date=cursor[0], after_id=str(cursor[1]))
+        else:
+            params.update(after_date="-infinity", after_id="00000000-0000-0000-0000-000000000000")
+    return params
+
+
+def plan_summary(conn, mode: str, params: dict) -> dict:
+    """Seq scans, sorts and indexes of the mode's statements, from one EXPLAIN ANALYZE"""
+    flags, indexes = [], set()
+    limit = params["limit"] + 1 if mode == "keyset" else params["limit"]
+    for sql in PLANNED[mode]:
+        plan = explain(conn, inline(sql, dict(params, limit=limit)))["Plan"]
+        flags += plan_flags(plan, 1000)
+        indexes.update(n["Index Name"] for n in walk(plan) if n.get("Index Name"))
+    return {"seq_scans": sorted({f["relation"] for f in flags if f["flag"] == "seq-scan"}),
+            "sorted_rows": max((f["rows"] for f in flags if f["flag"] == "sort"), default=0),
+            "indexes_used": sorted(indexes)}
+
+
+def bench_mode(conn, mode: str, terms: dict, pages: list, limit: int, runs: int) -> list:
+    results = []
+    for label, term in terms.items():
+        for page in pages:
+            params = query_params(conn, mode, term, page, limit)
+            ids, total, _ = SEARCHES[mode](conn, params)  # warm-up
+            parts = {"page_ms": [], "count_ms": [], "total_ms": []}
+            for _ in range(runs):
+                ids, total, timing = SEARCHES[mode](conn, params)
+                parts["page_ms"].append(timing["page_ms"])
+                parts["count_ms"].append(timing["count_ms"])
+                parts["total_ms"].append(timing["page_ms"] + timing["count_ms"])
+            results.append({
+                "mode": mode, "term": label, "text": term, "page": page, "rows": len(ids), "matches": total,
+                "ids": [str(i) for i in ids],
+                **{part: summarize(values) for part, values in parts.items()},
+                **plan_summary(conn, mode, params),
+            })
+    return results
+
+
+def check(results: list) -> list:
+    """Mismatches: trigram vs ilike match counts, keyset vs trigram page rows"""
+    by_key = {(r["mode"], r["term"], r["page"]): r for r in results}
+    problems = []
+    for (mode, term, page), result in by_key.items():
+        if mode == "trigram":
+            ilike = by_key.get(("ilike", term, page))
+            if ilike and ilike["matches"] != result["matches"]:
+                problems.append(f"{term} page {page}: trigram found {result['matches']}, ilike {ilike['matches']}")
+        if mode == "keyset":
+            offset = by_key.get(("trigram", term, page))
+            if offset and offset["ids"] != result["ids"]:
+                problems.append(f"{term} page {page}: keyset rows differ from trigram offset rows")
+    return problems
+
+
+def speedups(results: list) -> dict:
+    """ilike total p50 / mode total p50, per mode, term and page"""
+    base = {(r["term"], r["page"]): r["total_ms"].get("p50_ms") for r in results if r["mode"] == "ilike"}
+    factors = {}
+    for r in results:
+        ilike, mine = base.get((r["term"], r["page"])), r["total_ms"].get("p50_ms")
+        if r["mode"] != "ilike" and ilike and mine:
+            factors.setdefault(r["mode"], {})[f"{r['term']}@{r['page']}"] = round(ilike / mine, 2)
+    return factors
+
+
+def bench_size(conn, label, terms: dict, pages: list, limit: int, runs: int, keep_indexes: bool) -> dict:
+    rows = {table: pg.fetch_one(conn, f"select count(*) from public.{table}")[0]
+            for table in ("bookings", "customers")}
+    entry = {"size": label, "rows": rows, "terms": terms, "indexes": None, "results": []}
+    drop_indexes(conn)
+    entry["results"] += bench_mode(conn, "ilike", terms, pages, limit, runs)
+    entry["indexes"] = create_indexes(conn)
+    try:
+        if entry["indexes"] is not None:
+            for mode in ("trigram", "keyset"):
+                entry["results"] += bench_mode(conn, mode, terms, pages, limit, runs)
+    finally:
+        if not keep_indexes:
+            drop_indexes(conn)
+    entry["problems"] = check(entry["results"])
+    entry["speedup"] = speedups(entry["results"])
+    for result in entry["results"]:
+        result.pop("ids")
+    return entry
+
+
+def print_entry(entry: dict):
+    for name, index in (entry["indexes"] or {}).items():
+        print(f"  🔎 {name:<32} built in {index['seconds']}s, {index['bytes'] / 1024 / 1024:.1f} MB")
+    print(f"  {'mode':<8} {'term':<10} {'page':>5} {'matches':>9} {'page p50':>10} {'count p50':>10} "
+          f"{'total p50':>10}  seq scans")
+    for r in entry["results"]:
+        matches = "-" if r["matches"] is None else f"{r['matches']:,}"
+        print(f"  {r['mode']:<8} {r['term']:<10} {r['page']:>5} {matches:>9} "
+              f"{r['page_ms'].get('p50_ms', 0):>8.2f}ms {r['count_ms'].get('p50_ms', 0):>8.2f}ms "
+              f"{r['total_ms'].get('p50_ms', 0):>8.2f}ms  {', '.join(r['seq_scans']) or '-'}")
+    for mode, factors in entry["speedup"].items():
+        print(f"  {mode:<8} speedup vs ilike: " + ", ".join(f"{key} ×{value}" for key, value in factors.items()))
+    status = "❌" if entry["problems"] else "✓"
+    print(f"  {status} modes agree: {not entry['problems']}")
+    for problem in entry["problems"]:
+        print(f"    {problem}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backoffice booking search: ilike vs trigram vs keyset")
+    parser.add_argument("--sizes", nargs="*", type=int, default=[10_000, 100_000],
+                        help="Bookings to seed for each run (see qa.seed)")
+    parser.add_argument("--no-seed", action="store_true", help="Benchmark the data already in the database")
+    parser.add_argument("--pages", nargs="*", type=int, default=[1, 10, 100], help="Page numbers to fetch")
+    parser.add_argument("--limit", type=int, default=20, help="Page size (getBookings default)")
+    parser.add_argument("--terms", nargs="*", help="Search terms (default: sampled from the data)")
+    parser.add_argument("--runs", type=int, default=5, help="Timed keystrokes per term and page")
+    parser.add_argument("--keep-indexes", action="store_true", help="Leave the trigram/keyset indexes in place")
+    parser.add_argument("--report", default=DEFAULT_REPORT)
+    args = parser.parse_args()
+
+    print("\n" + "="*80)
+    print(f"Booking search: {', '.join(MODES)} at pages {', '.join(str(p) for p in args.pages)}")
+    print("="*80)
+
+    conn = pg.prepare()
+    report = {"runs": args.runs, "limit": args.limit, "pages": args.pages, "results": []}
+    for size in ["current"] if args.no_seed else args.sizes:
+        if size != "current":
+            seed.truncate(conn)
+            seed.seed(conn, size)
+        terms = {term: term for term in args.terms} if args.terms else sample_terms(conn)
+        entry = bench_size(conn, size, terms, args.pages, args.limit, args.runs, args.keep_indexes)
+        report["results"].append(entry)
+        print(f"\n{entry['rows']['bookings']:,} bookings / {entry['rows']['customers']:,} customers")
+        print_entry(entry)
+    conn.close()
+
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"\n✅ Report saved to {args.report}")
+    return report
+
+
+if __name__ == "__main__":
+    report = main()
+    raise SystemExit(0 if not any(entry["problems"] for entry in report["results"]) else 1)
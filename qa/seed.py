@@ -0,0 +1,494 @@
+"""
+Synthetic dataset for scale testing.
+
+Generates customers, packages, trips, tours, tour_schedules, bookings,
+booking_passengers and payments that look like the app's own data (Thai
+destinations, high/low season, repeat customers, lead times, payment states
+that match the booking status) and bulk-loads them into the local Postgres
+stand-in (qa.pg) with COPY.
+
+Everything is sized from --bookings; a booking brings ~5.4 rows with it
+(passengers, payments, a share of customers/trips/schedules), so
+
+    --bookings 2000        ~11k rows
+    --bookings 100000      ~540k rows
+    --bookings 1850000     ~10M rows      (generation runs at ~50k rows/s)
+
+Rows are generated deterministically from --seed and streamed straight into
+COPY, so memory stays flat apart from the id lists the foreign keys need.
+Secondary indexes are dropped for the load and rebuilt afterwards, FK
+triggers are skipped (the generator only emits valid references), and the
+tables are ANALYZEd at the end so the query benchmarks see real statistics.
+
+Usage:
+    python -m qa.seed --bookings 100000 --truncate
+    python -m qa.seed --bookings 1850000 --truncate --seed 7
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+from bisect import bisect
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from itertools import accumulate
+
+from qa import pg
+
+DEFAULT_REPORT = "/tmp/qa_seed_report.json"
+SEED_NOTE = "qa-seed"
+
+# Dependency order; truncated in reverse
+TABLES = ("customers", "packages", "trips", "tours", "tour_schedules",
+          "bookings", "booking_passengers", "payments")
+
+FIRST_NAMES = ("Somchai", "Suda", "Anan", "Kanya", "Niran", "Ploy", "Arthit", "Mali", "James", "Emma",
+               "Liam", "Olivia", "Noah", "Sophie", "Hiroshi", "Yuki", "Min-jun", "Ji-woo", "Wei", "Li",
+               "Lukas", "Anna", "Mateo", "Lucia", "Arjun", "Priya", "Oliver", "Chloe", "Ethan", "Mia")
+LAST_NAMES = ("Saetang", "Wongsawat", "Chaiyaporn", "Srisuk", "Boonmee", "Smith", "Johnson", "Brown",
+              "Tanaka", "Sato", "Kim", "Park", "Chen", "Wang", "Muller", "Schmidt", "Garcia", "Rossi",
+              "Sharma", "Patel", "Martin", "Dubois", "Wilson", "Taylor", "Nguyen", "Lee")
+DESTINATIONS = ("Bangkok", "Chiang Mai", "Phuket", "Krabi", "Ayutthaya", "Kanchanaburi",
+                "Pattaya", "Koh Samui", "Chiang Rai", "Hua Hin", "Koh Phi Phi", "Sukhothai")
+EXPERIENCES = ("Temple Tour", "Island Hopping", "Street Food Walk", "Jungle Trek", "Night Market Tour",
+               "Elephant Sanctuary", "Cooking Class", "Snorkeling Trip", "River Cruise",
+               "Old Town Cycling", "Sunset Kayak", "Waterfall Hike", "Floating Market Trip")
+CATEGORIES = ("Adventure", "Cultural", "Relaxation", "City", "Nature", "Luxury")
+GUIDES = ("Khun Lek", "Khun Nok", "Khun Tom", "Khun Joy", "Khun Bee", "Khun Pim", "Khun Golf", "Khun Ice")
+START_TIMES = ("07:30:00", "08:00:00", "09:00:00", "13:30:00", "18:00:00")
+PAYMENT_METHODS = ("Credit Card", "Bank Transfer", "Cash", "PromptPay")
+
+# Thai high season (Nov-Feb) books heavier than the rainy season
+MONTH_WEIGHTS = {1: 1.6, 2: 1.4, 3: 1.1, 4: 1.0, 5: 0.7, 6: 0.6,
+                 7: 0.8, 8: 0.8, 9: 0.5, 10: 0.7, 11: 1.3, 12: 1.8}
+PAX_CHOICES = (1, 2, 3, 4, 5, 6, 8)
+PAX_CUM_WEIGHTS = tuple(accumulate((18, 38, 14, 16, 6, 5, 3)))
+TIERS = ("Standard", "VIP", "Platinum")
+TIER_CUM_WEIGHTS = tuple(accumulate((85, 12, 3)))
+METHOD_CUM_WEIGHTS = tuple(accumulate((40, 25, 10, 25)))
+
+# Same BK-YYYY-XXXXXX shape as lib/supabase/bookings.ts:generateBookingRef.
+# Refs come from a counter multiplied by a stride coprime with 36**6, so they
+# are unique without a lookup but don't look sequential.
+BOOKING_REF_CHARSET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+BOOKING_REF_SPACE = 36 ** 6
+BOOKING_REF_STRIDE = 1_679_609
+
+# -- helpers -----------------------------------------------------------------
+
+def line(*values) -> str:
+    """One COPY text-format row.
+
+    Every value comes from the generators below and none contains a tab,
+    newline or backslash, so nothing is escaped - escaping was half the
+    generation time.
+    """
+    return "\t".join("\\N" if v is None else str(v) for v in values) + "\n"
+
+
+def text_array(items) -> str:
+    return "{" + ",".join('"' + item.replace('"', '\\"') + '"' for item in items) + "}"
+
+
+def make_uuid(rng: random.Random) -> str:
+    """Version-4 UUID drawn from `rng`, so reruns with the same seed match"""
+    value = rng.getrandbits(128) & ~(0xF000 << 64) & ~(0xC000 << 48) | (0x4000 << 64) | (0x8000 << 48)
+    h = f"{value:032x}"
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def booking_ref(year: int, index: int) -> str:
+    n = (index * BOOKING_REF_STRIDE + 7919) % BOOKING_REF_SPACE
+    chars = []
+    for _ in range(6):
+        n, digit = divmod(n, 36)
+        chars.append(BOOKING_REF_CHARSET[digit])
+    return f"BK-{year}-{''.join(chars)}"
+
+
+def slugify(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def table_rng(seed: int, table: str) -> random.Random:
+    return random.Random(f"{seed}:{table}")
+
+
+def seasonal_day(rng: random.Random, first: date, span_days: int) -> date:
+    """A date in [first, first + span_days) weighted by MONTH_WEIGHTS"""
+    top = max(MONTH_WEIGHTS.values())
+    while True:
+        day = first + timedelta(days=rng.randrange(span_days))
+        if rng.random() * top <= MONTH_WEIGHTS[day.month]:
+            return day
+
+
+def plan(bookings: int) -> dict:
+    packages = min(5000, max(20, bookings // 2000))
+    return {
+        "customers": max(100, bookings // 4),
+        "packages": packages,
+        "trips": max(packages * 12, bookings // 8),
+        "tours": packages,
+        "tour_schedules": max(packages * 12, bookings // 8),
+        "bookings": bookings,
+    }
+
+
+# -- generators --------------------------------------------------------------
+#
+# Each generator streams COPY lines and records what later tables reference
+# in `ctx` (ids, trip dates and prices) as the rows go out.
+
+def customer_lines(ctx: dict):
+    rng = table_rng(ctx["seed"], "customers")
+    ids = ctx["customer_ids"]
+    first_day = ctx["first_day"]
+    for i in range(ctx["plan"]["customers"]):
+        customer_id = make_uuid(rng)
+        ids.append(customer_id)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        created = datetime.combine(first_day + timedelta(days=rng.randrange(ctx["days"])),
+                                   dtime(rng.randrange(24), rng.randrange(60)), timezone.utc)
+        yield line(
+            customer_id, None, f"{first} {last}",
+            f"{slugify(first)}.{slugify(last)}.{i}@seed.example.com",
+            f"+66 8{rng.randrange(10 ** 8):08d}", SEED_NOTE,
+            "inactive" if rng.random() < 0.08 else "active",
+            rng.choices(TIERS, cum_weights=TIER_CUM_WEIGHTS)[0],
+            created, created,
+        )
+
+
+def package_options(rng: random.Random, base_price: int) -> list:
+    join = {
+        "id": f"opt-join-{rng.randrange(10 ** 6)}",
+        "name": "Join Tour",
+        "description": "Shared group departure",
+        "groupType": "join",
+        "quota": rng.choice((10, 15, 20, 30)),
+        "times": sorted(rng.sample(START_TIMES, 2)),
+        "adultPrice": base_price,
+        "childPrice": round(base_price * 0.7),
+        "infantPrice": 0,
+        "isFlatRate": False,
+        "pricingTiers": [
+            {"id": "tier-1", "minPax": 1, "maxPax": 3, "pricePerPerson": base_price},
+            {"id": "tier-2", "minPax": 4, "maxPax": None, "pricePerPerson": round(base_price * 0.9)},
+        ],
+    }
+    options = [join]
+    if rng.random() < 0.4:
+        options.append({
+            "id": f"opt-private-{rng.randrange(10 ** 6)}",
+            "name": "Private Tour",
+            "description": "Private car and guide",
+            "groupType": "private",
+            "quota": 8,
+            "isFlatRate": True,
+            "flatRatePrice": base_price * 4,
+            "pricingTiers": [],
+        })
+    return options
+
+
+def package_lines(ctx: dict):
+    rng = table_rng(ctx["seed"], "packages")
+    for i in range(ctx["plan"]["packages"]):
+        package_id = make_uuid(rng)
+        destination = rng.choice(DESTINATIONS)
+        name = f"{destination} {rng.choice(EXPERIENCES)}"
+        base_price = rng.randrange(8, 120) * 100
+        max_pax = rng.choice((10, 15, 20, 30, 40))
+        status = rng.choices(("published", "draft", "archived"), cum_weights=(85, 95, 100))[0]
+        ctx["packages"].append((package_id, name, destination, base_price, max_pax, status))
+        created = datetime.combine(ctx["first_day"], dtime(9), timezone.utc) - timedelta(days=rng.randrange(90))
+        yield line(
+            package_id, name, f"{name} with a local guide.", destination,
+            rng.choice(("Half day", "Full day", "2 days 1 night")),
+            f"{base_price}.00", max_pax, status, rng.choice(CATEGORIES),
+            None, "{}", text_array(("Hotel pickup", "English-speaking guide")),
+            json.dumps(package_options(rng, base_price), separators=(",", ":")),
+            created, created,
+        )
+
+
+def trip_lines(ctx: dict):
+    rng = table_rng(ctx["seed"], "trips")
+    packages = ctx["packages"]
+    per_package, extra = divmod(ctx["plan"]["trips"], len(packages))
+    today = ctx["today"]
+    for index, (package_id, _, _, base_price, max_pax, _) in enumerate(packages):
+        for _ in range(per_package + (1 if index < extra else 0)):
+            trip_id = make_uuid(rng)
+            day = seasonal_day(rng, ctx["first_day"], ctx["span"])
+            if day < today:
+                status = "cancelled" if rng.random() < 0.05 else "completed"
+            else:
+                status = "cancelled" if rng.random() < 0.03 else "scheduled"
+            ctx["trips"].append((trip_id, day, base_price))
+            yield line(trip_id, package_id, day, rng.choice(START_TIMES), status,
+                       max_pax, rng.choice(GUIDES), ctx["now"], ctx["now"])
+
+
+def tour_lines(ctx: dict):
+    rng = table_rng(ctx["seed"], "tours")
+    for i, (_, name, destination, _, max_pax, status) in enumerate(ctx["packages"]):
+        tour_id = make_uuid(rng)
+        ctx["tour_ids"].append(tour_id)
+        yield line(tour_id, name, f"{slugify(name)}-{i}", destination,
+                   "published" if status == "published" else "draft", 1, max_pax, ctx["now"], ctx["now"])
+
+
+def schedule_lines(ctx: dict):
+    rng = table_rng(ctx["seed"], "tour_schedules")
+    tour_ids = ctx["tour_ids"]
+    today = ctx["today"]
+    per_tour, extra = divmod(ctx["plan"]["tour_schedules"], len(tour_ids))
+    # (tour_id, start_date, start_time) is unique
+    per_tour = min(per_tour, ctx["span"] * len(START_TIMES) - 1)
+    for index, tour_id in enumerate(tour_ids):
+        slots = set()
+        wanted = per_tour + (1 if index < extra else 0)
+        while len(slots) < wanted:
+            slots.add((seasonal_day(rng, ctx["first_day"], ctx["span"]), rng.choice(START_TIMES)))
+        for day, start_time in sorted(slots):
+            total = rng.choice((10, 15, 20, 30))
+            if day < today:
+                available, status = 0 if rng.random() < 0.3 else rng.randrange(total + 1), "closed"
+            else:
+                available = rng.randrange(total + 1)
+                status = "full" if available == 0 else ("closing_soon" if day - today < timedelta(days=2) else "open")
+                if rng.random() < 0.02:
+                    status = "cancelled"
+            yield line(make_uuid(rng), tour_id, day, start_time, total, available, status, ctx["now"], ctx["now"])
+
+
+def iter_bookings(ctx: dict):
+    """(id, ref, customer_id, trip_id, pax, unit_price, status, payment_status, booked_at)
+
+    Deterministic, so passengers and payments replay it instead of holding
+    every booking in memory.
+    """
+    rng = table_rng(ctx["seed"], "bookings")
+    customers = ctx["customer_ids"]
+    trips = ctx["trips"]
+    now = ctx["now"]
+    today = ctx["today"]
+    for i in range(ctx["plan"]["bookings"]):
+        booking_id = make_uuid(rng)
+        # Skewed towards the first customers: repeat bookers
+        customer_id = customers[int(len(customers) * rng.random() ** 1.6)]
+        trip_id, day, unit_price = trips[rng.randrange(len(trips))]
+        pax = PAX_CHOICES[bisect(PAX_CUM_WEIGHTS, rng.random() * PAX_CUM_WEIGHTS[-1])]
+        lead = timedelta(days=min(180, int(rng.expovariate(1 / 30))), minutes=rng.randrange(24 * 60))
+        booked_at = datetime.combine(day, dtime(), timezone.utc) - lead
+        if booked_at > now:
+            booked_at = now - timedelta(minutes=rng.randrange(1, 24 * 60))
+
+        roll = rng.random()
+        if day < today:
+            status = "cancelled" if roll < 0.12 else "completed"
+        else:
+            status = "cancelled" if roll < 0.08 else ("pending" if roll < 0.38 else "confirmed")
+        roll = rng.random()
+        if status == "completed":
+            payment_status = "paid"
+        elif status == "confirmed":
+            payment_status = "paid" if roll < 0.7 else "partial"
+        elif status == "pending":
+            payment_status = "unpaid" if roll < 0.8 else "partial"
+        else:
+            payment_status = "refunded" if roll < 0.5 else "unpaid"
+        yield (booking_id, booking_ref(booked_at.year, i), customer_id, trip_id, pax,
+               unit_price, status, payment_status, booked_at)
+
+
+def booking_lines(ctx: dict):
+    for booking_id, ref, customer_id, trip_id, pax, unit_price, status, payment_status, booked_at in iter_bookings(ctx):
+        yield line(booking_id, ref, customer_id, trip_id, pax, f"{pax * unit_price}.00",
+                   status, payment_status, booked_at, SEED_NOTE, booked_at, booked_at)
+
+
+def passenger_lines(ctx: dict):
+    rng = table_rng(ctx["seed"], "booking_passengers")
+    for booking_id, _, _, _, pax, _, _, _, booked_at in iter_bookings(ctx):
+        children = rng.randrange(pax) if pax > 2 and rng.random() < 0.35 else 0
+        types = ["Adult"] * (pax - children) + ["Child"] * children
+        if rng.random() < 0.05:
+            types.append("Infant")
+        for kind in types:
+            age = rng.randrange(18, 71) if kind == "Adult" else (rng.randrange(3, 12) if kind == "Child" else rng.randrange(2))
+            passport = f"{rng.choice('ABCEKNP')}{rng.randrange(10 ** 7):07d}" if rng.random() < 0.4 else None
+            yield line(make_uuid(rng), booking_id, f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                       kind, age, passport, None, booked_at)
+
+
+def payment_lines(ctx: dict):
+    rng = table_rng(ctx["seed"], "payments")
+    now = ctx["now"]
+    for booking_id, _, _, _, pax, unit_price, _, payment_status, booked_at in iter_bookings(ctx):
+        if payment_status == "unpaid":
+            continue
+        total = pax * unit_price
+        method = rng.choices(PAYMENT_METHODS, cum_weights=METHOD_CUM_WEIGHTS)[0]
+        paid_at = min(now, booked_at + timedelta(hours=rng.randrange(72)))
+        if payment_status == "partial":
+            payments = [(round(total * 0.3), "completed", "Deposit")]
+        elif payment_status == "refunded":
+            payments = [(total, "refunded", "Refunded on cancellation")]
+        elif rng.random() < 0.2:
+            deposit = round(total * 0.3)
+            payments = [(deposit, "completed", "Deposit"), (total - deposit, "completed", "Balance")]
+        else:
+            payments = [(total, "completed", None)]
+        for amount, status, note in payments:
+            yield line(make_uuid(rng), booking_id, f"{amount}.00", paid_at, method, status, note, paid_at, paid_at)
+            paid_at = min(now, paid_at + timedelta(days=rng.randrange(1, 14)))
+
+
+COLUMNS = {
+    "customers": ("id", "auth_user_id", "name", "email", "phone", "notes", "status", "tier",
+                  "created_at", "updated_at"),
+    "packages": ("id", "name", "description", "destination", "duration", "base_price", "max_pax",
+                 "status", "category", "image_url", "image_urls", "highlights", "options",
+                 "created_at", "updated_at"),
+    "trips": ("id", "package_id", "date", "time", "status", "max_participants", "guide_name",
+              "created_at", "updated_at"),
+    "tours": ("id", "name", "slug", "destination", "status", "min_pax", "max_pax", "created_at", "updated_at"),
+    "tour_schedules": ("id", "tour_id", "start_date", "start_time", "total_capacity", "available_capacity",
+                       "status", "created_at", "updated_at"),
+    "bookings": ("id", "booking_ref", "customer_id", "trip_id", "pax", "total_amount", "status",
+                 "payment_status", "booking_date", "notes", "created_at", "updated_at"),
+    "booking_passengers": ("id", "booking_id", "name", "type", "age", "passport_number", "special_requests",
+                           "created_at"),
+    "payments": ("id", "booking_id", "amount", "payment_date", "method", "status", "note",
+                 "created_at", "updated_at"),
+}
+
+GENERATORS = {
+    "customers": customer_lines,
+    "packages": package_lines,
+    "trips": trip_lines,
+    "tours": tour_lines,
+    "tour_schedules": schedule_lines,
+    "bookings": booking_lines,
+    "booking_passengers": passenger_lines,
+    "payments": payment_lines,
+}
+
+
+# -- load --------------------------------------------------------------------
+
+def secondary_indexes(conn) -> list:
+    """(name, definition) of the seeded tables' indexes that don't back a constraint"""
+    return pg.execute(conn, """
+        select ic.relname, pg_get_indexdef(i.indexrelid)
+        from pg_index i
+        join pg_class ic on ic.oid = i.indexrelid
+        join pg_class tc on tc.oid = i.indrelid
+        join pg_namespace n on n.oid = tc.relnamespace
+        where n.nspname = 'public'
+          and tc.relname = any(%s)
+          and not exists (select 1 from pg_constraint c where c.conindid = i.indexrelid)
+    """, (list(TABLES),))
+
+
+def skip_fk_checks(conn, enabled: bool):
+    """FK checks run as triggers; replica mode skips them (needs superuser)"""
+    try:
+        pg.execute(conn, f"set session_replication_role = {'replica' if enabled else 'origin'}")
+        return True
+    except Exception as e:
+        print(f"⚠ FK checks stay on ({type(e).__name__}: {e})".strip())
+        return False
+
+
+def seed(conn, bookings: int, seed_value: int = 42, days: int = 730,
+         keep_indexes: bool = False, chunk_rows: int = 50_000) -> dict:
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    today = now.date()
+    # 85% of the window is history, the rest upcoming departures
+    first_day = today - timedelta(days=int(days * 0.85))
+    ctx = {
+        "seed": seed_value, "plan": plan(bookings), "now": now, "today": today,
+        "first_day": first_day, "days": int(days * 0.85), "span": days,
+        "customer_ids": [], "packages": [], "trips": [], "tour_ids": [],
+    }
+    report = {"bookings": bookings, "seed": seed_value, "days": days, "plan": ctx["plan"], "tables": {}}
+
+    pg.execute(conn, "set synchronous_commit = off")
+    fk_skipped = skip_fk_checks(conn, True)
+    dropped = [] if keep_indexes else secondary_indexes(conn)
+    for name, _ in dropped:
+        pg.execute(conn, f'drop index if exists public."{name}"')
+
+    started = time.perf_counter()
+    try:
+        for table in TABLES:
+            table_started = time.perf_counter()
+            rows = pg.copy_lines(conn, f"public.{table}", COLUMNS[table], GENERATORS[table](ctx), chunk_rows)
+            elapsed = time.perf_counter() - table_started
+            rate = rows / elapsed if elapsed else 0
+            report["tables"][table] = {"rows": rows, "seconds": round(elapsed, 2), "rows_per_s": round(rate)}
+            print(f"✓ {table:<19} {rows:>12,} rows in {elapsed:7.1f}s ({rate:,.0f} rows/s)")
+    finally:
+        index_started = time.perf_counter()
+        for _, definition in dropped:
+            pg.execute(conn, definition)
+        report["index_rebuild_s"] = round(time.perf_counter() - index_started, 2)
+        if fk_skipped:
+            skip_fk_checks(conn, False)
+    if dropped:
+        print(f"✓ Rebuilt {len(dropped)} indexes in {report['index_rebuild_s']}s")
+
+    analyze_started = time.perf_counter()
+    pg.execute(conn, "analyze " + ", ".join(f"public.{table}" for table in TABLES))
+    report["analyze_s"] = round(time.perf_counter() - analyze_started, 2)
+
+    report["rows"] = sum(t["rows"] for t in report["tables"].values())
+    report["seconds"] = round(time.perf_counter() - started, 2)
+    report["rows_per_s"] = round(report["rows"] / report["seconds"]) if report["seconds"] else 0
+    return report
+
+
+def truncate(conn):
+    pg.execute(conn, "truncate " + ", ".join(f"public.{table}" for table in reversed(TABLES)) + " cascade")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load a synthetic booking dataset into the local Postgres")
+    parser.add_argument("--bookings", type=int, default=100_000,
+                        help="Bookings to generate; everything else is sized from it (~5.4 rows each)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--days", type=int, default=730, help="Window of trip dates (85%% past, 15%% upcoming)")
+    parser.add_argument("--truncate", action="store_true", help="Empty the seeded tables first")
+    parser.add_argument("--keep-indexes", action="store_true", help="Load with secondary indexes in place")
+    parser.add_argument("--chunk-rows", type=int, default=50_000)
+    parser.add_argument("--report", default=DEFAULT_REPORT)
+    args = parser.parse_args()
+
+    conn = pg.prepare()
+    if args.truncate:
+        truncate(conn)
+    elif pg.fetch_one(conn, "select exists (select 1 from public.bookings)")[0]:
+        raise SystemExit("❌ public.bookings is not empty; rerun with --truncate")
+
+    print("\n" + "="*80)
+    print(f"Seeding {args.bookings:,} bookings into {pg.dsn().rsplit('@', 1)[-1]} (seed {args.seed})")
+    print("="*80)
+
+    report = seed(conn, args.bookings, args.seed, args.days, args.keep_indexes, args.chunk_rows)
+    conn.close()
+
+    print(f"\n✅ {report['rows']:,} rows in {report['seconds']}s ({report['rows_per_s']:,} rows/s), "
+          f"analyze {report['analyze_s']}s")
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"✅ Report saved to {args.report}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Learned resolution for the flows' multi-candidate selector lists.
+
+Flows try several selectors for the same control ("Private" tab, "Check"
+button, ...) and call is_visible() on each until one hits. The resolver
+remembers which candidate worked for each (route, control) pair in
+.qa-cache/selectors.json and tries it first on the next run, so the usual
+cost is one round trip instead of one per miss. When the remembered
+selector stops matching it falls back to the full list and records the new
+winner. A remembered selector that isn't in the caller's candidate list
+(two flows sharing a control name with different lists) is ignored.
+
+Usage:
+    found = selectors.visible(page, "add_to_cart", candidates)
+    for selector, element in found:
+        try:
+            element.click()
+        except Exception:
+            continue
+        found.remember(selector)
+        break
+
+    selector, element = selectors.resolve(page, "add_to_cart", candidates)
+"""
+
+import json
+import os
+from pathlib import Path
+
+from playwright.sync_api import Error, Page
+
+from qa.config import ROOT
+from qa.routes import route_key
+
+CACHE_PATH = Path(os.environ.get("QA_SELECTOR_CACHE", ROOT / ".qa-cache" / "selectors.json"))
+
+
+class SelectorCache:
+    """{"<route>::<control>": "<selector>"} persisted as JSON"""
+
+    def __init__(self, path: Path = CACHE_PATH):
+        self.path = Path(path)
+        self.entries = self._read()
+        self.stats = {"hits": 0, "misses": 0, "probes": 0}
+
+    def _read(self) -> dict:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, route: str, name: str):
+        return self.entries.get(f"{route}::{name}")
+
+    def put(self, route: str, name: str, selector: str):
+        key = f"{route}::{name}"
+        if self.entries.get(key) == selector:
+            return
+        self.entries[key] = selector
+        self.save(key)
+
+    def save(self, key: str):
+        """Merge into the on-disk file so parallel runner workers don't clobber each other"""
+        merged = self._read()
+        merged[key] = self.entries[key]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(merged, indent=2, sort_keys=True), encoding="utf-8")
+        tmp.replace(self.path)
+
+
+_cache = None
+
+
+def cache() -> SelectorCache:
+    global _cache
+    if _cache is None:
+        _cache = SelectorCache()
+    return _cache
+
+
+def _visible(page: Page, selector: str):
+    cache().stats["probes"] += 1
+    try:
+        element = page.locator(selector).first
+        return element if element.is_visible() else None
+    except Error:
+        return None
+
+
+class Candidates:
+    """Iterates (selector, locator) over the visible candidates, the remembered one first
+
+    Visibility is probed lazily, so a caller that stops at the first
+    candidate whose action succeeds pays for no further probes. The route
+    is taken up front, so remember() still files the winner under it after
+    a click that navigates.
+    """
+
+    def __init__(self, page: Page, name: str, candidates: list):
+        self.page, self.name, self.candidates = page, name, list(candidates)
+        self.route = route_key(page.url)
+
+    def __iter__(self):
+        store = cache()
+        remembered = store.get(self.route, self.name)
+        if remembered not in self.candidates:
+            remembered = None
+
+        if remembered:
+            element = _visible(self.page, remembered)
+            if element:
+                store.stats["hits"] += 1
+                yield remembered, element
+        store.stats["misses"] += 1
+        for selector in self.candidates:
+            if selector == remembered:
+                continue
+            element = _visible(self.page, selector)
+            if element:
+                yield selector, element
+
+    def remember(self, selector: str):
+        cache().put(self.route, self.name, selector)
+
+
+def visible(page: Page, name: str, candidates: list) -> Candidates:
+    return Candidates(page, name, candidates)
+
+
+def resolve(page: Page, name: str, candidates: list) -> tuple:
+    """(selector, locator) of the first visible candidate, remembered first
+
+    Returns (None, None) when no candidate is visible.
+    """
+    found = visible(page, name, candidates)
+    for selector, element in found:
+        found.remember(selector)
+        return selector, element
+    return None, None
+
+
+def stats() -> dict:
+    return dict(cache().stats)
@@ -0,0 +1,253 @@
+"""
+Bulk tour-import benchmark for slug allocation.
+
+lib/supabase/tours.ts used to find a free slug by SELECTing `name`,
+`name-1`, `name-2`... one query per candidate, so importing n tours with
+the same name cost n²/2 lookups. This imports --tours tours into the local
+Postgres stand-in (qa.pg), cycling through the Southern Tours seed names so
+duplicates pile up, and measures queries and time per created tour as they
+grow:
+
+    probe      the old loop: one SELECT per candidate, then the INSERT
+    lookup     generateUniqueSlug today: one query for every taken slug of
+               the base (`base` and `base-<n>`), then the INSERT
+    batched    generateUniqueSlugs: one lookup and one INSERT per
+               --batch-size tours, collisions inside the batch resolved in
+               memory
+
+All three allocate the same slugs (the first free of base, base-1, ...).
+The last name's base slug is one of the numbered slugs of the Koh Tao
+name, so a batch that tracked slugs per base would hand the same slug to
+both and fail the "same slugs" check.
+Lookups filter server-side on `^base(-[0-9]+)?$` and page through
+--max-rows rows at a time like PostgREST's response cap, so a lookup
+that stopped at the first page would hand out a taken slug and fail the
+"same slugs" check once a name has more than --max-rows duplicates.
+--rtt-ms is slept before every statement to stand in for the PostgREST
+round trip; results are reported per --windows slice of the import so the
+growth shows.
+
+Usage:
+    python -m qa.slug_bench
+    python -m qa.slug_bench --tours 5000 --batch-size 200 --rtt-ms 3
+    python -m qa.slug_bench --strategies lookup batched --names 2
+    python -m qa.slug_bench --tours 3000 --names 1 --max-rows 1000
+"""
+
+import argparse
+import json
+import re
+import time
+
+from qa import pg
+from qa.stats import summarize
+
+DEFAULT_REPORT = "/tmp/qa_slug_bench_report.json"
+STRATEGY_NAMES = ("probe", "lookup", "batched")
+DESTINATION = "QA slug bench"
+
+# Tour names from seed_southern_tours.mjs, plus a re-import whose base slug
+# collides with the Koh Tao tour's numbered slugs
+NAMES = (
+    "Phi Phi & Maya Bay Premium One-Day Speedboat",
+    "Krabi 4 Islands One-Day Longtail Adventure",
+    "Koh Samui Ang Thong Marine Park Day Expedition",
+    "Koh Tao & Nang Yuan One-Day Snorkeling Escape",
+    "Similan Islands One-Day Speedboat from Khao Lak",
+    "Koh Lipe One-Day Inner Islands Snorkeling",
+    "Phang Nga & Hong Island One-Day Sea Canoe Journey",
+    "Koh Tao & Nang Yuan One-Day Snorkeling Escape 2",
+)
+
+INSERT_SQL = """
+    insert into public.tours (name, slug, destination, status)
+    select name, slug, %s, 'draft' from unnest(%s::text[], %s::text[]) as t(name, slug)
+"""
+
+
+def base_slug(name: str) -> str:
+    """generateUniqueSlug's normalization"""
+    return re.sub(r"\s+", "-", re.sub(r"[^a-z0-9\s]", "", name.lower()))
+
+
+def allocate(bases: list, taken: dict) -> list:
+    """First free of base, base-1, ... per entry, never repeating a slug; `taken` ({base: set}) is updated"""
+    next_counter, slugs, handed_out = {}, [], set()
+    for base in bases:
+        used = taken.setdefault(base, set())
+        counter = next_counter.get(base, 0)
+        slug = f"{base}-{counter}" if counter else base
+        while slug in used or slug in handed_out:
+            counter += 1
+            slug = f"{base}-{counter}"
+        handed_out.add(slug)
+        used.add(slug)
+        next_counter[base] = counter + 1
+        slugs.append(slug)
+    return slugs
+
+
+class Counter:
+    """Statements sent, with the simulated round trip before each"""
+
+    def __init__(self, conn, rtt_s: float, max_rows: int):
+        self.conn, self.rtt_s, self.max_rows, self.queries = conn, rtt_s, max_rows, 0
+
+    def run(self, sql: str, params=None):
+        if self.rtt_s:
+            time.sleep(self.rtt_s)
+        self.queries += 1
+        return pg.execute(self.conn, sql, params)
+
+    def insert(self, names: list, slugs: list):
+        self.run(INSERT_SQL, (DESTINATION, names, slugs))
+
+
+def taken_slugs(db: Counter, bases: list) -> dict:
+    """{base: slugs already used}, a page of max_rows per query, as generateUniqueSlugs does"""
+    unique = sorted(set(bases))
+    taken = {base: set() for base in unique}
+    offset = 0
+    while True:
+        rows = db.run("select slug from public.tours where slug = any(%s) or slug ~ any(%s) "
+                      "order by slug limit %s offset %s",
+                      (unique, [f"^{base}-[0-9]+$" for base in unique], db.max_rows, offset))
+        for (slug,) in rows:
+            for base in unique:
+                if slug == base or (slug.startswith(f"{base}-") and slug[len(base) + 1:].isdigit()):
+                    taken[base].add(slug)
+        if len(rows) < db.max_rows:
+            return taken
+        offset += db.max_rows
+
+
+# -- strategies ----------------------------------------------------------------
+# Each creates the tours for `names` and returns their slugs
+
+def import_probe(db: Counter, names: list) -> list:
+    slugs = []
+    for name in names:
+        base = slug = base_slug(name)
+        counter = 1
+        while db.run("select id from public.tours where slug = %s", (slug,)):
+            slug = f"{base}-{counter}"
+            counter += 1
+        db.insert([name], [slug])
+        slugs.append(slug)
+    return slugs
+
+
+def import_lookup(db: Counter, names: list) -> list:
+    slugs = []
+    for name in names:
+        base = base_slug(name)
+        slug = allocate([base], taken_slugs(db, [base]))[0]
+        db.insert([name], [slug])
+        slugs.append(slug)
+    return slugs
+
+
+def import_batched(db: Counter, names: list) -> list:
+    bases = [base_slug(name) for name in names]
+    slugs = allocate(bases, taken_slugs(db, bases))
+    db.insert(names, slugs)
+    return slugs
+
+
+STRATEGIES = {"probe": import_probe, "lookup": import_lookup, "batched": import_batched}
+
+
+def cleanup(conn):
+    pg.execute(conn, "delete from public.tours where destination = %s", (DESTINATION,))
+
+
+def run_strategy(conn, name: str, tours: int, names: list, batch_size: int, windows: int, rtt_s: float,
+                 max_rows: int) -> dict:
+    cleanup(conn)
+    db = Counter(conn, rtt_s, max_rows)
+    plan = [names[i % len(names)] for i in range(tours)]
+    window_size = max(1, -(-tours // windows))
+    batch = batch_size if name == "batched" else 1
+    slices, slugs, batch_ms = [], [], []
+
+    for start in range(0, tours, window_size):
+        window = plan[start:start + window_size]
+        queries_before = db.queries
+        started = time.perf_counter()
+        for i in range(0, len(window), batch):
+            batch_started = time.perf_counter()
+            slugs += STRATEGIES[name](db, window[i:i + batch])
+            batch_ms.append((time.perf_counter() - batch_started) * 1000)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        slices.append({
+            "created": start + len(window),
+            "duplicates_per_name": -(-(start + len(window)) // len(names)),
+            "queries_per_tour": round((db.queries - queries_before) / len(window), 3),
+            "ms_per_tour": round(elapsed_ms / len(window), 3),
+        })
+
+    created = pg.fetch_one(conn, "select count(*), count(distinct slug) from public.tours where destination = %s",
+                           (DESTINATION,))
+    cleanup(conn)
+    return {
+        "strategy": name,
+        "tours": tours,
+        "batch_size": batch,
+        "created": created[0],
+        "distinct_slugs": created[1],
+        "queries": db.queries,
+        "queries_per_tour": round(db.queries / tours, 3),
+        "ms_per_tour": round(sum(batch_ms) / tours, 3),
+        "call_ms": summarize(batch_ms),
+        "windows": slices,
+        "slugs": slugs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark slug allocation for bulk tour imports")
+    parser.add_argument("--strategies", nargs="*", choices=STRATEGY_NAMES, default=list(STRATEGY_NAMES))
+    parser.add_argument("--tours", type=int, default=2_000)
+    parser.add_argument("--names", type=int, default=len(NAMES), help="Distinct seed names to cycle through")
+    parser.add_argument("--batch-size", type=int, default=100, help="Tours per generateUniqueSlugs call")
+    parser.add_argument("--windows", type=int, default=10, help="Slices of the import reported separately")
+    parser.add_argument("--rtt-ms", type=float, default=2, help="Sleep before each statement (HTTP round trip)")
+    parser.add_argument("--max-rows", type=int, default=1000, help="Rows per lookup page (PostgREST max-rows)")
+    parser.add_argument("--report", default=DEFAULT_REPORT)
+    args = parser.parse_args()
+
+    names = list(NAMES[:max(1, args.names)])
+    conn = pg.prepare()
+    print("\n" + "="*80)
+    print(f"Slug allocation: {args.tours} tours over {len(names)} names "
+          f"(~{-(-args.tours // len(names))} duplicates each), rtt {args.rtt_ms}ms")
+    print("="*80)
+
+    report = {"dsn": pg.dsn().rsplit("@", 1)[-1], "tours": args.tours, "names": names,
+              "rtt_ms": args.rtt_ms, "max_rows": args.max_rows, "runs": []}
+    for name in args.strategies:
+        run = run_strategy(conn, name, args.tours, names, args.batch_size, args.windows, args.rtt_ms / 1000,
+                           args.max_rows)
+        report["runs"].append(run)
+        print(f"✓ {name} done")
+    conn.close()
+
+    reference = report["runs"][0]["slugs"] if report["runs"] else []
+    for run in report["runs"]:
+        run["same_slugs"] = run.pop("slugs") == reference
+        ok = run["created"] == run["distinct_slugs"] == args.tours and run["same_slugs"]
+        status = "✓" if ok else "❌"
+        print(f"\n{status} {run['strategy']:<8} (batch {run['batch_size']})  {run['queries']} queries, "
+              f"{run['queries_per_tour']} per tour, {run['ms_per_tour']} ms per tour")
+        for window in run["windows"]:
+            print(f"    {window['created']:>7} created  ~{window['duplicates_per_name']:>5} dupes/name  "
+                  f"{window['queries_per_tour']:>9} queries/tour  {window['ms_per_tour']:>9} ms/tour")
+
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Report saved to {args.report}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+Seeded browser state for the QA flows.
+
+Building a cart by clicking through /destinations costs every flow several
+seconds before it reaches the page it actually tests. This module writes a
+Playwright storage_state file once - a pre-filled `6cat_cart_v1` cart in
+localStorage plus any auth session/cookies - and caches it on disk keyed by
+the app build and the seed version. A flow that tests /cart, /checkout, etc.
+opens its context with new_seeded_page() and goes straight there, asserting
+against the seeded item. Flows that build their own cart from /destinations
+must not use it: the seeded item would sit in front of theirs.
+
+The state is written as plain JSON, so building it needs no browser.
+
+Cache key:
+    app build     .next/BUILD_ID, else QA_APP_BUILD, else git HEAD ("dev")
+    seed version  QA_SEED_VERSION, else a hash of the seed scripts + migrations
+    trip date     the seeded trip's date; once it has passed the state is
+                  rebuilt with the next bookable trip
+
+Optional settings:
+    QA_USER_EMAIL / QA_USER_PASSWORD   sign in and store the Supabase session
+    QA_STATE_PACKAGE_ID                package to put in the cart
+    QA_STATE_PAX                       travelers per cart item (default 2)
+
+Usage:
+    python -m qa.state              # build (or reuse) the cached state
+    python -m qa.state --rebuild
+    python -m qa.interactions --seeded   # cart steppers, starting on /cart
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+from qa.config import ROOT, base_url, env, supabase_anon_key, supabase_url
+
+CART_KEY = "6cat_cart_v1"
+CACHE_DIR = ROOT / ".qa-cache"
+SEED_FILES = ("seed_e2e.ts", "seed_customer.ts", "seed_southern_tours.mjs")
+
+
+def _git_head() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+    return out.stdout.strip() or "unknown"
+
+
+def app_build() -> str:
+    build_id = ROOT / ".next" / "BUILD_ID"
+    if build_id.exists():
+        return build_id.read_text(encoding="utf-8").strip()
+    return os.environ.get("QA_APP_BUILD") or f"{_git_head()}-dev"
+
+
+def seed_version() -> str:
+    explicit = os.environ.get("QA_SEED_VERSION")
+    if explicit:
+        return explicit
+    digest = hashlib.sha256()
+    paths = [ROOT / name for name in SEED_FILES]
+    paths += sorted((ROOT / "supabase" / "migrations").glob("*.sql"))
+    for path in paths:
+        if path.exists():
+            digest.update(path.name.encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def cache_key() -> str:
+    """Stable key for the current build/seed/app URL/user combination"""
+    parts = [app_build(), seed_version(), base_url(), env("QA_USER_EMAIL"),
+             env("QA_STATE_PACKAGE_ID"), env("QA_STATE_PAX", "2")]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:16]
+
+
+def state_path(trip_date: str = "") -> Path:
+    return CACHE_DIR / f"storage_state_{cache_key()}_{trip_date or 'nocart'}.json"
+
+
+def cached_state() -> Path:
+    """The cached state for this key whose trip date hasn't passed, if any"""
+    today = time.strftime("%Y-%m-%d")
+    for path in sorted(CACHE_DIR.glob(f"storage_state_{cache_key()}_*.json"), reverse=True):
+        trip_date = path.stem.rsplit("_", 1)[1]
+        if trip_date[:1].isdigit() and trip_date >= today:
+            return path
+    return None
+
+
+def rest_get(table: str, query: dict) -> list:
+    url, key = supabase_url(), supabase_anon_key()
+    if not url or not key:
+        return []
+    request = urllib.request.Request(
+        f"{url}/rest/v1/{table}?{urllib.parse.urlencode(query)}",
+        headers={"apikey": key, "Authorization": f"Bearer {key}"},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return json.loads(response.read().decode("utf-8"))
+    except (urllib.error.URLError, ValueError) as e:
+        print(f"⚠ Supabase {table} lookup failed: {e}")
+        return []
+
+
+def find_bookable_trip(package_id: str = "") -> tuple:
+    """(package, trip) rows for a published package with a scheduled trip"""
+    query = {
+        "select": "id,name,destination,base_price,image_url,image_urls,status",
+        "status": "eq.published",
+        "limit": "20",
+    }
+    if package_id:
+        query["id"] = f"eq.{package_id}"
+    for package in rest_get("packages", query):
+        trips = rest_get("trips", {
+            "select": "id,date,time",
+            "package_id": f"eq.{package['id']}",
+            "status": "eq.scheduled",
+            "date": f"gte.{time.strftime('%Y-%m-%d')}",
+            "order": "date.asc",
+            "limit": "1",
+        })
+        if trips:
+            return package, trips[0]
+    return None, None
+
+
+def make_cart_item(package: dict, trip: dict, pax: int = 2) -> dict:
+    """A LocalCartItem shaped like the one handleAddToCart stores"""
+    pax = max(1, int(pax))
+    price = float(package.get("base_price") or 0)
+    images = package.get("image_urls") or []
+    return {
+        "id": f"{package['id']}-{trip['id']}-default-{int(time.time() * 1000)}",
+        "packageId": package["id"],
+        "tripId": trip["id"],
+        "title": package.get("name") or "Destination",
+        "image": images[0] if images else (package.get("image_url") or ""),
+        "location": package.get("destination") or "",
+        "tripDate": trip.get("date") or "",
+        "tripTime": trip.get("time") or None,
+        "pax": pax,
+        "passengers": {"adult": pax, "child": 0, "infant": 0},
+        "unitPrice": price,
+        "totalPrice": price * pax,
+        "basePrice": price,
+        "pricingTiers": [],
+        "isFlatRate": False,
+        "minPax": 1,
+        "maxPax": None,
+        "adultUnitPrice": price,
+        "childUnitPrice": price,
+        "infantUnitPrice": 0,
+    }
+
+
+def sign_in() -> tuple:
+    """(localStorage key, session JSON) from a Supabase password grant"""
+    email, password = env("QA_USER_EMAIL"), env("QA_USER_PASSWORD")
+    url, key = supabase_url(), supabase_anon_key()
+    if not (email and password and url and key):
+        return None, None
+
+    request = urllib.request.Request(
+        f"{url}/auth/v1/token?grant_type=password",
+        data=json.dumps({"email": email, "password": password}).encode(),
+        headers={"apikey": key, "Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            session = json.loads(response.read().decode("utf-8"))
+    except (urllib.error.URLError, ValueError) as e:
+        print(f"⚠ Sign-in as {email} failed: {e}")
+        return None, None
+
+    if "expires_in" in session and "expires_at" not in session:
+        session["expires_at"] = int(time.time()) + int(session["expires_in"])
+    project_ref = urllib.parse.urlparse(url).hostname.split(".")[0]
+    return f"sb-{project_ref}-auth-token", json.dumps(session)
+
+
+def build_storage_state(cart: list, cookies: list = None, auth: tuple = (None, None)) -> dict:
+    """Playwright storage_state for the app origin"""
+    local_storage = [{"name": CART_KEY, "value": json.dumps(cart)}]
+    auth_key, auth_value = auth
+    if auth_key:
+        local_storage.append({"name": auth_key, "value": auth_value})
+    return {
+        "cookies": list(cookies or []),
+        "origins": [{"origin": base_url(), "localStorage": local_storage}],
+    }
+
+
+def build_state(force: bool = False, cart: list = None, cookies: list = None) -> Path:
+    """Write (or reuse) the cached storage_state file and return its path"""
+    if not force and cart is None:
+        cached = cached_state()
+        if cached:
+            return cached
+
+    if cart is None:
+        package, trip = find_bookable_trip(env("QA_STATE_PACKAGE_ID"))
+        if package and trip:
+            cart = [make_cart_item(package, trip, int(env("QA_STATE_PAX", "2")))]
+        else:
+            print("⚠ No bookable trip found - seeded state has an empty cart")
+            cart = []
+
+    path = state_path(min((item["tripDate"] for item in cart if item.get("tripDate")), default=""))
+    state = build_storage_state(cart, cookies=cookies, auth=sign_in())
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    tmp.replace(path)
+    return path
+
+
+def cart_items(path: Path) -> list:
+    """The cart stored in a storage_state file"""
+    state = json.loads(Path(path).read_text(encoding="utf-8"))
+    for origin in state.get("origins", []):
+        for entry in origin.get("localStorage", []):
+            if entry["name"] == CART_KEY:
+                return json.loads(entry["value"])
+    return []
+
+
+def new_seeded_context(browser, path: Path = None, **kwargs):
+    """Context that starts with the cached cart/session already in place"""
+    from qa.browser import new_context
+
+    kwargs.setdefault("storage_state", str(path or build_state()))
+    return new_context(browser, **kwargs)
+
+
+def new_seeded_page(browser, route: str = "/cart", path: Path = None, **kwargs):
+    """Seeded context + page already on `route`"""
+    page = new_seeded_context(browser, path=path, **kwargs).new_page()
+    page.goto(f"{base_url()}{route}")
+    page.wait_for_load_state("domcontentloaded")
+    return page
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the cached seeded storage_state")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the cached file")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    path = build_state(force=args.rebuild)
+    print(f"✓ Storage state: {path}")
+    print(f"  app build: {app_build()}  seed: {seed_version()}")
+    print(f"  cart items: {len(cart_items(path))}")
+    print(f"  ready in {time.perf_counter() - started:.3f}s")
+    return path
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Small latency/throughput helpers shared by the load and benchmark tools.
+"""
+
+import math
+
+
+def percentile(values: list, pct: float) -> float:
+    """Linear-interpolated percentile (pct in 0-100) of an unsorted list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return float(ordered[0])
+    rank = (len(ordered) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    if low == high:
+        return float(ordered[low])
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(latencies_ms: list) -> dict:
+    """count/min/mean/p50/p95/p99/max of a list of millisecond timings"""
+    if not latencies_ms:
+        return {"count": 0}
+    return {
+        "count": len(latencies_ms),
+        "min_ms": round(min(latencies_ms), 2),
+        "mean_ms": round(sum(latencies_ms) / len(latencies_ms), 2),
+        "p50_ms": round(percentile(latencies_ms, 50), 2),
+        "p95_ms": round(percentile(latencies_ms, 95), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+        "max_ms": round(max(latencies_ms), 2),
+    }
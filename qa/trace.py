@@ -0,0 +1,228 @@
+"""
+Network trace for a browser context.
+
+One TraceCollector per context records every request/response - method, URL,
+POST body, status, size and timing - into a bounded ring buffer. Flows take
+a mark() before an action and read what happened with since(mark) instead of
+registering a fresh page.on("request") closure each time.
+
+The buffer can be dumped to JSONL (one entry per line) or HAR 1.2, and
+latency() groups finished requests per API route for p50/p95 breakdowns.
+
+Usage:
+    tracer = trace.collector(context)
+    mark = tracer.mark()
+    page.click(...)
+    calls = tracer.api_calls(since=mark)
+    tracer.dump_jsonl("/tmp/qa_flow_trace.jsonl")
+"""
+
+import itertools
+import json
+import os
+import re
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+from qa.routes import route_key
+from qa.stats import summarize
+
+DEFAULT_CAPACITY = 2000
+BODY_LIMIT = 4096
+API_PATTERN = re.compile(r"/api/|/rest/v1/|/auth/v1/|availability", re.IGNORECASE)
+
+_collectors = {}
+
+
+def is_api(url: str) -> bool:
+    return bool(API_PATTERN.search(url))
+
+
+def route_of(method: str, url: str) -> str:
+    """'GET /api/v1/tours/:id/schedules' - query dropped, ids collapsed"""
+    return f"{method} {route_key(url)}"
+
+
+class TraceCollector:
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, body_limit: int = BODY_LIMIT):
+        self.entries = deque(maxlen=capacity)
+        self.body_limit = body_limit
+        self.dropped = 0
+        self._seq = itertools.count(1)
+        self._last_seq = 0
+        self._inflight = {}
+        self._context = None
+        self._started = time.time()
+
+    # -- listeners ---------------------------------------------------------
+
+    def attach(self, context):
+        self._context = context
+        context.on("request", self._on_request)
+        context.on("response", self._on_response)
+        context.on("requestfinished", self._on_finished)
+        context.on("requestfailed", self._on_failed)
+        return self
+
+    def detach(self):
+        if self._context is None:
+            return
+        for event, handler in (("request", self._on_request), ("response", self._on_response),
+                               ("requestfinished", self._on_finished), ("requestfailed", self._on_failed)):
+            self._context.remove_listener(event, handler)
+        self._context = None
+
+    def _on_request(self, request):
+        seq = next(self._seq)
+        self._last_seq = seq
+        body = None
+        if request.method not in ("GET", "HEAD"):
+            try:
+                body = request.post_data
+            except Exception:
+                body = None
+            if body and len(body) > self.body_limit:
+                body = body[:self.body_limit] + "…"
+        entry = {
+            "seq": seq,
+            "started": time.time(),
+            "method": request.method,
+            "url": request.url,
+            "resource_type": request.resource_type,
+            "post_data": body,
+            "status": None,
+            "size": None,
+            "duration_ms": None,
+            "timing": None,
+            "failure": None,
+        }
+        if len(self.entries) == self.entries.maxlen:
+            self.dropped += 1
+        self.entries.append(entry)
+        # Requests that never finish (page closed mid-flight) must not outgrow the ring
+        while len(self._inflight) >= self.entries.maxlen:
+            self._inflight.pop(next(iter(self._inflight)))
+        self._inflight[request] = entry
+
+    def _on_response(self, response):
+        entry = self._inflight.get(response.request)
+        if entry is None:
+            return
+        entry["status"] = response.status
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            entry["size"] = int(length)
+
+    def _finish(self, request, failure=None):
+        entry = self._inflight.pop(request, None)
+        if entry is None:
+            return
+        if failure is None:
+            # Body bytes received; content-length is missing on chunked responses
+            try:
+                entry["size"] = request.sizes()["responseBodySize"]
+            except Exception:
+                pass
+        timing = request.timing
+        if timing and timing.get("responseEnd", -1) >= 0:
+            entry["duration_ms"] = round(timing["responseEnd"], 2)
+            entry["timing"] = {k: round(v, 2) for k, v in timing.items() if k != "startTime"}
+        else:
+            entry["duration_ms"] = round((time.time() - entry["started"]) * 1000, 2)
+        entry["failure"] = failure
+
+    def _on_finished(self, request):
+        self._finish(request)
+
+    def _on_failed(self, request):
+        self._finish(request, failure=request.failure or "failed")
+
+    # -- queries -----------------------------------------------------------
+
+    def mark(self) -> int:
+        """Sequence number to pass to since()/api_calls() after an action"""
+        return self._last_seq
+
+    def since(self, mark: int = 0) -> list:
+        return [e for e in self.entries if e["seq"] > mark]
+
+    def api_calls(self, since: int = 0) -> list:
+        """Compact {url, method, data, status, duration_ms} list of API traffic"""
+        return [
+            {"url": e["url"], "method": e["method"], "data": e["post_data"],
+             "status": e["status"], "duration_ms": e["duration_ms"]}
+            for e in self.since(since) if is_api(e["url"])
+        ]
+
+    def latency(self, since: int = 0, api_only: bool = True) -> dict:
+        """Per-route latency summary of finished requests"""
+        groups = {}
+        for e in self.since(since):
+            if e["duration_ms"] is None or (api_only and not is_api(e["url"])):
+                continue
+            groups.setdefault(route_of(e["method"], e["url"]), []).append(e["duration_ms"])
+        return {route: summarize(values) for route, values in sorted(groups.items())}
+
+    # -- dumps -------------------------------------------------------------
+
+    def dump_jsonl(self, path: str) -> str:
+        with open(path, "w", encoding="utf-8") as f:
+            for e in self.entries:
+                f.write(json.dumps(e, separators=(",", ":")) + "\n")
+        return path
+
+    def to_har(self) -> dict:
+        entries = []
+        for e in self.entries:
+            url = urlsplit(e["url"])
+            query = [{"name": k, "value": v} for k, _, v in
+                     (p.partition("=") for p in url.query.split("&") if p)]
+            request = {
+                "method": e["method"], "url": e["url"], "httpVersion": "HTTP/1.1",
+                "headers": [], "cookies": [], "queryString": query,
+                "headersSize": -1, "bodySize": len(e["post_data"] or ""),
+            }
+            if e["post_data"]:
+                request["postData"] = {"mimeType": "application/json", "text": e["post_data"]}
+            timing = e["timing"] or {}
+            entries.append({
+                "startedDateTime": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(e["started"]))
+                + f".{int(e['started'] * 1000) % 1000:03d}Z",
+                "time": e["duration_ms"] or 0,
+                "request": request,
+                "response": {
+                    "status": e["status"] or 0, "statusText": e["failure"] or "",
+                    "httpVersion": "HTTP/1.1", "headers": [], "cookies": [],
+                    "content": {"size": -1 if e["size"] is None else e["size"], "mimeType": ""},
+                    "redirectURL": "", "headersSize": -1, "bodySize": -1 if e["size"] is None else e["size"],
+                },
+                "cache": {},
+                "timings": {
+                    "send": 0,
+                    "wait": max(0, timing.get("responseStart", 0) - timing.get("requestStart", 0)),
+                    "receive": max(0, timing.get("responseEnd", 0) - timing.get("responseStart", 0)),
+                },
+            })
+        return {"log": {"version": "1.2", "creator": {"name": "qa.trace", "version": "1"},
+                        "entries": entries}}
+
+    def dump_har(self, path: str) -> str:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_har(), f)
+        return path
+
+
+def collector(context, capacity: int = None) -> TraceCollector:
+    """The context's TraceCollector, attached on first use
+
+    The ring size defaults to QA_TRACE_CAPACITY (the runner's --ci profile
+    keeps it small).
+    """
+    tracer = _collectors.get(id(context))
+    if tracer is None:
+        capacity = capacity or int(os.environ.get("QA_TRACE_CAPACITY", DEFAULT_CAPACITY))
+        tracer = TraceCollector(capacity).attach(context)
+        _collectors[id(context)] = tracer
+        context.on("close", lambda _: _collectors.pop(id(context), None))
+    return tracer
@@ -0,0 +1,252 @@
+"""
+Web vitals and navigation timing for every page the flows visit.
+
+install(context) (called by qa.browser.new_context) adds an init script
+that watches the Performance API - navigation timing, paint,
+largest-contentful-paint, layout-shift and longtask entries, resource
+transfer sizes - and reports a snapshot per document through a binding.
+Client-side route changes (Next.js pushState) close the current sample and
+start a "soft" one with CLS, long tasks and transfer counted from there.
+The JS heap comes from CDP Performance.getMetrics, falling back to
+performance.memory.
+
+Each sample:
+
+    {"route": "/destinations/:id", "kind": "hard", "ttfb_ms", "fcp_ms", "lcp_ms",
+     "cls", "long_tasks", "long_task_ms", "transfer_bytes", "js_heap_bytes", ...}
+
+The runner resets the recorder per flow, puts samples() in the flow record,
+and compares the per-route medians with a baseline
+(.qa-cache/vitals_baseline.json or QA_VITALS_BASELINE): a metric regresses
+when it is both THRESHOLD% and a fixed floor worse than the baseline.
+
+Filtered (QA_NETFILTER) and replayed (QA_NETWORK=replay) runs transfer and
+paint differently, so each such profile keeps its own baseline file, e.g.
+vitals_baseline.functional.json under --ci.
+"""
+
+import json
+import os
+import re
+import statistics
+from pathlib import Path
+
+from qa.config import ROOT
+from qa.routes import route_key
+
+BASELINE_DIR = ROOT / ".qa-cache"
+BINDING = "__qaReportVitals"
+
+# Smallest change that counts as a regression, whatever the percentage
+FLOORS = {
+    "ttfb_ms": 50,
+    "fcp_ms": 100,
+    "lcp_ms": 150,
+    "cls": 0.02,
+    "long_task_ms": 50,
+    "transfer_bytes": 50 * 1024,
+    "js_heap_bytes": 2 * 1024 * 1024,
+}
+METRICS = tuple(FLOORS)
+
+VITALS_JS = r"""
+(() => {
+  if (window.__qaVitals) return;
+  const newId = () => Math.random().toString(36).slice(2) + Date.now().toString(36);
+  const v = (window.__qaVitals = {
+    id: newId(), kind: 'hard', url: location.href, started: 0,
+    fcp: null, lcp: null, cls: 0, longTasks: 0, longTaskMs: 0,
+  });
+
+  let timer = null;
+  const report = () => {
+    clearTimeout(timer);
+    timer = null;
+    const nav = performance.getEntriesByType('navigation')[0];
+    const hard = v.kind === 'hard';
+    const resources = performance.getEntriesByType('resource').filter((r) => r.startTime >= v.started);
+    const payload = {
+      id: v.id, kind: v.kind, url: v.url,
+      ttfb: hard && nav ? nav.responseStart : null,
+      dom_content_loaded: hard && nav ? nav.domContentLoadedEventEnd : null,
+      load: hard && nav ? nav.loadEventEnd : null,
+      fcp: v.fcp, lcp: v.lcp, cls: v.cls,
+      long_tasks: v.longTasks, long_task_ms: v.longTaskMs,
+      transfer_bytes: (hard && nav ? nav.transferSize || 0 : 0)
+        + resources.reduce((sum, r) => sum + (r.transferSize || 0), 0),
+      resources: resources.length,
+      heap: performance.memory ? performance.memory.usedJSHeapSize : null,
+    };
+    if (window.%(binding)s) window.%(binding)s(payload).catch(() => {});
+  };
+  const schedule = () => { if (!timer) timer = setTimeout(report, 300); };
+
+  const observe = (type, onEntry) => {
+    try {
+      new PerformanceObserver((list) => { list.getEntries().forEach(onEntry); schedule(); })
+        .observe({ type, buffered: true });
+    } catch (e) { /* entry type not supported */ }
+  };
+  observe('paint', (e) => { if (e.name === 'first-contentful-paint' && v.kind === 'hard') v.fcp = e.startTime; });
+  observe('largest-contentful-paint', (e) => { if (v.kind === 'hard') v.lcp = e.startTime; });
+  observe('layout-shift', (e) => { if (!e.hadRecentInput) v.cls += e.value; });
+  observe('longtask', (e) => { v.longTasks += 1; v.longTaskMs += e.duration; });
+
+  const softNavigation = () => {
+    if (location.href.split('#')[0] === v.url.split('#')[0]) return;
+    report();
+    Object.assign(v, {
+      id: newId(), kind: 'soft', url: location.href, started: performance.now(),
+      fcp: null, lcp: null, cls: 0, longTasks: 0, longTaskMs: 0,
+    });
+    schedule();
+  };
+  for (const method of ['pushState', 'replaceState']) {
+    const original = history[method];
+    history[method] = function (...args) {
+      const result = original.apply(this, args);
+      softNavigation();
+      return result;
+    };
+  }
+  addEventListener('popstate', softNavigation);
+  addEventListener('load', schedule);
+  addEventListener('pagehide', report);
+})();
+""" % {"binding": BINDING}
+
+
+class VitalsRecorder:
+    def __init__(self):
+        self._samples = {}
+        self._sessions = {}
+
+    def reset(self):
+        self._samples = {}
+        self._sessions = {}
+
+    def install(self, context):
+        context.expose_binding(BINDING, self._on_report)
+        context.add_init_script(VITALS_JS)
+
+    def _heap(self, page):
+        """JSHeapUsedSize from CDP, or None off Chromium"""
+        try:
+            session = self._sessions.get(id(page))
+            if session is None:
+                session = page.context.new_cdp_session(page)
+                session.send("Performance.enable")
+                self._sessions[id(page)] = session
+            metrics = session.send("Performance.getMetrics")["metrics"]
+            return next((int(m["value"]) for m in metrics if m["name"] == "JSHeapUsedSize"), None)
+        except Exception:
+            return None
+
+    def _on_report(self, source, payload):
+        heap = self._heap(source["page"]) if source.get("page") else None
+        self._samples[payload["id"]] = {
+            "route": route_key(payload["url"]),
+            "url": payload["url"],
+            "kind": payload["kind"],
+            "ttfb_ms": _ms(payload["ttfb"]),
+            "dom_content_loaded_ms": _ms(payload["dom_content_loaded"]),
+            "load_ms": _ms(payload["load"]),
+            "fcp_ms": _ms(payload["fcp"]),
+            "lcp_ms": _ms(payload["lcp"]),
+            "cls": round(payload["cls"], 4),
+            "long_tasks": payload["long_tasks"],
+            "long_task_ms": _ms(payload["long_task_ms"]),
+            "transfer_bytes": payload["transfer_bytes"],
+            "resources": payload["resources"],
+            "js_heap_bytes": heap if heap is not None else payload["heap"],
+        }
+
+    def samples(self) -> list:
+        return list(self._samples.values())
+
+
+def _ms(value):
+    return round(value, 1) if value is not None else None
+
+
+_recorder = VitalsRecorder()
+
+
+def install(context):
+    _recorder.install(context)
+
+
+def reset():
+    _recorder.reset()
+
+
+def samples() -> list:
+    return _recorder.samples()
+
+
+# -- baselines ---------------------------------------------------------------
+
+def summarize(all_samples: list) -> dict:
+    """{"<kind> <route>": {"samples": n, metric: median, ...}}"""
+    groups = {}
+    for sample in all_samples:
+        groups.setdefault(f"{sample['kind']} {sample['route']}", []).append(sample)
+    summary = {}
+    for key, group in sorted(groups.items()):
+        entry = {"samples": len(group)}
+        for metric in METRICS:
+            values = [s[metric] for s in group if s.get(metric) is not None]
+            entry[metric] = round(statistics.median(values), 4) if values else None
+        summary[key] = entry
+    return summary
+
+
+def profile() -> str:
+    """Netfilter spec and replay mode the run measures under; '' for a plain run"""
+    parts = [os.environ.get("QA_NETFILTER", "").strip().lower()]
+    if os.environ.get("QA_NETWORK", "").strip().lower() == "replay":
+        parts.append("replay")
+    return re.sub(r"[^a-z0-9]+", "-", ".".join(p for p in parts if p)).strip("-")
+
+
+def baseline_path() -> Path:
+    """QA_VITALS_BASELINE, else the baseline file for the current profile"""
+    if os.environ.get("QA_VITALS_BASELINE"):
+        return Path(os.environ["QA_VITALS_BASELINE"])
+    name = profile()
+    return BASELINE_DIR / (f"vitals_baseline.{name}.json" if name else "vitals_baseline.json")
+
+
+def load_baseline(path: Path = None) -> dict:
+    path = path or baseline_path()
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baseline(summary: dict, path: Path = None):
+    path = path or baseline_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(summary, f, indent=2)
+
+
+def regressions(summary: dict, baseline: dict, threshold_pct: float) -> list:
+    """Route metrics worse than baseline by threshold_pct and by the metric's floor"""
+    found = []
+    for key, current in summary.items():
+        before = baseline.get(key)
+        if not before:
+            continue
+        for metric in METRICS:
+            now, then = current.get(metric), before.get(metric)
+            if now is None or then is None:
+                continue
+            if now - then >= FLOORS[metric] and now > then * (1 + threshold_pct / 100):
+                found.append({
+                    "route": key, "metric": metric, "baseline": then, "current": now,
+                    "delta_pct": round((now - then) / then * 100, 1) if then else None,
+                })
+    return found
@@ -5,7 +5,11 @@ Tests: pax selectors, pricing, availability, cart behavior
 
 from playwright.sync_api import sync_playwright, Page
 import json
-import time
+
+from qa import evidence, selectors, trace
+from qa.browser import launch, new_context
+from qa.config import base_url
+from qa.readiness import expect_cart_update, expect_schedules, settle, wait_for_availability
 
 # Test results storage
 results = {
@@ -41,13 +45,19 @@ def log_step(step: str):
     print(f"  {step}")
     print(f"{'='*60}")
 
-def capture_evidence(page: Page, key: str, description: str):
-    """Capture screenshot evidence"""
-    filename = f"/tmp/qa_{key}.png"
-    page.screenshot(path=filename, full_page=True)
-    print(f"📸 Captured: {description} -> {filename}")
+def capture_evidence(page: Page, key: str, description: str, failure: bool = False):
+    """Capture screenshot evidence (per the QA_EVIDENCE policy)"""
+    filename = evidence.capture(page, f"/tmp/qa_{key}.png", description, failure=failure)
+    if filename:
+        print(f"📸 Captured: {description} -> {filename}")
     return filename
 
+def record_check(page: Page, section: str, check: str, passed: bool):
+    """Store a check's outcome; a failed one gets a failure capture"""
+    results[section][check] = passed
+    if not passed:
+        capture_evidence(page, f"fail_{section}_{check}", f"Failed check: {section}.{check}", failure=True)
+
 def get_element_text(page: Page, selector: str) -> str:
     """Safely get element text"""
     try:
@@ -68,8 +78,9 @@ def get_all_elements_text(page: Page, selector: str) -> list:
 
 def main():
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False, slow_mo=500)
-        context = browser.new_context(viewport={"width": 1920, "height": 1080})
+        browser = launch(p, slow_mo=500)
+        context = new_context(browser)
+        tracer = trace.collector(context)
         page = context.new_page()
         
         try:
@@ -77,9 +88,8 @@ def main():
             # STEP 1: Navigate to destinations list
             # ===================================================================
             log_step("STEP 1: Navigate to /destinations")
-            page.goto('http://localhost:3000/destinations')
+            page.goto(f'{base_url()}/destinations')
             page.wait_for_load_state('networkidle')
-            time.sleep(1)
             
             capture_evidence(page, "01_destinations_list", "Destinations list page")
             
@@ -92,10 +102,10 @@ def main():
             destination_name = first_destination.inner_text()
             destination_url = first_destination.get_attribute('href')
             print(f"Clicking destination: {destination_name} ({destination_url})")
-            first_destination.click()
+            with expect_schedules(page):
+                first_destination.click()
             
             page.wait_for_load_state('networkidle')
-            time.sleep(1)
             
             # ===================================================================
             # STEP 2: Test PRIVATE Package Mode
@@ -116,17 +126,18 @@ def main():
             ]
             
             private_clicked = False
-            for selector in private_selectors:
+            found = selectors.visible(page, "private_mode", private_selectors)
+            for selector, element in found:
                 try:
-                    element = page.locator(selector).first
-                    if element.is_visible():
-                        print(f"✓ Found Private selector: {selector}")
-                        element.click()
-                        private_clicked = True
-                        time.sleep(1)
-                        break
-                except:
+                    print(f"✓ Found Private selector: {selector}")
+                    element.click()
+                    private_clicked = True
+                    settle(page)
+                except Exception as e:
+                    print(f"Failed to click {selector}: {e}")
                     continue
+                found.remember(selector)
+                break
             
             if not private_clicked:
                 print("⚠ Could not find explicit Private mode selector - may be default")
@@ -150,10 +161,10 @@ def main():
             traveler_labels = get_all_elements_text(page, 'label')
             print(f"All visible labels: {traveler_labels}")
             
-            results["private_package"]["hides_child_infant_selectors"] = (
+            record_check(page, "private_package", "hides_child_infant_selectors",
                 len(child_selectors) == 0 and len(infant_selectors) == 0
             )
-            results["private_package"]["shows_traveler_count_only"] = (
+            record_check(page, "private_package", "shows_traveler_count_only",
                 len(visible_traveler_inputs) == 1 or 
                 any("traveler" in label.lower() or "pax" in label.lower() for label in traveler_labels)
             )
@@ -175,15 +186,15 @@ def main():
                 
                 # Try to set below min
                 traveler_input.fill('0')
-                time.sleep(0.5)
+                settle(page)
                 value_after_below_min = traveler_input.input_value()
                 
                 # Try to set to valid value
                 traveler_input.fill(min_val)
-                time.sleep(0.5)
+                settle(page)
                 value_at_min = traveler_input.input_value()
                 
-                results["private_package"]["enforces_min_max_pax"] = (
+                record_check(page, "private_package", "enforces_min_max_pax",
                     value_after_below_min != '0' or value_at_min == min_val
                 )
                 results["private_package"]["evidence"]["min_max"] = {
@@ -195,7 +206,7 @@ def main():
                 
                 # Set to a valid value for next steps
                 traveler_input.fill('4')
-                time.sleep(0.5)
+                settle(page)
             
             # Look for date selector
             print("\nSelecting date...")
@@ -207,7 +218,7 @@ def main():
                     if any(char.isdigit() for char in text) and len(text) < 20:
                         print(f"Clicking date: {text}")
                         btn.click()
-                        time.sleep(1)
+                        settle(page)
                         break
                 except:
                     continue
@@ -224,39 +235,25 @@ def main():
             ]
             
             availability_clicked = False
-            for selector in availability_selectors:
+            found = selectors.visible(page, "check_availability", availability_selectors)
+            for selector, element in found:
                 try:
-                    element = page.locator(selector).first
-                    if element.is_visible():
-                        print(f"✓ Clicking: {selector}")
-                        
-                        # Listen for network requests
-                        request_data = []
-                        def handle_request(request):
-                            if 'api' in request.url or 'availability' in request.url.lower():
-                                try:
-                                    post_data = request.post_data
-                                    request_data.append({
-                                        "url": request.url,
-                                        "method": request.method,
-                                        "data": post_data
-                                    })
-                                    print(f"API Request: {request.method} {request.url}")
-                                    if post_data:
-                                        print(f"POST data: {post_data}")
-                                except:
-                                    pass
-                        
-                        page.on("request", handle_request)
-                        element.click()
-                        availability_clicked = True
-                        time.sleep(2)
-                        
-                        results["check_availability"]["evidence"]["private_mode_requests"] = request_data
-                        break
+                    print(f"✓ Clicking: {selector}")
+                    
+                    mark = tracer.mark()
+                    element.click()
+                    availability_clicked = True
+                    wait_for_availability(page)
+                    
+                    request_data = tracer.api_calls(since=mark)
+                    for call in request_data:
+                        print(f"API Request: {call['method']} {call['url']} ({call['duration_ms']}ms)")
+                    results["check_availability"]["evidence"]["private_mode_requests"] = request_data
                 except Exception as e:
                     print(f"Failed to click {selector}: {e}")
                     continue
+                found.remember(selector)
+                break
             
             if not availability_clicked:
                 print("⚠ Could not find Check Availability button")
@@ -281,17 +278,20 @@ def main():
             ]
             
             cart_added = False
-            for selector in add_to_cart_selectors:
+            found = selectors.visible(page, "add_to_cart", add_to_cart_selectors)
+            for selector, element in found:
                 try:
-                    element = page.locator(selector).first
-                    if element.is_visible():
-                        print(f"✓ Clicking Add to Cart: {selector}")
+                    print(f"✓ Clicking Add to Cart: {selector}")
+                    mark = tracer.mark()
+                    with expect_cart_update(page, timeout=5_000):
                         element.click()
-                        cart_added = True
-                        time.sleep(1)
-                        break
-                except:
+                    cart_added = True
+                    results["add_to_cart"]["evidence"]["private_mode_requests"] = tracer.api_calls(since=mark)
+                except Exception as e:
+                    print(f"Failed to click {selector}: {e}")
                     continue
+                found.remember(selector)
+                break
             
             if not cart_added:
                 print("⚠ Could not find Add to Cart button")
@@ -311,9 +311,9 @@ def main():
             log_step("STEP 3: Test JOIN Package Mode")
             
             # Navigate back to destination detail
-            page.goto(f'http://localhost:3000{destination_url}')
+            with expect_schedules(page):
+                page.goto(f'{base_url()}{destination_url}')
             page.wait_for_load_state('networkidle')
-            time.sleep(1)
             
             # Click Join mode
             join_selectors = [
@@ -325,17 +325,18 @@ def main():
             ]
             
             join_clicked = False
-            for selector in join_selectors:
+            found = selectors.visible(page, "join_mode", join_selectors)
+            for selector, element in found:
                 try:
-                    element = page.locator(selector).first
-                    if element.is_visible():
-                        print(f"✓ Found Join selector: {selector}")
-                        element.click()
-                        join_clicked = True
-                        time.sleep(1)
-                        break
-                except:
+                    print(f"✓ Found Join selector: {selector}")
+                    element.click()
+                    join_clicked = True
+                    settle(page)
+                except Exception as e:
+                    print(f"Failed to click {selector}: {e}")
                     continue
+                found.remember(selector)
+                break
             
             if not join_clicked:
                 print("⚠ Could not find Join mode selector")
@@ -352,7 +353,7 @@ def main():
             print(f"Child selectors visible: {len(child_selectors)}")
             print(f"Infant selectors visible: {len(infant_selectors)}")
             
-            results["join_package"]["keeps_adult_child_infant_split"] = (
+            record_check(page, "join_package", "keeps_adult_child_infant_split",
                 len(adult_selectors) > 0 and len(child_selectors) > 0 and len(infant_selectors) > 0
             )
             results["join_package"]["evidence"]["adult_selectors"] = len(adult_selectors)
@@ -369,13 +370,13 @@ def main():
             
             if adult_input.is_visible():
                 adult_input.fill('2')
-                time.sleep(0.5)
+                settle(page)
             if child_input.is_visible():
                 child_input.fill('1')
-                time.sleep(0.5)
+                settle(page)
             if infant_input.is_visible():
                 infant_input.fill('1')
-                time.sleep(0.5)
+                settle(page)
             
             capture_evidence(page, "08_join_pax_set", "Pax counts set in join mode")
             
@@ -388,42 +389,30 @@ def main():
                     if any(char.isdigit() for char in text) and len(text) < 20:
                         print(f"Clicking date: {text}")
                         btn.click()
-                        time.sleep(1)
+                        settle(page)
                         break
                 except:
                     continue
             
             # Check availability
             print("\nClicking Check Availability (Join mode)...")
-            request_data_join = []
-            def handle_request_join(request):
-                if 'api' in request.url or 'availability' in request.url.lower():
-                    try:
-                        post_data = request.post_data
-                        request_data_join.append({
-                            "url": request.url,
-                            "method": request.method,
-                            "data": post_data
-                        })
-                        print(f"API Request: {request.method} {request.url}")
-                        if post_data:
-                            print(f"POST data: {post_data}")
-                    except:
-                        pass
-            
-            page.on("request", handle_request_join)
+            mark_join = tracer.mark()
             
-            for selector in availability_selectors:
+            found = selectors.visible(page, "check_availability", availability_selectors)
+            for selector, element in found:
                 try:
-                    element = page.locator(selector).first
-                    if element.is_visible():
-                        print(f"✓ Clicking: {selector}")
-                        element.click()
-                        time.sleep(2)
-                        break
-                except:
+                    print(f"✓ Clicking: {selector}")
+                    element.click()
+                    wait_for_availability(page)
+                except Exception as e:
+                    print(f"Failed to click {selector}: {e}")
                     continue
+                found.remember(selector)
+                break
             
+            request_data_join = tracer.api_calls(since=mark_join)
+            for call in request_data_join:
+                print(f"API Request: {call['method']} {call['url']} ({call['duration_ms']}ms)")
             results["check_availability"]["evidence"]["join_mode_requests"] = request_data_join
             
             capture_evidence(page, "09_join_availability_checked", "Availability checked in join mode")
@@ -446,20 +435,21 @@ def main():
             
             # Check if child price is different from adult
             has_child_price = any('child' in p.lower() for p in price_texts)
-            results["join_package"]["computes_total_with_child_price"] = has_child_price
+            record_check(page, "join_package", "computes_total_with_child_price", has_child_price)
             
             # Add to cart
             print("\nAdding to cart (Join mode)...")
-            for selector in add_to_cart_selectors:
+            found = selectors.visible(page, "add_to_cart", add_to_cart_selectors)
+            for selector, element in found:
                 try:
-                    element = page.locator(selector).first
-                    if element.is_visible():
-                        print(f"✓ Clicking Add to Cart: {selector}")
+                    print(f"✓ Clicking Add to Cart: {selector}")
+                    with expect_cart_update(page, timeout=5_000):
                         element.click()
-                        time.sleep(1)
-                        break
-                except:
+                except Exception as e:
+                    print(f"Failed to click {selector}: {e}")
                     continue
+                found.remember(selector)
+                break
             
             capture_evidence(page, "10_join_added_to_cart", "Added to cart in join mode")
             
@@ -475,19 +465,18 @@ def main():
                 '[class*="cart"]'
             ]
             
-            for selector in cart_selectors:
+            found = selectors.visible(page, "open_cart", cart_selectors)
+            for selector, element in found:
                 try:
-                    element = page.locator(selector).first
-                    if element.is_visible():
-                        print(f"✓ Clicking cart: {selector}")
-                        element.click()
-                        time.sleep(1)
-                        break
-                except:
+                    print(f"✓ Clicking cart: {selector}")
+                    element.click()
+                except Exception as e:
+                    print(f"Failed to click {selector}: {e}")
                     continue
+                found.remember(selector)
+                break
             
             page.wait_for_load_state('networkidle')
-            time.sleep(1)
             
             capture_evidence(page, "11_cart_page", "Cart page with items")
             
@@ -515,8 +504,8 @@ def main():
                 print(f"Total before decrement: {total_before}")
                 
                 # Click decrement
-                decrement_buttons[0].click()
-                time.sleep(1)
+                with expect_cart_update(page):
+                    decrement_buttons[0].click()
                 
                 # Get total after
                 total_after = get_element_text(page, '[class*="total"]:last-of-type, [class*="Total"]:last-of-type')
@@ -524,7 +513,7 @@ def main():
                 
                 capture_evidence(page, "12_cart_after_decrement", "Cart after decrement")
                 
-                results["cart_operations"]["totals_remain_correct"] = (total_before != total_after)
+                record_check(page, "cart_operations", "totals_remain_correct", total_before != total_after)
                 results["cart_operations"]["evidence"]["total_before_decrement"] = total_before
                 results["cart_operations"]["evidence"]["total_after_decrement"] = total_after
                 
@@ -532,8 +521,8 @@ def main():
                 print("\nTesting min enforcement (clicking - multiple times)...")
                 for i in range(5):
                     try:
-                        decrement_buttons[0].click()
-                        time.sleep(0.3)
+                        with expect_cart_update(page, timeout=2_000):
+                            decrement_buttons[0].click(timeout=2_000)
                     except:
                         break
                 
@@ -552,17 +541,20 @@ def main():
             
             # Get final totals
             final_totals = get_all_elements_text(page, '[class*="total"], [class*="Total"], [class*="subtotal"]')
-            results["add_to_cart"]["writes_correct_totals"] = len(final_totals) > 0
+            record_check(page, "add_to_cart", "writes_correct_totals", len(final_totals) > 0)
             results["add_to_cart"]["evidence"]["final_totals"] = final_totals
             
         except Exception as e:
             print(f"\n❌ ERROR: {str(e)}")
             import traceback
             traceback.print_exc()
-            capture_evidence(page, "error", "Error state")
+            capture_evidence(page, "error", "Error state", failure=True)
         
         finally:
-            time.sleep(2)
+            results["check_availability"]["evidence"]["api_latency"] = tracer.latency()
+            tracer.dump_jsonl("/tmp/qa_booking_flow_trace.jsonl")
+            tracer.dump_har("/tmp/qa_booking_flow_trace.har")
+            print(f"Selector cache: {selectors.stats()}")
             browser.close()
     
     # ===================================================================
@@ -658,13 +650,18 @@ def main():
     )
     
     print("\n" + "="*60)
-    print("Screenshots saved to /tmp/qa_*.png")
+    print(f"Evidence ({evidence.mode()}) saved to /tmp/qa_*")
+    print("Network trace saved to /tmp/qa_booking_flow_trace.jsonl (.har)")
     print("="*60)
     
     # Save full report
+    results["evidence_manifest"] = evidence.manifest()
+    
     with open('/tmp/qa_booking_flow_report.json', 'w') as f:
         json.dump(results, f, indent=2)
     print("\nFull report saved to /tmp/qa_booking_flow_report.json")
 
+    return results
+
 if __name__ == "__main__":
     main()
@@ -1,6 +1,18 @@
 from playwright.sync_api import sync_playwright
 import json
 
+from qa import evidence
+from qa.browser import launch, new_page
+from qa.config import base_url
+from qa.readiness import (
+    expect_cart_update,
+    expect_schedules,
+    settle,
+    wait_for_availability,
+    wait_for_calendar,
+    wait_for_options,
+)
+
 def main():
     results = {
         "test_summary": "End-to-end booking flow QA",
@@ -10,27 +22,28 @@ def main():
     }
 
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False, slow_mo=300)
-        page = browser.new_page(viewport={"width": 1920, "height": 1080})
+        browser = launch(p, slow_mo=300)
+        page = new_page(browser)
         
         try:
             print("\n" + "="*80)
             print("STEP 1: Navigate to /destinations")
             print("="*80)
-            page.goto('http://localhost:3000/destinations')
+            page.goto(f'{base_url()}/destinations')
             page.wait_for_load_state('networkidle')
-            page.screenshot(path='/tmp/qa2_01_destinations.png', full_page=True)
+            evidence.capture(page, '/tmp/qa2_01_destinations.png')
             
             first_dest = page.locator('a[href*="/destinations/"]:not([href="/destinations"])').first
             dest_text = first_dest.inner_text()
             print(f"✓ Found destination: {dest_text[:50]}...")
-            first_dest.click()
+            with expect_schedules(page):
+                first_dest.click()
             page.wait_for_load_state('networkidle')
             
             print("\n" + "="*80)
             print("STEP 2: On destination detail page")
             print("="*80)
-            page.screenshot(path='/tmp/qa2_02_detail_page.png', full_page=True)
+            evidence.capture(page, '/tmp/qa2_02_detail_page.png')
             
             page_title = page.locator('h1').first.inner_text()
             print(f"Package: {page_title}")
@@ -43,7 +56,7 @@ def main():
             date_button = page.locator('button:has-text("Choose Date")').first
             if date_button.is_visible():
                 date_button.click()
-                page.wait_for_timeout(500)
+                wait_for_calendar(page)
             
             available_dates = page.locator('button:has(.bg-green-500)').all()
             if len(available_dates) == 0:
@@ -56,13 +69,13 @@ def main():
                 selected_date_text = date_btn.inner_text()
                 print(f"Clicking date: {selected_date_text}")
                 date_btn.click()
-                page.wait_for_timeout(1000)
+                wait_for_options(page)
                 
                 results["evidence"]["selected_date"] = selected_date_text
-                page.screenshot(path='/tmp/qa2_03_date_selected.png', full_page=True)
+                evidence.capture(page, '/tmp/qa2_03_date_selected.png')
             else:
                 print("⚠ No available dates found")
-                results["fail"].append("No available dates")
+                evidence.fail(page, results, "No available dates", "/tmp/qa2")
             
             print("\n" + "="*80)
             print("STEP 4: Look for package options (determines private vs join)")
@@ -107,8 +120,8 @@ def main():
             if join_option:
                 print(f"Selecting: {join_option[1]}")
                 join_option[0].check()
-                page.wait_for_timeout(1000)
-                page.screenshot(path='/tmp/qa2_04_join_selected.png', full_page=True)
+                settle(page)
+                evidence.capture(page, '/tmp/qa2_04_join_selected.png')
                 
                 adult_label = page.locator('label:has-text("Adult")').first
                 child_label = page.locator('label:has-text("Child")').first
@@ -126,7 +139,7 @@ def main():
                     results["pass"].append("(b.1) Join package keeps adult/child/infant split")
                     print("  ✅ PASS: All three selectors visible")
                 else:
-                    results["fail"].append(f"(b.1) Join package - Adult:{adult_visible}, Child:{child_visible}, Infant:{infant_visible}")
+                    evidence.fail(page, results, f"(b.1) Join package - Adult:{adult_visible}, Child:{child_visible}, Infant:{infant_visible}", "/tmp/qa2")
                     print(f"  ❌ FAIL: Missing selectors")
                 
                 results["evidence"]["join_option"] = {
@@ -140,15 +153,15 @@ def main():
                     adult_plus = page.locator('label:has-text("Adult") ~ div button:has-text("+")').first
                     if adult_plus.is_visible():
                         adult_plus.click()
-                        page.wait_for_timeout(300)
+                        settle(page)
                 
                 if child_visible:
                     child_plus = page.locator('label:has-text("Child") ~ div button:has-text("+")').first
                     if child_plus.is_visible():
                         child_plus.click()
-                        page.wait_for_timeout(300)
+                        settle(page)
                 
-                page.screenshot(path='/tmp/qa2_05_join_pax_set.png', full_page=True)
+                evidence.capture(page, '/tmp/qa2_05_join_pax_set.png')
                 
                 price_elements = page.locator('text=/\\d+.*THB/').all()
                 prices = [el.inner_text() for el in price_elements if el.is_visible()]
@@ -161,10 +174,10 @@ def main():
                     results["pass"].append("(b.2) Join package shows price breakdown")
                     print("  ✅ PASS: Price breakdown found")
                 else:
-                    results["fail"].append("(b.2) Join package - No price breakdown found")
+                    evidence.fail(page, results, "(b.2) Join package - No price breakdown found", "/tmp/qa2")
                     print("  ⚠ SKIP: No obvious breakdown (may need time slot selection)")
             else:
-                results["fail"].append("(b) Join package - Not found")
+                evidence.fail(page, results, "(b) Join package - Not found", "/tmp/qa2")
                 print("❌ No join package option found")
             
             print("\n" + "="*80)
@@ -174,8 +187,8 @@ def main():
             if private_option:
                 print(f"Selecting: {private_option[1]}")
                 private_option[0].check()
-                page.wait_for_timeout(1000)
-                page.screenshot(path='/tmp/qa2_06_private_selected.png', full_page=True)
+                settle(page)
+                evidence.capture(page, '/tmp/qa2_06_private_selected.png')
                 
                 travelers_label = page.locator('label:has-text("Travelers")').first
                 adult_label = page.locator('label:has-text("Adult")').first
@@ -197,7 +210,7 @@ def main():
                     results["pass"].append("(a.2) Private package shows travelers count only")
                     print("  ✅ PASS: Only Travelers selector, no child/infant")
                 else:
-                    results["fail"].append(f"(a) Private package - Travelers:{travelers_visible}, Child:{child_visible}, Infant:{infant_visible}")
+                    evidence.fail(page, results, f"(a) Private package - Travelers:{travelers_visible}, Child:{child_visible}, Infant:{infant_visible}", "/tmp/qa2")
                     print("  ❌ FAIL: Wrong selectors visible")
                 
                 results["evidence"]["private_option"] = {
@@ -217,9 +230,9 @@ def main():
                         results["pass"].append("(a.3) Private package enforces min/max pax")
                         print("  ✅ PASS: Min/max pax enforced")
                     else:
-                        results["fail"].append("(a.3) Private package - No min/max indication")
+                        evidence.fail(page, results, "(a.3) Private package - No min/max indication", "/tmp/qa2")
             else:
-                results["fail"].append("(a) Private package - Not found")
+                evidence.fail(page, results, "(a) Private package - Not found", "/tmp/qa2")
                 print("❌ No private package option found")
             
             print("\n" + "="*80)
@@ -230,14 +243,13 @@ def main():
             if len(time_slots) > 0:
                 print(f"Found {len(time_slots)} time slots, clicking first")
                 time_slots[0].click()
-                page.wait_for_timeout(500)
             
             check_btn = page.locator('button:has-text("Check")').first
             if check_btn.is_visible():
                 print("Clicking 'Check Availability'")
                 check_btn.click()
-                page.wait_for_timeout(1000)
-                page.screenshot(path='/tmp/qa2_07_availability_checked.png', full_page=True)
+                wait_for_availability(page)
+                evidence.capture(page, '/tmp/qa2_07_availability_checked.png')
                 
                 success_msg = page.locator('text=/available/i').first
                 if success_msg.is_visible():
@@ -247,21 +259,21 @@ def main():
                     error_msg = page.locator('text=/error|sold|not available/i').first
                     if error_msg.is_visible():
                         print(f"  ⚠ Message: {error_msg.inner_text()}")
-                    results["fail"].append("(c) Check availability - No success confirmation")
+                    evidence.fail(page, results, "(c) Check availability - No success confirmation", "/tmp/qa2")
             
             add_cart_btn = page.locator('button:has-text("Add"), button:has(.ShoppingCart)').first
             if add_cart_btn.is_visible():
                 print("Clicking 'Add to Cart'")
-                add_cart_btn.click()
-                page.wait_for_timeout(1500)
-                page.screenshot(path='/tmp/qa2_08_added_to_cart.png', full_page=True)
+                with expect_cart_update(page):
+                    add_cart_btn.click()
+                evidence.capture(page, '/tmp/qa2_08_added_to_cart.png')
                 
                 cart_notice = page.locator('text=/added to cart/i').first
                 if cart_notice.is_visible():
                     print(f"  ✅ Added: {cart_notice.inner_text()}")
                     results["pass"].append("(d) Add to cart works")
                 else:
-                    results["fail"].append("(d) Add to cart - No confirmation")
+                    evidence.fail(page, results, "(d) Add to cart - No confirmation", "/tmp/qa2")
             
             print("\n" + "="*80)
             print("TEST D: Cart page")
@@ -271,8 +283,7 @@ def main():
             if cart_link.is_visible():
                 cart_link.click()
                 page.wait_for_load_state('networkidle')
-                page.wait_for_timeout(1000)
-                page.screenshot(path='/tmp/qa2_09_cart_page.png', full_page=True)
+                evidence.capture(page, '/tmp/qa2_09_cart_page.png')
                 
                 cart_items = page.locator('[class*="cart"], tr, [class*="item"]').all()
                 visible_items = [item for item in cart_items if item.is_visible() and len(item.inner_text().strip()) > 20]
@@ -299,9 +310,9 @@ def main():
                         total_before = page.locator('text=/total/i').first.inner_text() if page.locator('text=/total/i').count() > 0 else ""
                         print(f"  Total before decrement: {total_before}")
                         
-                        minus_btns[0].click()
-                        page.wait_for_timeout(500)
-                        page.screenshot(path='/tmp/qa2_10_cart_after_minus.png', full_page=True)
+                        with expect_cart_update(page):
+                            minus_btns[0].click()
+                        evidence.capture(page, '/tmp/qa2_10_cart_after_minus.png')
                         
                         total_after = page.locator('text=/total/i').first.inner_text() if page.locator('text=/total/i').count() > 0 else ""
                         print(f"  Total after decrement: {total_after}")
@@ -310,7 +321,7 @@ def main():
                             results["pass"].append("(e.2) Cart totals update correctly")
                             print("  ✅ PASS: Totals changed")
                         else:
-                            results["fail"].append("(e.2) Cart totals did not update")
+                            evidence.fail(page, results, "(e.2) Cart totals did not update", "/tmp/qa2")
                         
                         results["evidence"]["cart_totals_before_minus"] = total_before
                         results["evidence"]["cart_totals_after_minus"] = total_after
@@ -320,27 +331,27 @@ def main():
                                 print("  ✅ PASS: Minus button disabled at minimum")
                                 results["pass"].append("(e.1) Cart respects min pax")
                                 break
-                            minus_btns[0].click()
-                            page.wait_for_timeout(200)
+                            with expect_cart_update(page, timeout=2_000):
+                                minus_btns[0].click()
                         else:
                             print("  ✅ PASS: Min enforced (item removed or limit reached)")
                             results["pass"].append("(e.1) Cart respects min pax")
                         
-                        page.screenshot(path='/tmp/qa2_11_cart_min_test.png', full_page=True)
+                        evidence.capture(page, '/tmp/qa2_11_cart_min_test.png')
                 else:
-                    results["fail"].append("(d) Cart is empty")
+                    evidence.fail(page, results, "(d) Cart is empty", "/tmp/qa2")
                     print("  ❌ FAIL: No items in cart")
             else:
-                results["fail"].append("(d) Cart link not found")
+                evidence.fail(page, results, "(d) Cart link not found", "/tmp/qa2")
             
-            page.screenshot(path='/tmp/qa2_12_final.png', full_page=True)
+            evidence.capture(page, '/tmp/qa2_12_final.png')
             
         except Exception as e:
             print(f"\n❌ ERROR: {e}")
             import traceback
             traceback.print_exc()
             results["fail"].append(f"Exception: {str(e)}")
-            page.screenshot(path='/tmp/qa2_error.png', full_page=True)
+            evidence.capture(page, '/tmp/qa2_error.png', failure=True)
         
         finally:
             browser.close()
@@ -359,11 +370,15 @@ def main():
     print(f"\n📊 Evidence:")
     print(json.dumps(results["evidence"], indent=2))
     
+    results["evidence_manifest"] = evidence.manifest()
+    
     with open('/tmp/qa2_results.json', 'w') as f:
         json.dump(results, f, indent=2)
     
     print(f"\n✅ Report saved to /tmp/qa2_results.json")
-    print(f"📸 Screenshots saved to /tmp/qa2_*.png")
+    print(f"📸 Evidence ({results['evidence_manifest']['mode']}): {len(results['evidence_manifest']['files'])} files in /tmp/qa2_*")
+
+    return results
 
 if __name__ == "__main__":
     main()
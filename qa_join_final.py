@@ -1,34 +1,46 @@
 from playwright.sync_api import sync_playwright
 import json
 
+from qa import evidence, extract, pricing
+from qa.browser import launch, new_page
+from qa.config import base_url
+from qa.readiness import (
+    expect_cart_update,
+    expect_schedules,
+    settle,
+    wait_for_availability,
+    wait_for_calendar,
+    wait_for_options,
+)
+
 def main():
     results = {"pass": [], "fail": [], "data": {}}
 
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False, slow_mo=500)
-        page = browser.new_page(viewport={"width": 1920, "height": 1080})
+        browser = launch(p, slow_mo=500)
+        page = new_page(browser)
         
         try:
             print("\n=== NAVIGATE TO DESTINATION ===")
-            page.goto('http://localhost:3000/destinations')
+            page.goto(f'{base_url()}/destinations')
             page.wait_for_load_state('networkidle')
             
-            page.locator('a[href*="/destinations/"]:not([href="/destinations"])').first.click()
+            with expect_schedules(page):
+                page.locator('a[href*="/destinations/"]:not([href="/destinations"])').first.click()
             page.wait_for_load_state('networkidle')
-            page.wait_for_timeout(1000)
             
             print("\n=== SELECT DATE ===")
             date_btn = page.locator('button:has-text("Choose Date")').first
             if date_btn.is_visible():
                 date_btn.click()
-                page.wait_for_timeout(500)
+                wait_for_calendar(page)
             
             page.locator('button.border-primary\\/30').first.click()
-            page.wait_for_timeout(1000)
+            wait_for_options(page)
             
             print("\n=== SELECT JOIN OPTION ===")
             page.locator('input[name="package-option"]').first.check()
-            page.wait_for_timeout(1000)
+            settle(page)
             
             print("\n=== INCREMENT PAX COUNTS ===")
             
@@ -38,7 +50,7 @@ def main():
             
             print(f"Adult before: {adult_value.inner_text()}")
             adult_plus.click()
-            page.wait_for_timeout(500)
+            settle(page)
             print(f"Adult after +: {adult_value.inner_text()}")
             
             child_container = page.locator('div:has(> div > label:has-text("Child"))').first
@@ -47,7 +59,7 @@ def main():
             
             print(f"Child before: {child_value.inner_text()}")
             child_plus.click()
-            page.wait_for_timeout(500)
+            settle(page)
             print(f"Child after +: {child_value.inner_text()}")
             
             infant_container = page.locator('div:has(> div > label:has-text("Infant"))').first
@@ -56,14 +68,15 @@ def main():
             
             print(f"Infant before: {infant_value.inner_text()}")
             infant_plus.click()
-            page.wait_for_timeout(500)
+            settle(page)
             print(f"Infant after +: {infant_value.inner_text()}")
             
-            page.screenshot(path='/tmp/qa_final_01_pax_set.png', full_page=True)
+            evidence.capture(page, '/tmp/qa_final_01_pax_set.png')
             
-            final_adult = int(adult_value.inner_text())
-            final_child = int(child_value.inner_text())
-            final_infant = int(infant_value.inner_text())
+            snapshot = extract.extract(page)
+            final_adult = extract.counter(snapshot, "Adult") or 0
+            final_child = extract.counter(snapshot, "Child") or 0
+            final_infant = extract.counter(snapshot, "Infant") or 0
             
             results["data"]["pax_counts"] = {
                 "adult": final_adult,
@@ -77,7 +90,7 @@ def main():
             if final_adult >= 1 and final_child >= 1 and final_infant >= 1:
                 results["pass"].append("(b.1) Adult/Child/Infant selectors work")
             else:
-                results["fail"].append(f"(b.1) Pax not set correctly: A={final_adult}, C={final_child}, I={final_infant}")
+                evidence.fail(page, results, f"(b.1) Pax not set correctly: A={final_adult}, C={final_child}, I={final_infant}", "/tmp/qa_final")
             
             print("\n=== CAPTURE PRICE BREAKDOWN ===")
             
@@ -86,14 +99,21 @@ def main():
             print(price_text)
             
             results["data"]["price_breakdown_before_check"] = price_text
+            results["data"]["price_lines"] = snapshot["price_lines"]
+            
+            breakdown_problems = pricing.check_breakdown(snapshot["price_lines"])
+            if breakdown_problems:
+                evidence.fail(page, results, f"(b.3) Price breakdown arithmetic: {breakdown_problems}", "/tmp/qa_final")
+            elif snapshot["price_lines"]:
+                results["pass"].append("(b.3) Price breakdown rows add up to the total")
             
             has_child_price = 'child' in price_text.lower() and final_child > 0
             if has_child_price:
                 results["pass"].append("(b.2) Child price shown in breakdown")
             elif final_child == 0:
-                results["fail"].append("(b.2) Child count is 0, cannot verify")
+                evidence.fail(page, results, "(b.2) Child count is 0, cannot verify", "/tmp/qa_final")
             else:
-                results["fail"].append("(b.2) Child price not shown despite child > 0")
+                evidence.fail(page, results, "(b.2) Child price not shown despite child > 0", "/tmp/qa_final")
             
             print("\n=== SELECT TIME SLOT ===")
             time_btns = page.locator('button').all()
@@ -103,15 +123,14 @@ def main():
                     if ':' in text and len(text) < 10:
                         print(f"Clicking time: {text}")
                         btn.click()
-                        page.wait_for_timeout(500)
                         break
                 except:
                     pass
             
             print("\n=== CHECK AVAILABILITY ===")
             page.locator('button:has-text("Check")').first.click()
-            page.wait_for_timeout(2000)
-            page.screenshot(path='/tmp/qa_final_02_after_check.png', full_page=True)
+            wait_for_availability(page)
+            evidence.capture(page, '/tmp/qa_final_02_after_check.png')
             
             success_msg = page.locator('text=/available|great news/i').first
             error_msg = page.locator('text=/minimum|maximum|error/i').first
@@ -124,7 +143,7 @@ def main():
             elif error_msg.is_visible():
                 msg = error_msg.inner_text()
                 print(f"✗ Error: {msg}")
-                results["fail"].append(f"(c) Check failed: {msg}")
+                evidence.fail(page, results, f"(c) Check failed: {msg}", "/tmp/qa_final")
                 results["data"]["error_message"] = msg
             
             print("\n=== ADD TO CART ===")
@@ -139,8 +158,8 @@ def main():
                         text = btn.inner_text().strip()
                         if 'add' in text.lower() and len(text) < 30:
                             print(f"Found: '{text}'")
-                            btn.click()
-                            page.wait_for_timeout(2000)
+                            with expect_cart_update(page, timeout=5_000):
+                                btn.click()
                             add_btn_found = True
                             break
                 except:
@@ -148,9 +167,9 @@ def main():
             
             if not add_btn_found:
                 print("⚠ No Add button found, checking for drawer/modal...")
-                page.screenshot(path='/tmp/qa_final_03_no_add_btn.png', full_page=True)
+                evidence.capture(page, '/tmp/qa_final_03_no_add_btn.png')
             
-            page.screenshot(path='/tmp/qa_final_04_after_add_attempt.png', full_page=True)
+            evidence.capture(page, '/tmp/qa_final_04_after_add_attempt.png')
             
             cart_msg = page.locator('text=/added.*cart/i').first
             if cart_msg.is_visible():
@@ -158,15 +177,14 @@ def main():
                 results["pass"].append("(d) Add to cart succeeded")
             
             print("\n=== NAVIGATE TO CART ===")
-            page.goto('http://localhost:3000/cart')
+            page.goto(f'{base_url()}/cart')
             page.wait_for_load_state('networkidle')
-            page.wait_for_timeout(1500)
-            page.screenshot(path='/tmp/qa_final_05_cart.png', full_page=True)
+            evidence.capture(page, '/tmp/qa_final_05_cart.png')
             
             empty = page.locator('text=/cart is empty/i').first
             if empty.is_visible():
                 print("✗ Cart is empty")
-                results["fail"].append("(d) Cart empty - item not added")
+                evidence.fail(page, results, "(d) Cart empty - item not added", "/tmp/qa_final")
             else:
                 print("✓ Cart has items")
                 
@@ -175,20 +193,16 @@ def main():
                 
                 print("\nSearching for totals and pax info...")
                 
-                total_elements = page.locator('text=/total.*\\d/i').all()
-                for el in total_elements:
-                    if el.is_visible():
-                        print(f"  Total: {el.inner_text()}")
+                snapshot = extract.extract(page)
+                for line in snapshot["totals"]:
+                    print(f"  Total: {line['text']}")
+                
+                for line in snapshot["traveler_badges"][:10]:
+                    print(f"  Pax: {line['text']}")
                 
-                pax_elements = page.locator('text=/adult|child|infant|traveler/i').all()
-                for el in pax_elements[:10]:
-                    try:
-                        if el.is_visible():
-                            text = el.inner_text().strip()
-                            if len(text) < 100:
-                                print(f"  Pax: {text}")
-                    except:
-                        pass
+                results["data"]["cart_totals"] = snapshot["totals"]
+                results["data"]["cart_traveler_badges"] = snapshot["traveler_badges"][:10]
+                results["data"]["cart_pax_counters"] = snapshot["pax_counters"]
                 
                 results["pass"].append("(d.1) Cart displays items")
                 
@@ -200,14 +214,15 @@ def main():
                 print(f"Found {len(minus_btns)} minus, {len(plus_btns)} plus buttons")
                 
                 if len(minus_btns) > 0:
-                    total_before = page.locator('text=/total/i').last.inner_text() if page.locator('text=/total/i').count() > 0 else "N/A"
+                    total_before = extract.last_total(snapshot) or "N/A"
                     print(f"Total before: {total_before}")
+                    cart_before = extract.read_local_cart(page)
                     
-                    minus_btns[0].click()
-                    page.wait_for_timeout(1000)
-                    page.screenshot(path='/tmp/qa_final_06_after_minus.png', full_page=True)
+                    with expect_cart_update(page):
+                        minus_btns[0].click()
+                    evidence.capture(page, '/tmp/qa_final_06_after_minus.png')
                     
-                    total_after = page.locator('text=/total/i').last.inner_text() if page.locator('text=/total/i').count() > 0 else "N/A"
+                    total_after = extract.last_total(extract.extract(page)) or "N/A"
                     print(f"Total after: {total_after}")
                     
                     results["data"]["total_before_minus"] = total_before
@@ -216,7 +231,27 @@ def main():
                     if total_before != total_after:
                         results["pass"].append("(e.2) Totals update after -")
                     else:
-                        results["fail"].append("(e.2) Totals did not update")
+                        evidence.fail(page, results, "(e.2) Totals did not update", "/tmp/qa_final")
+                    
+                    cart_after = extract.read_local_cart(page)
+                    if cart_before and cart_after:
+                        expected = pricing.recalculate_local_cart_item(cart_before[0], cart_before[0]["pax"] - 1)
+                        actual = cart_after[0]
+                        results["data"]["oracle_after_minus"] = {
+                            "expected_pax": expected["pax"], "actual_pax": actual["pax"],
+                            "expected_total": expected["totalPrice"], "actual_total": actual["totalPrice"],
+                        }
+                        if expected["pax"] == actual["pax"] and pricing.same_amount(expected["totalPrice"], actual["totalPrice"]):
+                            results["pass"].append("(e.3) Cart item after - matches pricing oracle")
+                        else:
+                            evidence.fail(page, results, f"(e.3) Cart item after - differs from oracle: {results['data']['oracle_after_minus']}", "/tmp/qa_final")
+                        
+                        shown_total = pricing.parse_amount(total_after)
+                        expected_total = pricing.cart_summary(cart_after)["total"]
+                        if pricing.same_amount(shown_total, expected_total):
+                            results["pass"].append("(e.4) Displayed cart total matches oracle")
+                        else:
+                            evidence.fail(page, results, f"(e.4) Displayed total {shown_total} != oracle {expected_total}", "/tmp/qa_final")
                     
                     print("\nTesting min enforcement...")
                     for i in range(10):
@@ -225,23 +260,23 @@ def main():
                                 print(f"✓ Disabled after {i} clicks")
                                 results["pass"].append("(e.1) Min pax enforced (button disabled)")
                                 break
-                            minus_btns[0].click()
-                            page.wait_for_timeout(300)
+                            with expect_cart_update(page, timeout=2_000):
+                                minus_btns[0].click()
                         except:
                             print(f"✓ Button removed after {i} clicks")
                             results["pass"].append("(e.1) Min pax enforced (item removed)")
                             break
                     
-                    page.screenshot(path='/tmp/qa_final_07_min_test.png', full_page=True)
+                    evidence.capture(page, '/tmp/qa_final_07_min_test.png')
             
-            page.screenshot(path='/tmp/qa_final_08_final.png', full_page=True)
+            evidence.capture(page, '/tmp/qa_final_08_final.png')
             
         except Exception as e:
             print(f"\n❌ ERROR: {e}")
             import traceback
             traceback.print_exc()
             results["fail"].append(f"Exception: {str(e)}")
-            page.screenshot(path='/tmp/qa_final_error.png', full_page=True)
+            evidence.capture(page, '/tmp/qa_final_error.png', failure=True)
         
         finally:
             browser.close()
@@ -260,10 +295,15 @@ def main():
     print(f"\n📊 DATA:")
     print(json.dumps(results["data"], indent=2))
     
+    results["evidence_manifest"] = evidence.manifest()
+    
     with open('/tmp/qa_final_results.json', 'w') as f:
         json.dump(results, f, indent=2)
     
     print(f"\n✅ Results: /tmp/qa_final_results.json")
+    print(f"📸 Evidence ({results['evidence_manifest']['mode']}): {len(results['evidence_manifest']['files'])} files in /tmp/qa_final_*")
+
+    return results
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,17 @@
 from playwright.sync_api import sync_playwright
 import json
-import time
+
+from qa import evidence, extract, selectors
+from qa.browser import launch, new_page
+from qa.config import base_url
+from qa.readiness import (
+    expect_cart_update,
+    expect_schedules,
+    settle,
+    wait_for_availability,
+    wait_for_calendar,
+    wait_for_options,
+)
 
 def safe_text(locator):
     try:
@@ -19,20 +30,20 @@ def main():
     }
 
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False, slow_mo=400)
-        page = browser.new_page(viewport={"width": 1920, "height": 1080})
+        browser = launch(p, slow_mo=400)
+        page = new_page(browser)
         
         try:
             print("\n" + "="*80)
             print("STEP 1: Navigate to destination")
             print("="*80)
-            page.goto('http://localhost:3000/destinations')
+            page.goto(f'{base_url()}/destinations')
             page.wait_for_load_state('networkidle')
             
             first_dest = page.locator('a[href*="/destinations/"]:not([href="/destinations"])').first
-            first_dest.click()
+            with expect_schedules(page):
+                first_dest.click()
             page.wait_for_load_state('networkidle')
-            page.wait_for_timeout(1000)
             
             package_name = page.locator('h1').first.inner_text()
             print(f"Package: {package_name}")
@@ -44,25 +55,25 @@ def main():
             date_button = page.locator('button:has-text("Choose Date")').first
             if date_button.is_visible():
                 date_button.click()
-                page.wait_for_timeout(500)
+                wait_for_calendar(page)
             
             available_dates = page.locator('button.border-primary\\/30, button:has(.bg-green-500)').all()
             if len(available_dates) > 0:
                 available_dates[0].click()
-                page.wait_for_timeout(1000)
+                wait_for_options(page)
                 print("✓ Date selected")
             
             package_options = page.locator('input[name="package-option"]').all()
             if len(package_options) > 0:
                 package_options[0].check()
-                page.wait_for_timeout(1000)
+                settle(page)
                 
                 parent = package_options[0].locator('xpath=ancestor::label').first
                 option_name = parent.locator('h4').inner_text() if parent.locator('h4').count() > 0 else "Option 1"
                 print(f"✓ Selected: {option_name}")
                 results["join_flow"]["option_name"] = option_name
             
-            page.screenshot(path='/tmp/qa3_01_option_selected.png', full_page=True)
+            evidence.capture(page, '/tmp/qa3_01_option_selected.png')
             
             print("\n" + "="*80)
             print("STEP 3: Set pax counts (Adult=2, Child=1, Infant=1)")
@@ -79,52 +90,45 @@ def main():
             if adult_visible and child_visible and infant_visible:
                 results["pass"].append("(b.1) Join package shows Adult/Child/Infant split")
             else:
-                results["fail"].append(f"(b.1) Selectors - Adult:{adult_visible}, Child:{child_visible}, Infant:{infant_visible}")
+                evidence.fail(page, results, f"(b.1) Selectors - Adult:{adult_visible}, Child:{child_visible}, Infant:{infant_visible}", "/tmp/qa3")
             
             if adult_visible:
                 adult_plus = page.locator('label:has-text("Adult") ~ div button:has-text("+"), div:has(> label:has-text("Adult")) button:has-text("+")').first
                 if adult_plus.is_visible():
                     adult_plus.click()
-                    page.wait_for_timeout(300)
+                    settle(page)
                     print("✓ Adult: 1 → 2")
             
             if child_visible:
                 child_plus = page.locator('label:has-text("Child") ~ div button:has-text("+"), div:has(> label:has-text("Child")) button:has-text("+")').first
                 if child_plus.is_visible():
                     child_plus.click()
-                    page.wait_for_timeout(300)
+                    settle(page)
                     print("✓ Child: 0 → 1")
             
             if infant_visible:
                 infant_plus = page.locator('label:has-text("Infant") ~ div button:has-text("+"), div:has(> label:has-text("Infant")) button:has-text("+")').first
                 if infant_plus.is_visible():
                     infant_plus.click()
-                    page.wait_for_timeout(300)
+                    settle(page)
                     print("✓ Infant: 0 → 1")
             
-            page.screenshot(path='/tmp/qa3_02_pax_set.png', full_page=True)
+            evidence.capture(page, '/tmp/qa3_02_pax_set.png')
             
             print("\n" + "="*80)
             print("STEP 4: Capture price breakdown BEFORE Check")
             print("="*80)
             
-            price_texts = []
-            for selector in ['text=/adult.*thb/i', 'text=/child.*thb/i', 'text=/infant.*thb/i', 'text=/total.*thb/i', 'text=/\\d+,?\\d*\\s*thb/i']:
-                elements = page.locator(selector).all()
-                for el in elements:
-                    try:
-                        if el.is_visible():
-                            text = el.inner_text().strip()
-                            if text and text not in price_texts:
-                                price_texts.append(text)
-                    except:
-                        pass
+            snapshot = extract.extract(page)
+            price_texts = extract.texts(snapshot["price_lines"])
             
             print("Price breakdown displayed:")
             for price in price_texts[:10]:
                 print(f"  - {price}")
             
             results["join_flow"]["prices_before_check"] = price_texts[:10]
+            results["join_flow"]["price_lines_parsed"] = snapshot["price_lines"][:10]
+            results["join_flow"]["pax_counters"] = snapshot["pax_counters"]
             
             adult_line = [p for p in price_texts if 'adult' in p.lower() and 'thb' in p.lower()]
             child_line = [p for p in price_texts if 'child' in p.lower() and 'thb' in p.lower()]
@@ -140,7 +144,7 @@ def main():
                 results["pass"].append("(b.2) Child price displayed in breakdown")
                 print(f"✓ Child pricing found: {child_line[0]}")
             else:
-                results["fail"].append("(b.2) No child price in breakdown")
+                evidence.fail(page, results, "(b.2) No child price in breakdown", "/tmp/qa3")
                 print("✗ Child pricing not found")
             
             print("\n" + "="*80)
@@ -155,7 +159,6 @@ def main():
                     if ':' in text and len(text) < 10:
                         print(f"Clicking time: {text}")
                         btn.click()
-                        page.wait_for_timeout(500)
                         time_clicked = True
                         break
                 except:
@@ -172,8 +175,8 @@ def main():
             if check_btn.is_visible():
                 print("Clicking 'Check'...")
                 check_btn.click()
-                page.wait_for_timeout(2000)
-                page.screenshot(path='/tmp/qa3_03_after_check.png', full_page=True)
+                wait_for_availability(page)
+                evidence.capture(page, '/tmp/qa3_03_after_check.png')
                 
                 success_indicators = [
                     'text=/available/i',
@@ -194,7 +197,7 @@ def main():
                 if error_msg and not success_found:
                     print(f"✗ Error: {error_msg}")
                     results["join_flow"]["error_message"] = error_msg
-                    results["fail"].append(f"(c) Check availability failed: {error_msg}")
+                    evidence.fail(page, results, f"(c) Check availability failed: {error_msg}", "/tmp/qa3")
                 elif success_found:
                     results["pass"].append("(c) Check availability succeeded")
             
@@ -211,18 +214,18 @@ def main():
             ]
             
             added = False
-            for selector in add_selectors:
+            found = selectors.visible(page, "add_to_cart", add_selectors)
+            for selector, btn in found:
                 try:
-                    btn = page.locator(selector).first
-                    if btn.is_visible():
-                        btn_text = btn.inner_text()
-                        print(f"Found button: '{btn_text}' ({selector})")
+                    btn_text = btn.inner_text()
+                    print(f"Found button: '{btn_text}' ({selector})")
+                    with expect_cart_update(page, timeout=5_000):
                         btn.click()
-                        page.wait_for_timeout(2000)
-                        added = True
-                        break
+                    added = True
                 except:
-                    pass
+                    continue
+                found.remember(selector)
+                break
             
             if not added:
                 all_buttons = page.locator('button').all()
@@ -236,7 +239,7 @@ def main():
                     except:
                         pass
             
-            page.screenshot(path='/tmp/qa3_04_after_add.png', full_page=True)
+            evidence.capture(page, '/tmp/qa3_04_after_add.png')
             
             cart_notice = safe_text(page.locator('text=/added.*cart/i'))
             if cart_notice:
@@ -249,29 +252,19 @@ def main():
             print("STEP 8: Navigate to Cart")
             print("="*80)
             
-            page.goto('http://localhost:3000/cart')
+            page.goto(f'{base_url()}/cart')
             page.wait_for_load_state('networkidle')
-            page.wait_for_timeout(1500)
-            page.screenshot(path='/tmp/qa3_05_cart_page.png', full_page=True)
+            evidence.capture(page, '/tmp/qa3_05_cart_page.png')
             
             empty_msg = safe_text(page.locator('text=/cart is empty/i'))
             if empty_msg:
                 print(f"✗ Cart empty: {empty_msg}")
-                results["fail"].append("(d) Cart is empty - item not added")
+                evidence.fail(page, results, "(d) Cart is empty - item not added", "/tmp/qa3")
             else:
                 print("✓ Cart has content")
                 
-                cart_prices = []
-                for selector in ['text=/thb/i', 'text=/\\d+,?\\d+/']:
-                    elements = page.locator(selector).all()
-                    for el in elements[:30]:
-                        try:
-                            if el.is_visible():
-                                text = el.inner_text().strip()
-                                if 'thb' in text.lower() or text.replace(',', '').isdigit():
-                                    cart_prices.append(text)
-                        except:
-                            pass
+                snapshot = extract.extract(page)
+                cart_prices = extract.texts(snapshot["price_lines"])
                 
                 print(f"\nCart prices/numbers found: {len(cart_prices)}")
                 for price in cart_prices[:15]:
@@ -279,23 +272,15 @@ def main():
                 
                 results["cart_operations"]["prices_displayed"] = cart_prices[:15]
                 
-                traveler_badges = []
-                for selector in ['text=/adult/i', 'text=/child/i', 'text=/infant/i', 'text=/traveler/i', 'text=/pax/i']:
-                    elements = page.locator(selector).all()
-                    for el in elements[:10]:
-                        try:
-                            if el.is_visible():
-                                text = el.inner_text().strip()
-                                if text and len(text) < 100:
-                                    traveler_badges.append(text)
-                        except:
-                            pass
+                traveler_badges = extract.texts(snapshot["traveler_badges"])
                 
                 print(f"\nTraveler badges/labels: {len(traveler_badges)}")
                 for badge in traveler_badges[:10]:
                     print(f"  - {badge}")
                 
                 results["cart_operations"]["traveler_badges"] = traveler_badges[:10]
+                results["cart_operations"]["totals_parsed"] = snapshot["totals"]
+                results["cart_operations"]["pax_counters"] = snapshot["pax_counters"]
                 
                 if len(cart_prices) > 0:
                     results["pass"].append("(d.1) Cart displays totals")
@@ -312,14 +297,14 @@ def main():
                 print(f"Found {len(plus_btns)} plus buttons, {len(minus_btns)} minus buttons")
                 
                 if len(minus_btns) > 0:
-                    total_before = safe_text(page.locator('text=/total.*thb/i').last)
+                    total_before = extract.last_total(snapshot)
                     print(f"Total before: {total_before}")
                     
-                    minus_btns[0].click()
-                    page.wait_for_timeout(1000)
-                    page.screenshot(path='/tmp/qa3_06_after_minus.png', full_page=True)
+                    with expect_cart_update(page):
+                        minus_btns[0].click()
+                    evidence.capture(page, '/tmp/qa3_06_after_minus.png')
                     
-                    total_after = safe_text(page.locator('text=/total.*thb/i').last)
+                    total_after = extract.last_total(extract.extract(page))
                     print(f"Total after: {total_after}")
                     
                     results["cart_operations"]["total_before_minus"] = total_before
@@ -329,7 +314,7 @@ def main():
                         results["pass"].append("(e.2) Cart totals update after -")
                         print("✓ Total changed")
                     else:
-                        results["fail"].append("(e.2) Cart total did not change")
+                        evidence.fail(page, results, "(e.2) Cart total did not change", "/tmp/qa3")
                         print("✗ Total unchanged")
                     
                     print("\nTesting min enforcement (clicking - repeatedly)...")
@@ -339,47 +324,46 @@ def main():
                                 print(f"✓ Minus disabled after {i} clicks")
                                 results["pass"].append("(e.1) Cart respects min pax (button disabled)")
                                 break
-                            minus_btns[0].click()
-                            page.wait_for_timeout(300)
+                            with expect_cart_update(page, timeout=2_000):
+                                minus_btns[0].click()
                         except:
                             print(f"✓ Minus button removed/errored after {i} clicks")
                             results["pass"].append("(e.1) Cart respects min pax (item removed)")
                             break
                     
-                    page.screenshot(path='/tmp/qa3_07_min_test.png', full_page=True)
+                    evidence.capture(page, '/tmp/qa3_07_min_test.png')
                     
                     final_state = safe_text(page.locator('text=/cart is empty/i'))
                     if final_state:
                         print("Item removed from cart (reached minimum)")
                     else:
-                        final_total = safe_text(page.locator('text=/total.*thb/i').last)
+                        final_total = extract.last_total(extract.extract(page))
                         print(f"Final total: {final_total}")
                         results["cart_operations"]["final_total"] = final_total
                 
                 if len(plus_btns) > 0:
                     print("\nTesting + button...")
                     try:
-                        plus_btns[0].click()
-                        page.wait_for_timeout(1000)
-                        page.screenshot(path='/tmp/qa3_08_after_plus.png', full_page=True)
+                        with expect_cart_update(page):
+                            plus_btns[0].click()
+                        evidence.capture(page, '/tmp/qa3_08_after_plus.png')
                         
-                        total_after_plus = safe_text(page.locator('text=/total.*thb/i').last)
+                        total_after_plus = extract.last_total(extract.extract(page))
                         print(f"Total after +: {total_after_plus}")
                         results["cart_operations"]["total_after_plus"] = total_after_plus
                     except Exception as e:
                         print(f"Plus button error: {e}")
             
-            page.screenshot(path='/tmp/qa3_09_final.png', full_page=True)
+            evidence.capture(page, '/tmp/qa3_09_final.png')
             
         except Exception as e:
             print(f"\n❌ ERROR: {e}")
             import traceback
             traceback.print_exc()
             results["fail"].append(f"Exception: {str(e)}")
-            page.screenshot(path='/tmp/qa3_error.png', full_page=True)
+            evidence.capture(page, '/tmp/qa3_error.png', failure=True)
         
         finally:
-            time.sleep(1)
             browser.close()
     
     print("\n" + "="*80)
@@ -400,11 +384,15 @@ def main():
     print(f"\n🛒 CART OPERATIONS DATA:")
     print(json.dumps(results["cart_operations"], indent=2))
     
+    results["evidence_manifest"] = evidence.manifest()
+    
     with open('/tmp/qa3_results.json', 'w') as f:
         json.dump(results, f, indent=2)
     
     print(f"\n✅ Full results: /tmp/qa3_results.json")
-    print(f"📸 Screenshots: /tmp/qa3_*.png")
+    print(f"📸 Evidence ({results['evidence_manifest']['mode']}): {len(results['evidence_manifest']['files'])} files in /tmp/qa3_*")
+
+    return results
 
 if __name__ == "__main__":
     main()
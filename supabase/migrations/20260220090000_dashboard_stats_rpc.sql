@@ -0,0 +1,23 @@
+-- Migration: Dashboard stats aggregated in the database
+-- Purpose: getDashboardStats fetched every completed payment's amount to sum it in
+-- the app and ran four count queries; get_dashboard_stats returns all of them in
+-- one round trip. Security invoker, so the callers' RLS policies still apply.
+
+create or replace function public.get_dashboard_stats(p_today date default current_date)
+returns jsonb
+language sql
+stable
+as $$
+  select jsonb_build_object(
+    'totalCustomers', (select count(*) from public.customers),
+    'totalBookings', (select count(*) from public.bookings),
+    'totalRevenue', (select coalesce(sum(amount), 0) from public.payments where status = 'completed'),
+    'upcomingTrips', (select count(*) from public.trips where date >= p_today)
+  );
+$$;
+
+grant execute on function public.get_dashboard_stats(date) to authenticated, service_role;
+
+-- Lets the revenue sum run as an index-only scan
+create index if not exists payments_status_amount_idx
+  on public.payments (status) include (amount);